@@ -1,8 +1,15 @@
 import streamlit as st
-import google.generativeai as genai
 from data.base import st_style, head
-genai.configure(api_key=st.secrets["gemini"]["api_key"])
-model = genai.GenerativeModel("gemini-2.0-flash")
+from functions.chat import GeminiChat, TimedStream, trim_history
+
+
+def get_chat_provider():
+    """The chat model for this session; set st.session_state['chat_provider'] to swap it, e.g. for a StubChat."""
+    if "chat_provider" not in st.session_state:
+        st.session_state["chat_provider"] = GeminiChat(st.secrets["gemini"]["api_key"])
+    return st.session_state["chat_provider"]
+
+
 def app():
     st.markdown(st_style, unsafe_allow_html=True)
     st.markdown(head, unsafe_allow_html=True)
@@ -10,15 +17,31 @@ def app():
     st.title("A Personal AI Diabetes-Assistance-Bot")
     st.markdown("Ask anything related to **diabetes** and get an AI-powered answer.")
 
-    prompt = st.text_input("🧠 What would you like to know?", placeholder="E.g. What is type 2 diabetes?")
-
-    if st.button("Get Answer"):
-        if prompt:
-            with st.spinner("Thinking..."):
-                try:
-                    response = model.generate_content(prompt)
-                    st.success(response.text)
-                except Exception as e:
-                    st.error(f"❌ Something went wrong: {e}")
-        else:
-            st.warning("Please enter a question first.")
+    messages = st.session_state.setdefault("chat_messages", [])
+    if messages and st.button("🗑️ Clear Chat"):
+        messages.clear()
+        st.session_state.pop("chat_timing", None)
+
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    prompt = st.chat_input("🧠 What would you like to know? E.g. What is type 2 diabetes?")
+    if prompt:
+        messages.append({"role": "user", "content": prompt})
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        with st.chat_message("assistant"):
+            try:
+                stream = TimedStream(get_chat_provider().stream(trim_history(messages)))
+                answer = st.write_stream(stream)
+                messages.append({"role": "assistant", "content": answer})
+                st.session_state["chat_timing"] = (stream.first_token_s, stream.total_s)
+            except Exception as e:
+                # Drop the unanswered question so the history stays in question/answer pairs
+                messages.pop()
+                st.error(f"❌ Something went wrong: {e}")
+
+    timing = st.session_state.get("chat_timing")
+    if messages and timing and timing[0] is not None:
+        st.caption(f"⚡ First words after {timing[0]:.1f} s, full answer after {timing[1]:.1f} s")
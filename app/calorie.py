@@ -2,15 +2,16 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime, date, timedelta
-import numpy as np
 from fpdf import FPDF
 from io import BytesIO, StringIO
 import json
 import os
 import hashlib
-import pickle
 import plotly.express as px
 import plotly.graph_objects as go
+from functions.health_db import get_db, last_days
+from functions.registry import get_predictor
+from functions.calorie_model import EXERCISE_INTENSITY, TRAINED_RANGE, estimate_calories, scenario_grid
 
 # Timezone import for IST
 try:
@@ -20,6 +21,10 @@ except ImportError:
     import pytz
     IST = pytz.timezone("Asia/Kolkata")
 
+# Days of exercise history kept in the session for the charts and statistics;
+# the History tab and the export read other dates from the database when asked
+HISTORY_DAYS = 90
+
 # Import your existing styles
 try:
     from data.base import st_style, head
@@ -45,59 +50,55 @@ def get_current_user():
         st.stop()
     return user['email']
 
-def get_user_filename(user_email):
-    """Generate a safe filename for user's calorie history based on email."""
-    email_hash = hashlib.md5(user_email.encode()).hexdigest()[:12]
-    return f"calorie_history_{email_hash}.json"
-
 def get_user_goal_filename(user_email):
     """Generate a safe filename for user's daily goal based on email."""
     email_hash = hashlib.md5(user_email.encode()).hexdigest()[:12]
     return f"daily_goal_{email_hash}.json"
 
-def save_calorie_history(calorie_history, user_email):
-    """Save calorie history to a JSON file for persistence."""
-    filename = get_user_filename(user_email)
+def append_calorie_record(record, user_email):
+    """Store one calorie record in the user's history and return it with its id, or None on failure."""
     try:
-        os.makedirs("user_data", exist_ok=True)
-        filepath = os.path.join("user_data", filename)
-        with open(filepath, "w") as f:
-            serializable_history = []
-            for record in calorie_history:
-                record_copy = record.copy()
-                if isinstance(record_copy['DateTime'], datetime):
-                    record_copy['DateTime'] = record_copy['DateTime'].isoformat()
-                serializable_history.append(record_copy)
-            json.dump(serializable_history, f)
+        return get_db().add("exercise_sessions", user_email, record)
     except Exception as e:
         st.error(f"Failed to save calorie history: {e}")
+        return None
 
-def load_calorie_history(user_email):
-    """Load calorie history from a JSON file."""
-    filename = get_user_filename(user_email)
-    filepath = os.path.join("user_data", filename)
+def clear_calorie_history(user_email):
+    """Remove every record from the user's calorie history."""
     try:
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                data = json.load(f)
-                for record in data:
-                    if isinstance(record['DateTime'], str):
-                        try:
-                            dt = datetime.fromisoformat(record['DateTime'])
-                            if dt.tzinfo is None:
-                                dt = dt.replace(tzinfo=IST)
-                            else:
-                                dt = dt.astimezone(IST)
-                            record['DateTime'] = dt
-                        except ValueError:
-                            dt = pd.to_datetime(record['DateTime'], utc=True).tz_convert(IST)
-                            record['DateTime'] = dt.to_pydatetime()
-                return data
-        return []
+        get_db().clear("exercise_sessions", user_email)
+    except Exception as e:
+        st.error(f"Failed to save calorie history: {e}")
+
+def load_calorie_history(user_email, start=None, end=None):
+    """Load calorie history for specific user in time order, optionally only between the start and end dates."""
+    try:
+        data = get_db().query("exercise_sessions", user_email, start, end)
+        for record in data:
+            if isinstance(record['DateTime'], str):
+                try:
+                    dt = datetime.fromisoformat(record['DateTime'])
+                    if dt.tzinfo is None:
+                        dt = dt.replace(tzinfo=IST)
+                    else:
+                        dt = dt.astimezone(IST)
+                    record['DateTime'] = dt
+                except ValueError:
+                    dt = pd.to_datetime(record['DateTime'], utc=True).tz_convert(IST)
+                    record['DateTime'] = dt.to_pydatetime()
+        return data
     except Exception as e:
         st.error(f"Failed to load calorie history: {e}")
         return []
 
+def history_frame(records):
+    """Calorie records as a DataFrame with IST DateTime values and without record ids."""
+    df = pd.DataFrame(records)
+    if df.empty:
+        return df
+    df['DateTime'] = pd.to_datetime(df['DateTime'], errors='coerce', utc=True).dt.tz_convert(IST)
+    return df.drop(columns='id', errors='ignore')
+
 def save_daily_goal(daily_goal, user_email):
     """Save daily calorie burn goal for specific user."""
     filename = get_user_goal_filename(user_email)
@@ -130,7 +131,7 @@ def initialize_user_session(user_email):
     profile_key = f"user_profile_{user_email}"
     
     if history_key not in st.session_state:
-        st.session_state[history_key] = load_calorie_history(user_email)
+        st.session_state[history_key] = load_calorie_history(user_email, *last_days(HISTORY_DAYS))
     if goal_key not in st.session_state:
         st.session_state[goal_key] = load_daily_goal(user_email)
     if profile_key not in st.session_state:
@@ -170,38 +171,6 @@ def generate_pdf_report(calorie_history, daily_goal, user_email):
     pdf_output.seek(0)
     return pdf_output
 
-# Simple calorie estimation function (fallback if model doesn't exist)
-def estimate_calories_simple(gender, age, weight, duration, heart_rate):
-    """Simple calorie estimation formula as fallback"""
-    # Basic MET calculation
-    met_values = {
-        "Running": 8.0,
-        "Cycling": 6.0,
-        "Walking": 3.5,
-        "Swimming": 7.0,
-        "Yoga": 3.0,
-        "Strength Training": 5.0,
-        "Other": 4.0
-    }
-    
-    # Adjust based on heart rate intensity
-    if heart_rate > 160:
-        intensity_multiplier = 1.3
-    elif heart_rate > 140:
-        intensity_multiplier = 1.1
-    else:
-        intensity_multiplier = 0.9
-    
-    # Basic formula: MET * weight(kg) * time(hours) * intensity
-    base_met = 5.0  # default MET value
-    calories = base_met * weight * (duration / 60) * intensity_multiplier
-    
-    # Gender adjustment
-    if gender == "Female":
-        calories *= 0.9
-    
-    return calories
-
 def calories_tab():
     """🔥 Calories Burnt Estimator"""
     current_user = get_current_user()
@@ -210,15 +179,15 @@ def calories_tab():
     history_key = f"calorie_history_{current_user}"
     goal_key = f"daily_goal_{current_user}"
     profile_key = f"user_profile_{current_user}"
+    export_key = f"calorie_export_{current_user}"
     
     st.title("🔥 Calories Burnt Estimator")
     st.markdown("Estimate calories burnt during an activity based on health metrics and exercise type.")
     
-    # Try to load model, use simple estimation if not available
+    # Shared model, loaded once per process; simple estimation if not available
     model = None
     try:
-        with open("calories_model.pkl", "rb") as f:
-            model = pickle.load(f)
+        model = get_predictor("calories")
     except FileNotFoundError:
         st.warning("Advanced model not found. Using simple estimation method.")
     except Exception as e:
@@ -281,10 +250,7 @@ def calories_tab():
             "Exercise Duration (minutes)", min_value=1, max_value=180, 
             value=profile.get('duration', 30)
         )
-        exercise_types = [
-            "Running", "Cycling", "Walking", "Swimming", "Yoga", "Strength Training", 
-            "Hiking", "Dancing", "Rowing", "Boxing", "Tennis", "Basketball", "Other"
-        ]
+        exercise_types = list(EXERCISE_INTENSITY)
         exercise_type = st.selectbox(
             "Exercise Type", exercise_types,
             index=exercise_types.index(profile.get('exercise_type', 'Running')) if profile.get('exercise_type') in exercise_types else 0
@@ -329,12 +295,7 @@ def calories_tab():
             }
             
             # Calculate calories using model or simple estimation
-            if model is not None:
-                gender_encoded = 1 if gender == "Male" else 0
-                input_data = np.array([[gender_encoded, age, height, weight, duration, heart_rate, body_temp]])
-                calories = model.predict(input_data)[0]
-            else:
-                calories = estimate_calories_simple(gender, age, weight, duration, heart_rate)
+            calories = estimate_calories(model, gender, age, height, weight, duration, heart_rate, body_temp)
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -362,8 +323,10 @@ def calories_tab():
                 'Intensity': intensity,
                 'BMI': round(bmi, 1)
             }
-            st.session_state[history_key].append(record)
-            save_calorie_history(st.session_state[history_key], current_user)
+            record = append_calorie_record(record, current_user)
+            if record:
+                st.session_state[history_key].append(record)
+                st.session_state.pop(export_key, None)
             st.success("✅ Calories estimated and added to history!")
     
     # Quick exercise buttons
@@ -378,28 +341,65 @@ def calories_tab():
     for i, (label, params) in enumerate(quick_exercises):
         col = [quick_col1, quick_col2, quick_col3, quick_col4][i]
         with col:
+            # Scored only for the button pressed
             if st.button(label, key=f"quick_{i}_{current_user}"):
-                if model is not None:
-                    gender_encoded = 1 if gender == "Male" else 0
-                    input_data = np.array([[
-                        gender_encoded, age, height, weight, 
-                        params["duration"], params["heart_rate"], 38.5
-                    ]])
-                    quick_calories = model.predict(input_data)[0]
-                else:
-                    quick_calories = estimate_calories_simple(gender, age, weight, params["duration"], params["heart_rate"])
+                quick_calories = estimate_calories(
+                    model, gender, age, height, weight, params["duration"], params["heart_rate"]
+                )
                 st.write(f"~{quick_calories:.0f} kcal")
+
+    # What-if table: every scenario in one model call, only while the toggle is on
+    # (an expander would still run its contents on every rerun)
+    if st.toggle("🧮 What-if Table", key=f"what_if_{current_user}"):
+        st.caption(
+            "Estimated kcal for your profile across exercises or heart rates and durations. "
+            f"The model was trained on sessions of up to {TRAINED_RANGE['Duration'][1]} minutes and "
+            f"{TRAINED_RANGE['Heart_Rate'][1]} bpm; estimates level off beyond that."
+        )
+        what_if_col1, what_if_col2 = st.columns(2)
+        with what_if_col1:
+            rows_by = st.radio("Rows", ["Exercise", "Heart Rate"], horizontal=True, key=f"what_if_rows_{current_user}")
+        with what_if_col2:
+            what_if_durations = st.multiselect(
+                "Durations (min)", [5, 10, 15, 20, 25, 30, 45, 60, 90],
+                default=[5, 10, 15, 20, 25, 30], key=f"what_if_durations_{current_user}"
+            )
+        profile_inputs = {'gender': gender, 'age': age, 'height': height, 'weight': weight}
+        if rows_by == "Exercise":
+            what_if_exercises = st.multiselect(
+                "Exercises", exercise_types, default=exercise_types[:6], key=f"what_if_exercises_{current_user}"
+            )
+            grid = scenario_grid(model, profile_inputs, what_if_exercises, sorted(what_if_durations), body_temp=body_temp)
+            row_labels = grid["Exercise"] + " (" + grid["Heart Rate"].astype(str) + " bpm)"
+        else:
+            low, high = st.slider(
+                "Heart rate range (bpm)", 60, 200, (80, 130), step=10, key=f"what_if_hr_{current_user}"
+            )
+            grid = scenario_grid(
+                model, profile_inputs, [exercise_type], sorted(what_if_durations),
+                heart_rates=list(range(low, high + 1, 10)), body_temp=body_temp
+            )
+            row_labels = grid["Heart Rate"].astype(str) + " bpm"
+        if grid.empty:
+            st.info("Pick at least one row and one duration.")
+        else:
+            table = grid.assign(Row=row_labels).pivot_table(
+                index="Row", columns="Duration (min)", values="Calories (kcal)", sort=False
+            )
+            table.columns = [f"{minutes} min" for minutes in table.columns]
+            st.dataframe(table.round(0), use_container_width=True)
     
     # History and Analytics
     st.subheader("📊 Analytics & History")
-    if st.session_state[history_key]:
-        history_df = pd.DataFrame(st.session_state[history_key])
-        history_df['DateTime'] = pd.to_datetime(history_df['DateTime'], errors='coerce', utc=True).dt.tz_convert(IST)
+    if st.session_state[history_key] or get_db().count("exercise_sessions", current_user):
+        history_df = history_frame(st.session_state[history_key])
         
         tab1, tab2, tab3, tab4 = st.tabs(["📈 Charts", "📋 History", "📊 Stats", "💾 Export"])
         with tab1:
             today = datetime.now(IST).strftime('%Y-%m-%d')
-            today_calories = history_df[history_df['Date'] == today]['Calories Burnt (kcal)'].sum()
+            # Daily totals come from the per-day rollup instead of grouping every record
+            rollup = get_db().rollup(current_user, *last_days(HISTORY_DAYS))
+            today_calories = rollup['calories_out'].iloc[-1]
             progress = min(today_calories / st.session_state[goal_key], 1.0)
             st.metric(
                 "Today's Progress", 
@@ -409,9 +409,10 @@ def calories_tab():
             st.progress(progress)
             
             if len(history_df) > 1:
-                daily_totals = history_df.groupby('Date')['Calories Burnt (kcal)'].sum().reset_index()
+                daily_totals = rollup[rollup['exercise_count'] > 0]['calories_out'].rename('Calories Burnt (kcal)')
+                daily_totals = daily_totals.rename_axis('Date').reset_index()
                 fig1 = px.line(daily_totals, x='Date', y='Calories Burnt (kcal)', 
-                               title='Daily Calorie Burn Trend')
+                               title=f'Daily Calorie Burn Trend (last {HISTORY_DAYS} days)')
                 fig1.add_hline(y=st.session_state[goal_key], line_dash="dash", 
                                annotation_text="Daily Goal")
                 st.plotly_chart(fig1, use_container_width=True)
@@ -422,75 +423,81 @@ def calories_tab():
                 st.plotly_chart(fig2, use_container_width=True)
         
         with tab2:
-            st.write(f"**Total Records:** {len(history_df)}")
             filter_col1, filter_col2 = st.columns(2)
-            with filter_col1:
-                selected_exercises = st.multiselect(
-                    "Filter by Exercise Type",
-                    options=history_df['Exercise Type'].unique(),
-                    default=history_df['Exercise Type'].unique()
-                )
             with filter_col2:
                 date_range = st.date_input(
                     "Date Range",
                     value=(datetime.now(IST).date() - timedelta(days=7), datetime.now(IST).date()),
                     max_value=datetime.now(IST).date()
                 )
-            
-            filtered_df = history_df[history_df['Exercise Type'].isin(selected_exercises)]
-            if len(date_range) == 2:
-                start_date, end_date = date_range
-                filtered_df = filtered_df[
-                    (pd.to_datetime(filtered_df['Date']) >= pd.to_datetime(start_date)) &
-                    (pd.to_datetime(filtered_df['Date']) <= pd.to_datetime(end_date))
-                ]
-            
-            st.dataframe(
-                filtered_df.sort_values('DateTime', ascending=False),
-                use_container_width=True, hide_index=True
-            )
+            # Only the chosen dates are read
+            start_date, end_date = date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+            range_df = history_frame(load_calorie_history(current_user, start_date, end_date))
+            st.write(f"**Records in range:** {len(range_df)}")
+            if range_df.empty:
+                st.info("No records between these dates.")
+            else:
+                with filter_col1:
+                    selected_exercises = st.multiselect(
+                        "Filter by Exercise Type",
+                        options=range_df['Exercise Type'].unique(),
+                        default=range_df['Exercise Type'].unique()
+                    )
+                filtered_df = range_df[range_df['Exercise Type'].isin(selected_exercises)]
+                st.dataframe(
+                    filtered_df.sort_values('DateTime', ascending=False),
+                    use_container_width=True, hide_index=True
+                )
         
         with tab3:
-            st.subheader("📈 Summary Statistics")
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                st.metric("Total Sessions", len(history_df))
-            with col2:
-                st.metric("Total Calories", f"{history_df['Calories Burnt (kcal)'].sum():.0f}")
-            with col3:
-                st.metric("Average per Session", f"{history_df['Calories Burnt (kcal)'].mean():.0f}")
-            with col4:
-                st.metric("Total Exercise Time", f"{history_df['Duration (min)'].sum():.0f} min")
-            
-            st.subheader("🔍 Detailed Analysis")
-            stats_df = history_df.groupby('Exercise Type').agg({
-                'Calories Burnt (kcal)': ['count', 'sum', 'mean', 'max'],
-                'Duration (min)': 'sum'
-            }).round(1)
-            stats_df.columns = ['Sessions', 'Total Calories', 'Avg Calories', 'Max Calories', 'Total Minutes']
-            st.dataframe(stats_df, use_container_width=True)
+            st.subheader(f"📈 Summary Statistics (last {HISTORY_DAYS} days)")
+            if history_df.empty:
+                st.info(f"No exercise recorded in the last {HISTORY_DAYS} days.")
+            else:
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Sessions", len(history_df))
+                with col2:
+                    st.metric("Total Calories", f"{history_df['Calories Burnt (kcal)'].sum():.0f}")
+                with col3:
+                    st.metric("Average per Session", f"{history_df['Calories Burnt (kcal)'].mean():.0f}")
+                with col4:
+                    st.metric("Total Exercise Time", f"{history_df['Duration (min)'].sum():.0f} min")
+                
+                st.subheader("🔍 Detailed Analysis")
+                stats_df = history_df.groupby('Exercise Type').agg({
+                    'Calories Burnt (kcal)': ['count', 'sum', 'mean', 'max'],
+                    'Duration (min)': 'sum'
+                }).round(1)
+                stats_df.columns = ['Sessions', 'Total Calories', 'Avg Calories', 'Max Calories', 'Total Minutes']
+                st.dataframe(stats_df, use_container_width=True)
         
         with tab4:
             st.subheader("💾 Export Data")
-            csv_buffer = StringIO()
-            history_df.to_csv(csv_buffer, index=False)
-            st.download_button(
-                label="📄 Download as CSV",
-                data=csv_buffer.getvalue(),
-                file_name=f"calorie_history_{current_user.replace('@', '_')}_{date.today()}.csv",
-                mime="text/csv"
-            )
-            
-            json_data = history_df.to_json(orient='records', indent=2)
-            st.download_button(
-                label="📋 Download as JSON",
-                data=json_data,
-                file_name=f"calorie_history_{current_user.replace('@', '_')}_{date.today()}.json",
-                mime="application/json"
-            )
+            # The full history is read only when an export is asked for
+            if st.button("📦 Prepare Full History Export"):
+                full_df = history_frame(load_calorie_history(current_user))
+                csv_buffer = StringIO()
+                full_df.to_csv(csv_buffer, index=False)
+                st.session_state[export_key] = (csv_buffer.getvalue(), full_df.to_json(orient='records', indent=2))
+            if export_key in st.session_state:
+                csv_data, json_data = st.session_state[export_key]
+                st.download_button(
+                    label="📄 Download as CSV",
+                    data=csv_data,
+                    file_name=f"calorie_history_{current_user.replace('@', '_')}_{date.today()}.csv",
+                    mime="text/csv"
+                )
+                
+                st.download_button(
+                    label="📋 Download as JSON",
+                    data=json_data,
+                    file_name=f"calorie_history_{current_user.replace('@', '_')}_{date.today()}.json",
+                    mime="application/json"
+                )
             
             if st.button("Download Daily Report PDF"):
-                today_df = history_df[history_df['Date'] == today]
+                today_df = history_df[history_df['Date'] == today] if not history_df.empty else history_df
                 pdf_bytes = generate_pdf_report(today_df.to_dict('records'), st.session_state[goal_key], current_user)
                 st.download_button(
                     label="Download PDF",
@@ -501,8 +508,9 @@ def calories_tab():
         
         st.divider()
         if st.button("🗑️ Clear All History", type="secondary"):
+            clear_calorie_history(current_user)
             st.session_state[history_key] = []
-            save_calorie_history(st.session_state[history_key], current_user)
+            st.session_state.pop(export_key, None)
             st.success("All calorie history cleared!")
             st.rerun()
     
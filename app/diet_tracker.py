@@ -1,14 +1,17 @@
 import streamlit as st
 import pandas as pd
-import requests
 import matplotlib.pyplot as plt
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 import numpy as np
 from fpdf import FPDF
 from io import BytesIO
 import json
 import os
 from data.base import st_style, head
+from functions.catalog import load_catalog, NUTRIENTS
+from functions.food_search import FoodIndex
+from functions.health_db import get_db, last_days
+from functions.usda import get_client as get_usda_client
 import hashlib
 
 # Timezone import for IST
@@ -19,108 +22,75 @@ except ImportError:
     from pytz import timezone
     IST = timezone("Asia/Kolkata")
 
-@st.cache_data
-def load_datasets():
+@st.cache_resource
+def load_food_catalog(columns=None):
+    """Compiled food catalog (see food_catalog.py), with only the given columns, loaded once per process."""
     try:
-        pred_food = pd.read_csv("dataset/pred_food.csv", encoding="ISO-8859-1")
-        daily_nutrition = pd.read_csv("dataset/daily_food_nutrition_dataset.csv", encoding="ISO-8859-1")
-        indian_food = pd.read_csv("dataset/indian_food.csv", encoding="ISO-8859-1")
-        indian_food1 = pd.read_csv("dataset/Indian_Food_DF.csv", encoding="ISO-8859-1")
-        full_nutrition = pd.read_csv("dataset/Nutrition_Dataset.csv", encoding="ISO-8859-1")
-        indian_processed = pd.read_csv("dataset/Indian_Food_Nutrition_Processed.csv", encoding="ISO-8859-1")
+        return load_catalog(columns=columns)
     except Exception as e:
         st.error(f"Dataset loading failed: {e}")
-        return None, None, None, None, None, None
-    return pred_food, daily_nutrition, indian_food, indian_food1, full_nutrition, indian_processed
-
-def merge_datasets(*datasets):
-    dfs = []
-    for df in datasets[:-1]:  # first five datasets
-        if df is not None:
-            df.columns = [col.lower().strip() for col in df.columns]
-            if 'food' in df.columns and 'calories' in df.columns:
-                dfs.append(df[['food', 'calories']].copy())
-
-    processed = datasets[-1]
-    if processed is not None:
-        processed.columns = [col.lower().strip() for col in processed.columns]
-        processed['food'] = processed['dish name'].str.lower()
-        processed['calories'] = processed['calories (kcal)']
-        dfs.append(processed[['food', 'calories']])
-
-    combined = pd.concat(dfs, ignore_index=True)
-    combined = combined.drop_duplicates(subset='food')
-    combined['food'] = combined['food'].str.lower()
-    return combined
+        return pd.DataFrame(columns=list(columns or ["food"] + NUTRIENTS))
+
+@st.cache_resource
+def load_food_lookup():
+    """Food name and nutrients, indexed by food name for exact lookups."""
+    return load_food_catalog(("food", *NUTRIENTS)).set_index('food')
+
+@st.cache_resource
+def load_food_index():
+    """Search index over the catalog's food names, built once per process."""
+    return FoodIndex(load_food_catalog(("food",))['food'])
 
 def fetch_nutritional_info(food_name):
-    api_key = "iBOUPzaCXlEy5E4Z4qz758aWgVQobfE6ck2kSXIw"
-    url = f"https://api.nal.usda.gov/fdc/v1/foods/search?query={food_name}&api_key={api_key}"
+    """Calories, carbs, protein and fat per 100g from USDA FoodData Central (cached)."""
     try:
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('foods'):
-                nutrients = data['foods'][0].get('foodNutrients', [])
-                calories = next((item['value'] for item in nutrients if item.get('nutrientName') == 'Energy'), None)
-                carbs = next((item['value'] for item in nutrients if item.get('nutrientName') == 'Carbohydrate, by difference'), None)
-                protein = next((item['value'] for item in nutrients if item.get('nutrientName') == 'Protein'), 0)
-                fat = next((item['value'] for item in nutrients if item.get('nutrientName') == 'Total lipid (fat)'), 0)
-                return calories, carbs, protein, fat
+        result = get_usda_client().lookup(food_name)
     except Exception:
         return None, None, None, None
-    return None, None, None, None
-
-def get_user_filename(user_email):
-    """Generate a safe filename for user's meal log based on email."""
-    # Create a hash of the email for privacy and filename safety
-    email_hash = hashlib.md5(user_email.encode()).hexdigest()[:12]
-    return f"meal_log_{email_hash}.json"
+    if not result:
+        return None, None, None, None
+    return result["calories"], result["carbs"], result["protein"] or 0, result["fat"] or 0
 
 def get_user_goal_filename(user_email):
     """Generate a safe filename for user's daily goal based on email."""
     email_hash = hashlib.md5(user_email.encode()).hexdigest()[:12]
     return f"daily_goal_{email_hash}.json"
 
-def save_meal_log(meal_log, user_email):
-    """Save meal log to a JSON file for persistence for specific user."""
-    filename = get_user_filename(user_email)
+def append_meal(meal, user_email):
+    """Store one meal for specific user and return it with its id, or None on failure."""
     try:
-        # Create user_data directory if it doesn't exist
-        os.makedirs("user_data", exist_ok=True)
-        filepath = os.path.join("user_data", filename)
-        
-        with open(filepath, "w") as f:
-            # Convert datetime to string for JSON serialization
-            serializable_log = []
-            for meal in meal_log:
-                meal_copy = meal.copy()
-                if isinstance(meal_copy['timestamp'], datetime):
-                    meal_copy['timestamp'] = meal_copy['timestamp'].isoformat()
-                serializable_log.append(meal_copy)
-            json.dump(serializable_log, f)
+        return get_db().add("meals", user_email, meal)
     except Exception as e:
         st.error(f"Failed to save meal log: {e}")
+        return None
 
-def load_meal_log(user_email):
-    """Load meal log from a JSON file for specific user."""
-    filename = get_user_filename(user_email)
-    filepath = os.path.join("user_data", filename)
-    
+def delete_meal(meal_id, user_email):
+    """Remove one meal from the user's log."""
     try:
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                data = json.load(f)
-                # Convert timestamp strings back to datetime
-                for meal in data:
-                    if isinstance(meal['timestamp'], str):
-                        try:
-                            meal['timestamp'] = datetime.fromisoformat(meal['timestamp'])
-                        except ValueError:
-                            # Fallback for different datetime formats
-                            meal['timestamp'] = pd.to_datetime(meal['timestamp'])
-                return data
-        return []
+        get_db().delete("meals", user_email, meal_id)
+    except Exception as e:
+        st.error(f"Failed to save meal log: {e}")
+
+def clear_meal_log(user_email):
+    """Remove every meal from the user's log."""
+    try:
+        get_db().clear("meals", user_email)
+    except Exception as e:
+        st.error(f"Failed to save meal log: {e}")
+
+def load_meal_log(user_email, start=None, end=None, **kwargs):
+    """Load meals for specific user, optionally only those between the start and end dates (IST, inclusive)."""
+    try:
+        data = get_db().query("meals", user_email, start, end, **kwargs)
+        # Convert timestamp strings back to datetime
+        for meal in data:
+            if isinstance(meal['timestamp'], str):
+                try:
+                    meal['timestamp'] = datetime.fromisoformat(meal['timestamp'])
+                except ValueError:
+                    # Fallback for different datetime formats
+                    meal['timestamp'] = pd.to_datetime(meal['timestamp'])
+        return data
     except Exception as e:
         st.error(f"Failed to load meal log: {e}")
         return []
@@ -199,13 +169,9 @@ def get_current_user():
 def initialize_user_session(user_email):
     """Initialize session state for user-specific data."""
     user_session_key = f"daily_goal_{user_email}"
-    meal_log_key = f"meal_log_{user_email}"
     
     if user_session_key not in st.session_state:
         st.session_state[user_session_key] = load_daily_goal(user_email)
-    
-    if meal_log_key not in st.session_state:
-        st.session_state[meal_log_key] = load_meal_log(user_email)
 
 def app():
     # Get current user
@@ -214,13 +180,8 @@ def app():
     # Initialize user-specific session data
     initialize_user_session(current_user)
     
-    # Load datasets
-    pred_food, daily_nutrition, indian_food, indian_food1, full_nutrition, indian_processed = load_datasets()
-    food_df = merge_datasets(pred_food, daily_nutrition, indian_food, indian_food1, full_nutrition, indian_processed)
-
     # User-specific session keys
     user_goal_key = f"daily_goal_{current_user}"
-    user_meal_log_key = f"meal_log_{current_user}"
 
     st.markdown(st_style, unsafe_allow_html=True)
     st.markdown(head, unsafe_allow_html=True)
@@ -260,12 +221,11 @@ def app():
     typed_food = st.text_input("Type to search food").strip().lower()
 
     if typed_food:
-        matched_foods = food_df[food_df['food'].str.contains(typed_food, na=False)]
-        matched_list = matched_foods['food'].tolist()
+        matched_list = load_food_index().search(typed_food, limit=50)
         if matched_list:
-            # Add "None" option to allow API usage
+            # Add "None" option to allow API usage; the best local match is preselected
             options = ["None"] + matched_list
-            selected_food_option = st.selectbox("Select a matching food", options)
+            selected_food_option = st.selectbox("Select a matching food", options, index=1)
             if selected_food_option == "None":
                 selected_food = None
             else:
@@ -296,26 +256,30 @@ def app():
         if not typed_food:
             st.error("Please type a food name to log.")
         elif selected_food:
-            best_match = food_df[food_df['food'] == selected_food].iloc[0]
-            calories = best_match["calories"] * (total_quantity / 100)
-            st.session_state[user_meal_log_key].append({
+            # Exact-name lookup through the catalog's food index, not a column scan
+            best_match = load_food_lookup().loc[selected_food]
+            # Catalog values are per 100g; missing nutrients count as 0
+            per_100g = {k: float(best_match[k]) if pd.notna(best_match[k]) else 0.0 for k in NUTRIENTS}
+            calories = per_100g["calories"] * (total_quantity / 100)
+            append_meal({
                 "timestamp": datetime.now(IST),
                 "meal_time": meal_time,
-                "food": best_match["food"],
+                "food": selected_food,
                 "quantity": total_quantity,
                 "calories": round(calories, 2),
-                "carbs": 0,
-                "protein": 0,
-                "fat": 0,
+                "carbs": round(per_100g["carbs"] * (total_quantity / 100), 2),
+                "protein": round(per_100g["protein"] * (total_quantity / 100), 2),
+                "fat": round(per_100g["fat"] * (total_quantity / 100), 2),
+                "sugar": round(per_100g["sugar"] * (total_quantity / 100), 2) if pd.notna(best_match["sugar"]) else None,
+                "fiber": round(per_100g["fiber"] * (total_quantity / 100), 2) if pd.notna(best_match["fiber"]) else None,
                 "source": "dataset"
-            })
-            save_meal_log(st.session_state[user_meal_log_key], current_user)
-            st.success(f"Added {num_pieces} piece(s) ({total_quantity}g) of {best_match['food']} with {calories:.2f} kcal.")
+            }, current_user)
+            st.success(f"Added {num_pieces} piece(s) ({total_quantity}g) of {selected_food} with {calories:.2f} kcal.")
         else:
             cal, carbs, protein, fat = fetch_nutritional_info(typed_food)
             if cal and carbs is not None:
                 total_calories = cal * (total_quantity / 100)
-                st.session_state[user_meal_log_key].append({
+                append_meal({
                     "timestamp": datetime.now(IST),
                     "meal_time": meal_time,
                     "food": typed_food,
@@ -325,8 +289,7 @@ def app():
                     "protein": round(protein * (total_quantity / 100), 2),
                     "fat": round(fat * (total_quantity / 100), 2),
                     "source": "API"
-                })
-                save_meal_log(st.session_state[user_meal_log_key], current_user)
+                }, current_user)
                 st.success(f"Added {num_pieces} piece(s) ({total_quantity}g) of {typed_food} = {total_calories:.2f} kcal.")
             else:
                 st.warning("Food not found in database or API. Please enter nutrition manually.")
@@ -335,7 +298,7 @@ def app():
                 protein_input = st.number_input("Protein per 100g", min_value=0.0, key="manual_protein")
                 fat_input = st.number_input("Fat per 100g", min_value=0.0, key="manual_fat")
                 if calories_input > 0:
-                    st.session_state[user_meal_log_key].append({
+                    append_meal({
                         "timestamp": datetime.now(IST),
                         "meal_time": meal_time,
                         "food": typed_food,
@@ -345,157 +308,140 @@ def app():
                         "protein": round(protein_input * (total_quantity / 100), 2),
                         "fat": round(fat_input * (total_quantity / 100), 2),
                         "source": "manual"
-                    })
-                    save_meal_log(st.session_state[user_meal_log_key], current_user)
+                    }, current_user)
                     st.success(f"Added {num_pieces} piece(s) ({total_quantity}g) of {typed_food} manually.")
                 else:
                     st.info("Enter calories to log manually.")
 
     if st.button("Clear All Logged Meals"):
-        st.session_state[user_meal_log_key] = []
-        save_meal_log(st.session_state[user_meal_log_key], current_user)
+        clear_meal_log(current_user)
         st.success("All logged meals cleared.")
 
     st.markdown("### 📅 Calendar View")
     selected_date = st.date_input("Select a date to view logged meals", value=date.today())
 
-    if st.session_state[user_meal_log_key]:
-        df = pd.DataFrame(st.session_state[user_meal_log_key])
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df_selected_date = df[df['timestamp'].dt.date == selected_date]
-
-        if df_selected_date.empty:
-            st.info(f"No meals logged for {selected_date.strftime('%Y-%m-%d')}.")
-        else:
-            st.subheader(f"Meals for {selected_date.strftime('%Y-%m-%d')}")
-            st.dataframe(df_selected_date[["timestamp", "meal_time", "food", "quantity", "calories"]].sort_values("timestamp", ascending=False))
+    # Only the selected day's meals are read
+    selected_meals = load_meal_log(current_user, selected_date, selected_date)
+    if selected_meals:
+        df_selected_date = pd.DataFrame(selected_meals)
+        df_selected_date['timestamp'] = pd.to_datetime(df_selected_date['timestamp'])
+        st.subheader(f"Meals for {selected_date.strftime('%Y-%m-%d')}")
+        st.dataframe(df_selected_date[["timestamp", "meal_time", "food", "quantity", "calories"]].sort_values("timestamp", ascending=False))
     else:
-        st.info("No meals logged yet.")
+        st.info(f"No meals logged for {selected_date.strftime('%Y-%m-%d')}.")
 
     st.markdown("### 📊 Daily Summary")
-    if st.session_state[user_meal_log_key]:
-        df = pd.DataFrame(st.session_state[user_meal_log_key])
+    # Today's meals are listed individually; totals and the weekly trend come
+    # from the per-day rollup, so the cost depends on the days shown only
+    week_start, today_ist = last_days(7)
+    today_meals = load_meal_log(current_user, today_ist, today_ist)
+    if today_meals:
+        df_today = pd.DataFrame(today_meals)
         
         # Convert timestamp to datetime with proper IST handling
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df_today['timestamp'] = pd.to_datetime(df_today['timestamp'], errors='coerce')
         
         # Handle timezone conversion properly
-        if not df.empty:
-            if df['timestamp'].dt.tz is None:
-                # If no timezone, assume it's already in IST
-                df['timestamp'] = df['timestamp'].dt.tz_localize(IST, errors='coerce')
-            else:
-                # Convert to IST
-                df['timestamp'] = df['timestamp'].dt.tz_convert(IST)
-        
-        # Get today's date in IST
-        today_ist = datetime.now(IST).date()
-        df_today = df[df['timestamp'].dt.date == today_ist]
-
-        if df_today.empty:
-            st.info("No meals logged for today.")
+        if df_today['timestamp'].dt.tz is None:
+            # If no timezone, assume it's already in IST
+            df_today['timestamp'] = df_today['timestamp'].dt.tz_localize(IST)
         else:
-            st.subheader("Today's Logged Meals")
-            # Display table with "Clear This" button for each entry
-            for i, row in df_today.sort_values("timestamp", ascending=False).iterrows():
-                cols = st.columns([2, 2, 2, 2, 1])
-                with cols[0]:
-                    st.write(row["timestamp"].strftime("%Y-%m-%d %H:%M:%S"))
-                with cols[1]:
-                    st.write(row["meal_time"])
-                with cols[2]:
-                    st.write(row["food"])
-                with cols[3]:
-                    st.write(f"{row['quantity']}g, {row['calories']} kcal")
-                with cols[4]:
-                    if st.button("Clear This", key=f"clear_{i}"):
-                        st.session_state[user_meal_log_key] = [meal for j, meal in enumerate(st.session_state[user_meal_log_key]) if j != i]
-                        save_meal_log(st.session_state[user_meal_log_key], current_user)
-                        st.success(f"Removed {row['food']} from log.")
-                        st.rerun()
-
-            total_calories = df_today["calories"].sum()
-            total_carbs = df_today["carbs"].sum() if "carbs" in df_today.columns else 0
-            total_protein = df_today["protein"].sum() if "protein" in df_today.columns else 0
-            total_fat = df_today["fat"].sum() if "fat" in df_today.columns else 0
-
-            # Enhanced calorie goal display with color-coded progress
-            col1, col2, col3 = st.columns([3, 1, 1])
-            with col1:
-                st.markdown(
-                    f"<h3 style='color: {'green' if total_calories <= st.session_state[user_goal_key] else 'red'};'>Calories Consumed: {total_calories:.2f} kcal</h3>", 
-                    unsafe_allow_html=True
-                )
-                progress = min(total_calories / st.session_state[user_goal_key], 1.0)
-                st.progress(progress)
-            with col2:
-                st.metric("Daily Calorie Goal", f"{st.session_state[user_goal_key]} kcal")
-            with col3:
-                st.metric("Remaining Calories", f"{max(st.session_state[user_goal_key] - total_calories, 0):.2f} kcal")
-
-            # Macronutrient Pie Chart
-            nutrients = {
-                "Carbohydrates": total_carbs,
-                "Proteins": total_protein,
-                "Fats": total_fat,
-            }
-            nutrients = {k: v for k, v in nutrients.items() if v and not pd.isna(v)}
-
-            if nutrients:
-                fig, ax = plt.subplots()
-                ax.pie(
-                    list(nutrients.values()),
-                    labels=list(nutrients.keys()),
-                    autopct="%1.1f%%",
-                    startangle=90,
-                    colors=['#66b3ff', '#99ff99', '#ffcc99']
-                )
-                ax.axis('equal')
-                st.pyplot(fig)
-
-            st.markdown("#### Calories Consumed per Meal Time")
-            calories_mealtime = df_today.groupby("meal_time")["calories"].sum().reindex(["Breakfast", "Lunch", "Dinner", "Snack"]).fillna(0)
-            fig2, ax2 = plt.subplots()
-            ax2.bar(calories_mealtime.index, calories_mealtime.values, color='#4a90e2')
-            ax2.set_ylabel("Calories (kcal)")
-            ax2.set_xlabel("Meal Time")
-            ax2.set_ylim(0, max(calories_mealtime.values.max() * 1.2, st.session_state[user_goal_key] * 0.3))
-            st.pyplot(fig2)
-
-            st.markdown("#### Weekly Calories Consumed Trend (Last 7 Days)")
-            today = datetime.now(IST).date()
-            past_week = [today - timedelta(days=i) for i in range(6, -1, -1)]  # 7 days ascending
-
-            # Simplified date handling for weekly trend
-            df['date_only'] = df['timestamp'].dt.date
-
-            # Group by date_only and sum calories
-            weekly_calories = df.groupby('date_only')['calories'].sum()
-            # Reindex to ensure every day is present (missing days will be zero)
-            weekly_calories = weekly_calories.reindex(past_week, fill_value=0)
-
-            fig3, ax3 = plt.subplots()
-            ax3.plot(past_week, weekly_calories.values, marker='o', linestyle='-', color='#ff7f0e')
-            ax3.set_title("Calories Consumed Over Past 7 Days")
-            ax3.set_ylabel("Calories (kcal)")
-            ax3.set_xlabel("Date")
-            ax3.set_xticks(past_week)
-            ax3.set_xticklabels([d.strftime("%a %d") for d in past_week], rotation=45)
-            ax3.axhline(st.session_state[user_goal_key], color='green', linestyle='--', label='Daily Goal')
-            ax3.legend()
-            st.pyplot(fig3)
-
-            # Button to generate PDF report
-            if st.button("Download Daily Report PDF"):
-                pdf_bytes = generate_pdf_report(df_today.to_dict('records'), st.session_state[user_goal_key], current_user)
-                st.download_button(
-                    label="Download PDF",
-                    data=pdf_bytes,
-                    file_name=f"diet_report_{current_user.replace('@', '_')}_{date.today()}.pdf",
-                    mime="application/pdf"
-                )
+            # Convert to IST
+            df_today['timestamp'] = df_today['timestamp'].dt.tz_convert(IST)
+
+        st.subheader("Today's Logged Meals")
+        # Display table with "Clear This" button for each entry
+        for _, row in df_today.sort_values("timestamp", ascending=False).iterrows():
+            cols = st.columns([2, 2, 2, 2, 1])
+            with cols[0]:
+                st.write(row["timestamp"].strftime("%Y-%m-%d %H:%M:%S"))
+            with cols[1]:
+                st.write(row["meal_time"])
+            with cols[2]:
+                st.write(row["food"])
+            with cols[3]:
+                st.write(f"{row['quantity']}g, {row['calories']} kcal")
+            with cols[4]:
+                if st.button("Clear This", key=f"clear_{row['id']}"):
+                    delete_meal(row["id"], current_user)
+                    st.success(f"Removed {row['food']} from log.")
+                    st.rerun()
+
+        rollup = get_db().rollup(current_user, week_start, today_ist)
+        total_calories = rollup.at[today_ist, "calories_in"]
+        total_carbs = rollup.at[today_ist, "carbs"]
+        total_protein = rollup.at[today_ist, "protein"]
+        total_fat = rollup.at[today_ist, "fat"]
+
+        # Enhanced calorie goal display with color-coded progress
+        col1, col2, col3 = st.columns([3, 1, 1])
+        with col1:
+            st.markdown(
+                f"<h3 style='color: {'green' if total_calories <= st.session_state[user_goal_key] else 'red'};'>Calories Consumed: {total_calories:.2f} kcal</h3>", 
+                unsafe_allow_html=True
+            )
+            progress = min(total_calories / st.session_state[user_goal_key], 1.0)
+            st.progress(progress)
+        with col2:
+            st.metric("Daily Calorie Goal", f"{st.session_state[user_goal_key]} kcal")
+        with col3:
+            st.metric("Remaining Calories", f"{max(st.session_state[user_goal_key] - total_calories, 0):.2f} kcal")
+
+        # Macronutrient Pie Chart
+        nutrients = {
+            "Carbohydrates": total_carbs,
+            "Proteins": total_protein,
+            "Fats": total_fat,
+        }
+        nutrients = {k: v for k, v in nutrients.items() if v and not pd.isna(v)}
+
+        if nutrients:
+            fig, ax = plt.subplots()
+            ax.pie(
+                list(nutrients.values()),
+                labels=list(nutrients.keys()),
+                autopct="%1.1f%%",
+                startangle=90,
+                colors=['#66b3ff', '#99ff99', '#ffcc99']
+            )
+            ax.axis('equal')
+            st.pyplot(fig)
+
+        st.markdown("#### Calories Consumed per Meal Time")
+        calories_mealtime = df_today.groupby("meal_time")["calories"].sum().reindex(["Breakfast", "Lunch", "Dinner", "Snack"]).fillna(0)
+        fig2, ax2 = plt.subplots()
+        ax2.bar(calories_mealtime.index, calories_mealtime.values, color='#4a90e2')
+        ax2.set_ylabel("Calories (kcal)")
+        ax2.set_xlabel("Meal Time")
+        ax2.set_ylim(0, max(calories_mealtime.values.max() * 1.2, st.session_state[user_goal_key] * 0.3))
+        st.pyplot(fig2)
+
+        st.markdown("#### Weekly Calories Consumed Trend (Last 7 Days)")
+        past_week = list(rollup.index)  # 7 days ascending, missing days are zero
+        weekly_calories = rollup['calories_in']
+
+        fig3, ax3 = plt.subplots()
+        ax3.plot(past_week, weekly_calories.values, marker='o', linestyle='-', color='#ff7f0e')
+        ax3.set_title("Calories Consumed Over Past 7 Days")
+        ax3.set_ylabel("Calories (kcal)")
+        ax3.set_xlabel("Date")
+        ax3.set_xticks(past_week)
+        ax3.set_xticklabels([d.strftime("%a %d") for d in past_week], rotation=45)
+        ax3.axhline(st.session_state[user_goal_key], color='green', linestyle='--', label='Daily Goal')
+        ax3.legend()
+        st.pyplot(fig3)
+
+        # Button to generate PDF report
+        if st.button("Download Daily Report PDF"):
+            pdf_bytes = generate_pdf_report(df_today.to_dict('records'), st.session_state[user_goal_key], current_user)
+            st.download_button(
+                label="Download PDF",
+                data=pdf_bytes,
+                file_name=f"diet_report_{current_user.replace('@', '_')}_{date.today()}.pdf",
+                mime="application/pdf"
+            )
     else:
-        st.info("No meals logged yet today.")
+        st.info("No meals logged for today.")
 
 if __name__ == "__main__":
     app()
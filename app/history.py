@@ -4,6 +4,9 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 from data.base import st_style, head
 from supabase_client import supabase
+from functions.users import PROFILE_FIELDS, SECURITY_FIELDS, get_user, update_user
+from functions.predictions import HISTORY_COLUMNS, LABELS, HistoryPager, iter_csv
+from functions.write_queue import get_write_queue
 
 IST = ZoneInfo("Asia/Kolkata")
 
@@ -20,9 +23,10 @@ SECURITY_QUESTIONS = [
     "What was your dream job as a child?"
 ]
 
-def get_user_by_email(email):
-    response = supabase.table("users").select("*").eq("email", email).execute()
-    return response.data[0] if response.data else None
+def reset_history_cache():
+    """Forget fetched history pages and any prepared export, e.g. after a prediction is added."""
+    for key in ('history_filters', 'history_pager', 'history_page', 'history_csv'):
+        st.session_state.pop(key, None)
 
 def history_section():
     st.markdown("### 🕓 Prediction History")
@@ -35,41 +39,70 @@ def history_section():
     
     email = user['email']
 
+    # Pager for the chosen filters; its fetched pages live in the session
+    col1, col2 = st.columns(2)
+    with col1:
+        date_range = st.date_input("Date range", value=(), key="history_dates")
+    with col2:
+        label = st.selectbox("Prediction", ["All"] + LABELS, key="history_label")
+    start, end = (date_range[0], date_range[-1]) if len(date_range) else (None, None)
+    filters = (email, start, end, None if label == "All" else label)
+    # Predictions made moments ago may still be on their way to Supabase;
+    # fetched pages are not kept until they have arrived
+    pending = get_write_queue().pending("predictions", email)
+    if pending:
+        st.caption(f"⏳ {pending} new prediction(s) still being saved.")
+    if st.session_state.get('history_filters') != filters:
+        st.session_state['history_filters'] = filters
+        st.session_state['history_pager'] = HistoryPager(supabase, *filters)
+        st.session_state['history_page'] = 0
+        st.session_state.pop('history_csv', None)
+    elif pending:
+        st.session_state['history_pager'] = HistoryPager(supabase, *filters)
+    pager = st.session_state['history_pager']
+    page_index = st.session_state['history_page']
+
     try:
-        response = (
-            supabase.table("predictions")
-            .select("*")
-            .eq("user_email", email)
-            .order("timestamp", desc=True)
-            .execute()
-        )
-        history_data = response.data
-        if history_data:
-            history_df = pd.DataFrame(history_data)
-            history_df['timestamp'] = pd.to_datetime(history_df['timestamp']).dt.tz_convert(IST)
-            st.dataframe(
-                history_df[[
-                    'timestamp', 'pregnancies', 'glucose', 'blood_pressure',
-                    'skin_thickness', 'insulin', 'bmi',
-                    'diabetes_pedigree_function', 'age', 'risk_percent', 'prediction'
-                ]],
-                use_container_width=True
-            )
+        rows = pager.page(page_index)
+        if rows:
+            history_df = pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+            history_df['timestamp'] = pd.to_datetime(history_df['timestamp'], utc=True).dt.tz_convert(IST)
+            st.dataframe(history_df, use_container_width=True)
 
-            csv = history_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="📥 Download History as CSV",
-                data=csv,
-                file_name="prediction_history.csv",
-                mime="text/csv"
-            )
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("⬅️ Newer", disabled=page_index == 0, key="history_newer"):
+                    st.session_state['history_page'] -= 1
+                    st.rerun()
+            with col2:
+                st.caption(f"Page {page_index + 1} · {pager.page_size} records per page")
+            with col3:
+                if st.button("Older ➡️", disabled=not pager.has_next(page_index), key="history_older"):
+                    st.session_state['history_page'] += 1
+                    st.rerun()
+
+            # The export reads every matching record, so it is only built on request
+            if st.button("📄 Prepare CSV Export", key="history_export"):
+                st.session_state['history_csv'] = "".join(iter_csv(supabase, *filters)).encode('utf-8')
+            if st.session_state.get('history_csv'):
+                st.download_button(
+                    label="📥 Download History as CSV",
+                    data=st.session_state['history_csv'],
+                    file_name="prediction_history.csv",
+                    mime="text/csv"
+                )
 
             if st.button("🗑️ Clear History"):
+                # Unsent predictions first, or the sender would add them back after the delete
+                get_write_queue().discard(email, "predictions")
                 supabase.table("predictions").delete().eq("user_email", email).execute()
+                reset_history_cache()
                 st.success("✅ Prediction history cleared successfully.")
                 st.experimental_rerun()
-        else:
+        elif page_index == 0 and filters[1:] == (None, None, None):
             st.info("No prediction history found yet. Make a prediction to start building history.")
+        else:
+            st.info("No predictions match these filters.")
     except Exception as e:
         st.error(f"Failed to load history: {str(e)}")
 
@@ -84,10 +117,9 @@ def profile_section():
 
     email = user['email']
 
-    # Always fetch fresh data here for display when not editing
     if not st.session_state.get('profile_edit_mode', False):
-        # Fetch fresh user data from DB to avoid stale data
-        user_data = get_user_by_email(email)
+        # Session-cached row, kept current by update_user
+        user_data = get_user(email, PROFILE_FIELDS)
         if not user_data:
             st.error("User data not found in database. Please contact support.")
             return
@@ -129,9 +161,8 @@ def profile_section():
                         "height": st.session_state['profile_height'],
                         "weight": st.session_state['profile_weight']
                     }
-                    supabase.table("users").update(update_data).eq("email", email).execute()
-                    # Refresh user info in session state after update
-                    st.session_state['current_user'] = get_user_by_email(email)
+                    # Also refreshes the cached row and current_user
+                    update_user(email, update_data)
                     st.session_state['profile_edit_mode'] = False
                     st.success("Profile updated successfully!")
                     st.experimental_rerun()
@@ -154,7 +185,7 @@ def security_section():
 
     email = user['email']
 
-    user_data = get_user_by_email(email)
+    user_data = get_user(email, SECURITY_FIELDS)
     if not user_data:
         st.error("User data not found in database. Please contact support.")
         return
@@ -201,8 +232,7 @@ def security_section():
                         st.error("New passwords do not match.")
                         return
                     try:
-                        supabase.table("users").update({"password": new_password}).eq("email", email).execute()
-                        st.session_state['current_user'] = get_user_by_email(email)
+                        update_user(email, {"password": new_password})
                         st.session_state['security_password_verified'] = False
                         st.success("Password updated successfully!")
                         st.experimental_rerun()
@@ -242,10 +272,9 @@ def security_section():
                         st.error("Please answer all selected security questions.")
                         return
                     try:
-                        supabase.table("users").update({
+                        update_user(email, {
                             "security_questions": dict(zip(new_questions, new_answers))
-                        }).eq("email", email).execute()
-                        st.session_state['current_user'] = get_user_by_email(email)
+                        })
                         st.session_state['security_password_verified'] = False
                         st.session_state['security_questions'] = new_questions
                         st.session_state['security_answers'] = new_answers
@@ -269,6 +298,11 @@ def app():
     st.title("⚙️ Settings")
     st.markdown("Manage your prediction history, profile, and security settings.")
 
+    # One query for everything the Profile and Security tabs read
+    user = st.session_state.get('current_user')
+    if user and user.get('email'):
+        get_user(user['email'], PROFILE_FIELDS + SECURITY_FIELDS)
+
     tabs = st.tabs(["History", "Profile", "Security"])
 
     with tabs[0]:
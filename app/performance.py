@@ -2,10 +2,8 @@
 
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import accuracy_score, confusion_matrix, classification_report
-from loader import model, df
+from functions.evaluation import load_report
+from functions.registry import artifact_stats
 from data.base import st_style, head
 
 def app():
@@ -15,31 +13,38 @@ def app():
     st.title("📊 Model Performance")
 
     try:
-        X = df.drop("Outcome", axis=1)
-        y = df["Outcome"]
-
-        # Make predictions
-        y_pred = model.predict(X)
+        # Precomputed once per model version on the held-out split (see evaluate.py)
+        report, paths = load_report()
+        st.caption(f"Evaluated on a held-out test set of {report['split']['n_test']} records.")
 
         # Accuracy
-        accuracy = accuracy_score(y, y_pred)
         st.subheader("✅ Accuracy")
-        st.metric("Model Accuracy", f"{accuracy * 100:.2f}%")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Model Accuracy", f"{report['accuracy'] * 100:.2f}%")
+        col2.metric("ROC AUC", f"{report['roc']['auc']:.3f}")
+        col3.metric("Average Precision", f"{report['pr']['average_precision']:.3f}")
 
         # Confusion Matrix
         st.subheader("🧩 Confusion Matrix")
-        cm = confusion_matrix(y, y_pred)
-        fig, ax = plt.subplots()
-        sns.heatmap(cm, annot=True, fmt="d", cmap="Purples", xticklabels=["No Diabetes", "Diabetes"], yticklabels=["No Diabetes", "Diabetes"])
-        ax.set_xlabel("Predicted")
-        ax.set_ylabel("Actual")
-        st.pyplot(fig)
+        st.image(paths["confusion_png"])
 
         # Classification Report
         st.subheader("📋 Classification Report")
-        report = classification_report(y, y_pred, output_dict=True)
-        st.dataframe(pd.DataFrame(report).transpose(), use_container_width=True)
+        st.dataframe(pd.DataFrame(report["classification_report"]).transpose(), use_container_width=True)
+
+        # ROC / PR curves
+        st.subheader("📈 ROC and Precision-Recall Curves")
+        st.image(paths["curves_png"])
 
     except Exception as e:
         st.error(f"An error occurred while computing performance metrics: {e}")
 
+    # Artifacts shared by all sessions in this process
+    with st.expander("🗂️ Loaded Artifacts"):
+        stats = artifact_stats()
+        if stats:
+            stats_df = pd.DataFrame(stats).transpose()
+            stats_df["rss_mb"] = (stats_df["rss_bytes"] / 1e6).round(2)
+            st.dataframe(stats_df[["path", "load_seconds", "rss_mb"]], use_container_width=True)
+        else:
+            st.info("No artifacts loaded yet.")
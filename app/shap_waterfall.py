@@ -1,21 +1,14 @@
 # app/shap_waterfall.py
 
 import streamlit as st
-import shap
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
-from sklearn.inspection import permutation_importance
-from loader import model, df  # df = full dataset
+from functions.importance import load_importance
+from functions.explainer import explain  # also applies the numpy shim SHAP needs
+import shap
 from data.base import st_style, head
 
-# Fix deprecated numpy types for compatibility with SHAP
-import numpy as np
-if not hasattr(np, 'bool'):
-    np.bool = bool
-if not hasattr(np, 'int'):
-    np.int = int
-
 def app(input_data=None):
     st.markdown(st_style, unsafe_allow_html=True)
     st.markdown(head, unsafe_allow_html=True)
@@ -42,11 +35,8 @@ def app(input_data=None):
     # SHAP Waterfall Plot
     st.markdown("### 🔍 SHAP Waterfall Plot (Feature Impact)")
     try:
-        X_train = df.drop("Outcome", axis=1)
-
-        # Create SHAP explainer
-        explainer = shap.Explainer(model.predict_proba, X_train)
-        shap_values = explainer(input_df)
+        # Cached TreeExplainer, memoized per input
+        shap_values = explain(input_df)
 
         fig, ax = plt.subplots(figsize=(10, 5))
         shap.plots.waterfall(shap_values[0, :, 1], max_display=10, show=False)
@@ -68,14 +58,8 @@ def app(input_data=None):
     st.divider()
     st.markdown("### 📊 Permutation Feature Importance")
     try:
-        X = df.drop("Outcome", axis=1)
-        y = df["Outcome"]
-
-        result = permutation_importance(model, X, y, n_repeats=5, random_state=42)
-        perm_df = pd.DataFrame({
-            "Feature": X.columns,
-            "Importance": result.importances_mean
-        }).sort_values(by="Importance", ascending=False)
+        # Precomputed by importance.py; rebuilt only when the model or data changes
+        perm_df = load_importance()
 
         fig = px.bar(
             perm_df,
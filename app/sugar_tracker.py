@@ -1,23 +1,24 @@
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-import os
-import json
-from datetime import datetime, date, time
-import google.generativeai as genai
+from datetime import datetime, date, timedelta
 
 # Import functions from other modules
-from app.diet_tracker import load_meal_log, get_current_user
-from app.history import get_user_by_email  # Import user data function
+from app.diet_tracker import load_meal_log, get_current_user, load_food_lookup
+from functions.sugar_lookup import resolve_sugar
+from functions.llm import get_gemini_model
+from functions.health_db import get_db, last_days, to_ist, today_ist
+from functions.users import get_user
+
+# Days of readings loaded for the history chart; the latest readings and the
+# export are read from the database separately
+HISTORY_DAYS = 90
 
 # --- OpenAI API Setup with Secure Key Management ---
 def get_gemini_client():
     """Securely initialize Gemini client using Streamlit secrets."""
     try:
-        api_key = st.secrets["gemini"]["api_key"]
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        return model
+        return get_gemini_model(st.secrets["gemini"]["api_key"])
     except KeyError:
         st.error("❌ Gemini API key not found in secrets. Please configure your API key in Streamlit secrets.")
         st.stop()
@@ -25,56 +26,36 @@ def get_gemini_client():
         st.error(f"❌ Error initializing Gemini client: {str(e)}")
         st.stop()
 
-# Initialize Gemini client
-gemini_model = get_gemini_client()
 
 
-# --- File Helper Functions ---
-def get_user_sugar_filename(user_email):
-    """Generate a safe filename for user's sugar log based on email."""
-    import hashlib
-    email_hash = hashlib.md5(user_email.encode()).hexdigest()[:12]
-    return f"sugar_log_{email_hash}.json"
+# --- Storage Helper Functions ---
+def append_sugar_reading(entry, user_email):
+    """Store one sugar reading for specific user."""
+    try:
+        get_db().add("sugar_readings", user_email, entry)
+    except Exception as e:
+        st.error(f"Failed to save sugar log: {e}")
 
-def save_sugar_log(sugar_log, user_email):
-    """Save sugar log to a JSON file for persistence for specific user."""
-    filename = get_user_sugar_filename(user_email)
+def clear_sugar_log(user_email):
+    """Remove every sugar reading from the user's log."""
     try:
-        os.makedirs("user_data", exist_ok=True)
-        filepath = os.path.join("user_data", filename)
-        
-        # Convert datetime to string for JSON serialization
-        serializable_log = []
-        for entry in sugar_log:
-            entry_copy = entry.copy()
-            if isinstance(entry_copy['timestamp'], datetime):
-                entry_copy['timestamp'] = entry_copy['timestamp'].isoformat()
-            serializable_log.append(entry_copy)
-        
-        with open(filepath, "w") as f:
-            json.dump(serializable_log, f)
+        get_db().clear("sugar_readings", user_email)
     except Exception as e:
         st.error(f"Failed to save sugar log: {e}")
 
-def load_sugar_log(user_email):
-    """Load sugar log from a JSON file for specific user."""
-    filename = get_user_sugar_filename(user_email)
-    filepath = os.path.join("user_data", filename)
-    
+def load_sugar_log(user_email, start=None, end=None, **kwargs):
+    """Load sugar readings for specific user in time order, optionally only those between start and end."""
     try:
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                data = json.load(f)
-                # Convert timestamp strings back to datetime
-                for entry in data:
-                    if isinstance(entry['timestamp'], str):
-                        try:
-                            entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
-                        except ValueError:
-                            # Fallback for different datetime formats
-                            entry['timestamp'] = pd.to_datetime(entry['timestamp'])
-                return data
-        return []
+        data = get_db().query("sugar_readings", user_email, start, end, **kwargs)
+        # Convert timestamp strings back to datetime
+        for entry in data:
+            if isinstance(entry['timestamp'], str):
+                try:
+                    entry['timestamp'] = datetime.fromisoformat(entry['timestamp'])
+                except ValueError:
+                    # Fallback for different datetime formats
+                    entry['timestamp'] = pd.to_datetime(entry['timestamp'])
+        return data
     except Exception as e:
         st.error(f"Failed to load sugar log: {e}")
         return []
@@ -134,114 +115,52 @@ def detect_spike_downfall(sugar_log, food_log, window_minutes=120):
     else:
         return "stable", delta, recent_foods
 
-def get_sugar_trend_analysis(sugar_log, days=7):
+def get_sugar_trend_analysis(user_email, days=7):
     """Analyze sugar trends over the past few days."""
-    if not sugar_log:
+    start, end = last_days(days)
+    # Per-day counts, extremes and totals come from the daily rollup
+    rollup = get_db().rollup(user_email, start, end)
+    readings_count = int(rollup['reading_count'].sum())
+    if readings_count == 0:
         return None
     
-    df = pd.DataFrame(sugar_log)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df = df.sort_values('timestamp')
-    
-    # Filter to last N days
-    cutoff_date = datetime.now() - pd.Timedelta(days=days)
-    recent_df = df[df['timestamp'] >= cutoff_date]
-    
-    if recent_df.empty:
-        return None
+    # The trend compares the latest readings with the rest of the window
+    recent_levels = [entry['sugar_level'] for entry in load_sugar_log(user_email, start, end)]
     
     analysis = {
-        'avg_sugar': recent_df['sugar_level'].mean(),
-        'max_sugar': recent_df['sugar_level'].max(),
-        'min_sugar': recent_df['sugar_level'].min(),
-        'readings_count': len(recent_df),
-        'high_readings': len(recent_df[recent_df['sugar_level'] > 140]),
-        'low_readings': len(recent_df[recent_df['sugar_level'] < 70]),
-        'trend': 'improving' if recent_df['sugar_level'].iloc[-3:].mean() < recent_df['sugar_level'].iloc[:-3].mean() else 'concerning'
+        'avg_sugar': rollup['sugar_total'].sum() / readings_count,
+        'max_sugar': rollup['sugar_max'].max(),
+        'min_sugar': rollup['sugar_min'].min(),
+        'readings_count': readings_count,
+        'high_readings': int(rollup['high_readings'].sum()),
+        'low_readings': int(rollup['low_readings'].sum()),
+        'trend': 'improving' if pd.Series(recent_levels[-3:]).mean() < pd.Series(recent_levels[:-3]).mean() else 'concerning'
     }
     
     return analysis
 
-# --- AI-Powered Sugar Content Analysis ---
-def get_sugar_content_from_api(food_name, quantity=100):
-    """Get sugar content for a food item using Gemini API."""
-    try:
-        prompt = f"""
-        Analyze the sugar content for: {food_name} (quantity: {quantity}g)
-        
-        Provide ONLY a JSON response with the following structure:
-        {{
-            "sugar_grams": <number>,
-            "total_carbs": <number>,
-            "food_category": "<category>",
-            "glycemic_impact": "<low/medium/high>"
-        }}
-        
-        Base your response on standard nutritional data. Be accurate and concise.
-        """
-        
-        response = gemini_model.generate_content(prompt)
-        
-        response_text = response.text.strip()
-        
-        # Try to parse JSON from the response
-        try:
-            import json
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                json_str = response_text[start_idx:end_idx]
-                return json.loads(json_str)
-        except:
-            pass
-        
-        # Fallback if JSON parsing fails
-        return {
-            "sugar_grams": 5.0,
-            "total_carbs": 20.0,
-            "food_category": "unknown",
-            "glycemic_impact": "medium"
-        }
-        
-    except Exception as e:
-        st.error(f"Error getting sugar content: {str(e)}")
-        return {
-            "sugar_grams": 0.0,
-            "total_carbs": 0.0,
-            "food_category": "unknown",
-            "glycemic_impact": "low"
-        }
-
-
-def analyze_daily_sugar_intake(meal_log):
-    """Analyze total sugar intake for today."""
-    if not meal_log:
+# --- Sugar Content Analysis ---
+def analyze_daily_sugar_intake(today_meals):
+    """Analyze total sugar intake for today's meals."""
+    if not today_meals:
         return {
             'total_sugar_today': 0,
             'high_sugar_foods': [],
             'sugar_breakdown': []
         }
     
-    today_meals = []
-    for meal in meal_log:
-        try:
-            meal_timestamp = pd.to_datetime(meal["timestamp"])
-            if meal_timestamp.date() == date.today():
-                today_meals.append(meal)
-        except:
-            continue
-    
     total_sugar = 0
     high_sugar_foods = []
     sugar_breakdown = []
     
-    for meal in today_meals:
-        # Get sugar content for each food
+    # Logged values and local datasets first; one batched Gemini call for the rest
+    all_sugar_data = resolve_sugar(
+        today_meals, get_gemini_client, load_food_lookup(),
+        on_error=lambda e: st.error(f"Error getting sugar content: {str(e)}")
+    )
+    
+    for meal, sugar_data in zip(today_meals, all_sugar_data):
         food_name = meal.get('food', '')
-        quantity = meal.get('quantity', 100)
-        
-        # Get sugar content from API
-        sugar_data = get_sugar_content_from_api(food_name, quantity)
         sugar_amount = sugar_data.get('sugar_grams', 0)
         
         total_sugar += sugar_amount
@@ -297,7 +216,7 @@ def get_preventive_measures(sugar_level, food_log, spike_status, delta, recent_f
     """
     
     try:
-        response = gemini_model.generate_content(prompt)
+        response = get_gemini_client().generate_content(prompt)
         return response.text.strip()
     except Exception as e:
         st.error(f"Error generating AI advice: {str(e)}")
@@ -332,14 +251,19 @@ def app():
     # Get current user
     user_email = get_current_user()
     
-    # Load user data and logs
-    sugar_log = load_sugar_log(user_email)
-    meal_log = load_meal_log(user_email)
+    # Load user data and logs: the chart's window and the latest readings, not the whole log
+    sugar_log = load_sugar_log(user_email, *last_days(HISTORY_DAYS))
+    latest_readings = load_sugar_log(user_email, limit=7, newest_first=True)[::-1]
+    export_key = f"sugar_export_{user_email}"
+    # Only today's and the most recent meals are read, not the whole meal log
+    today = today_ist()
+    today_meals = load_meal_log(user_email, today, today)
+    recent_meals = load_meal_log(user_email, limit=10, newest_first=True)[::-1]
     
     # Try to get user profile for enhanced recommendations
     user_profile = None
     try:
-        user_profile = get_user_by_email(user_email)
+        user_profile = get_user(user_email)
     except:
         pass  # Profile not available, continue without it
     
@@ -376,8 +300,8 @@ def app():
                 "sugar_level": sugar_level,
                 "notes": notes
             }
-            sugar_log.append(new_entry)
-            save_sugar_log(sugar_log, user_email)
+            append_sugar_reading(new_entry, user_email)
+            st.session_state.pop(export_key, None)
             
             # Determine status color
             status_color = "🟢" if 80 <= sugar_level <= 180 else "🟡" if sugar_level < 80 or sugar_level <= 250 else "🔴"
@@ -387,9 +311,9 @@ def app():
     # --- Daily Sugar Analysis Dashboard ---
     st.subheader("📊 Today's Sugar Intake Analysis")
     
-    if meal_log:
+    if recent_meals:
         with st.spinner("🔍 Analyzing your sugar intake..."):
-            daily_analysis = analyze_daily_sugar_intake(meal_log)
+            daily_analysis = analyze_daily_sugar_intake(today_meals)
             
             col1, col2, col3 = st.columns(3)
             
@@ -416,8 +340,8 @@ def app():
         st.info("📝 No food data available. Log meals in the Diet Tracker to see sugar analysis!")
 
     # --- Current Status Display ---
-    if sugar_log:
-        latest_entry = sugar_log[-1]
+    if latest_readings:
+        latest_entry = latest_readings[-1]
         latest_sugar = latest_entry['sugar_level']
         latest_time = latest_entry['timestamp']
         
@@ -466,7 +390,7 @@ def app():
         
         ax.set_xlabel('Time')
         ax.set_ylabel('Blood Sugar (mg/dL)')
-        ax.set_title('Blood Sugar Levels Over Time')
+        ax.set_title(f'Blood Sugar Levels (last {HISTORY_DAYS} days)')
         ax.legend()
         ax.grid(True, alpha=0.3)
         
@@ -475,10 +399,14 @@ def app():
         plt.tight_layout()
         
         st.pyplot(fig)
-        
+    
+    elif latest_readings:
+        st.info(f"📝 No blood sugar readings in the last {HISTORY_DAYS} days.")
+    
+    if latest_readings:
         # Show recent statistics
         col1, col2, col3, col4 = st.columns(4)
-        recent_readings = df.tail(7)  # Last 7 readings
+        recent_readings = pd.DataFrame(latest_readings)  # Last 7 readings
         
         with col1:
             st.metric("Average (Last 7)", f"{recent_readings['sugar_level'].mean():.1f} mg/dL")
@@ -488,27 +416,29 @@ def app():
             st.metric("Lowest (Last 7)", f"{recent_readings['sugar_level'].min():.0f} mg/dL")
         with col4:
             readings_in_range = len(recent_readings[(recent_readings['sugar_level'] >= 80) & (recent_readings['sugar_level'] <= 180)])
-            st.metric("In Range (Last 7)", f"{readings_in_range}/7")
+            st.metric("In Range (Last 7)", f"{readings_in_range}/{len(recent_readings)}")
     
     else:
         st.info("📝 No blood sugar data yet. Log your first reading above to get started!")
 
     # --- Advanced Analysis & Recommendations ---
-    if len(sugar_log) >= 2:
+    if len(latest_readings) >= 2:
         st.subheader("🧠 Personalized Insights")
         
         # Detect spikes/drops
-        spike_status, delta, recent_foods = detect_spike_downfall(sugar_log, meal_log)
+        latest_time = to_ist(latest_readings[-1]['timestamp'])
+        window_meals = load_meal_log(user_email, latest_time - timedelta(minutes=120), latest_time)
+        spike_status, delta, recent_foods = detect_spike_downfall(latest_readings, window_meals)
         
         # Get trend analysis
-        trend_analysis = get_sugar_trend_analysis(sugar_log)
+        trend_analysis = get_sugar_trend_analysis(user_email)
         
         # Generate AI recommendations
         with st.spinner("🔍 Analyzing your data..."):
             try:
                 advice = get_preventive_measures(
-                    sugar_level=sugar_log[-1]['sugar_level'],
-                    food_log=meal_log,
+                    sugar_level=latest_readings[-1]['sugar_level'],
+                    food_log=today_meals,
                     spike_status=spike_status,
                     delta=delta,
                     recent_foods=recent_foods,
@@ -520,7 +450,7 @@ def app():
                 st.success(advice)
                 
                 # Food impact analysis
-                food_impact = get_food_sugar_impact(meal_log)
+                food_impact = get_food_sugar_impact(recent_meals)
                 st.info(f"🍽️ **Food Impact Analysis:** {food_impact}")
                 
             except Exception as e:
@@ -529,19 +459,8 @@ def app():
     # --- Today's Food Log Display ---
     st.subheader("🍽️ Today's Food Log")
     
-    if meal_log:
+    if recent_meals:
         try:
-            today_meals = []
-            for m in meal_log:
-                try:
-                    # Safely convert timestamp to date
-                    meal_timestamp = pd.to_datetime(m["timestamp"])
-                    if meal_timestamp.date() == date.today():
-                        today_meals.append(m)
-                except (ValueError, TypeError, KeyError):
-                    # Skip meals with invalid timestamps
-                    continue
-            
             if today_meals:
                 df_meals = pd.DataFrame(today_meals)
                 df_meals['timestamp'] = pd.to_datetime(df_meals['timestamp'])
@@ -571,25 +490,27 @@ def app():
     col1, col2 = st.columns(2)
     
     with col1:
-        if sugar_log:
-            # Export data
-            df_export = pd.DataFrame(sugar_log)
-            csv = df_export.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Sugar Data (CSV)",
-                data=csv,
-                file_name=f"sugar_log_{user_email.replace('@', '_')}_{date.today()}.csv",
-                mime="text/csv"
-            )
+        if latest_readings:
+            # Export data; the full history is read only when an export is asked for
+            if st.button("📦 Prepare Full Sugar Export"):
+                df_export = pd.DataFrame(load_sugar_log(user_email)).drop(columns="id", errors="ignore")
+                st.session_state[export_key] = df_export.to_csv(index=False)
+            if export_key in st.session_state:
+                st.download_button(
+                    label="📥 Download Sugar Data (CSV)",
+                    data=st.session_state[export_key],
+                    file_name=f"sugar_log_{user_email.replace('@', '_')}_{date.today()}.csv",
+                    mime="text/csv"
+                )
     
     with col2:
-        if sugar_log:
+        if latest_readings:
             if st.button("🗑️ Clear All Sugar Data", type="secondary"):
                 if st.session_state.get('confirm_clear_sugar'):
                     st.session_state['confirm_clear_sugar'] = False
                     # Clear the data
-                    sugar_log.clear()
-                    save_sugar_log(sugar_log, user_email)
+                    clear_sugar_log(user_email)
+                    st.session_state.pop(export_key, None)
                     st.success("All sugar data cleared!")
                     st.rerun()
                 else:
@@ -1,20 +1,12 @@
 import streamlit as st
 import pandas as pd
-import joblib
-import os
 from datetime import datetime
 from functions.function import make_donut
 from data.base import st_style, head
-from supabase_client import supabase
-
-MODEL_PATH = os.path.join("datasets", "diabetes_model.pkl")
-
-model = joblib.load(MODEL_PATH)
-
-def get_user_by_email(email):
-    """Fetch user data from Supabase."""
-    response = supabase.table("users").select("*").eq("email", email).execute()
-    return response.data[0] if response.data else None
+from functions.registry import get_predictor
+from data.config import thresholds
+from functions.write_queue import get_write_queue
+from app.history import reset_history_cache
 
 def app():
     # Check if user is logged in
@@ -65,9 +57,12 @@ def app():
 
     if st.button("🔍 Predict", type="primary"):
         try:
+            model = get_predictor("diabetes")
+
             # Make prediction
+            # One predict_proba call; the label follows from the configured threshold
             prediction_proba = model.predict_proba(input_df)[0][1]
-            prediction = model.predict(input_df)[0]
+            prediction = int(prediction_proba > thresholds)
             risk_percent = prediction_proba * 100
             label = "Positive" if prediction == 1 else "Negative"
             message = "⚠️ You may have diabetes." if prediction == 1 else "✅ You are unlikely to have diabetes."
@@ -82,9 +77,10 @@ def app():
                 use_container_width=True
             )
 
-            # Save to predictions table
+            # Queue for the predictions table; sent in the background so the
+            # result does not wait on the network
             try:
-                supabase.table("predictions").insert({
+                get_write_queue().put("predictions", {
                     "user_email": email,
                     "timestamp": datetime.now().isoformat(),
                     "pregnancies": int(pregnancies),
@@ -97,7 +93,8 @@ def app():
                     "age": int(age),
                     "risk_percent": round(risk_percent, 2),
                     "prediction": label
-                }).execute()
+                })
+                reset_history_cache()
                 st.success("Prediction saved to history.")
             except Exception as e:
                 st.error(f"Failed to save prediction to history: {str(e)}")
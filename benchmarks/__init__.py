@@ -0,0 +1,4 @@
+# benchmarks
+#
+# A regular package (not a namespace one like functions/) so it wins over
+# the unrelated top-level "benchmarks" packages some wheels install.
@@ -0,0 +1,82 @@
+# batch.py
+#
+# Checks batch scoring of a file read in several chunks:
+#   python -m benchmarks.batch
+# The input CSV's chunks infer different dtypes on their own (integer
+# features then decimals, an empty notes column then text, ids then a missing
+# id); every chunk must still be written under one schema, with the same
+# scores as scoring the whole file at once. Exits non-zero on failure.
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+from functions.batch import FEATURES, score_file, score_frame
+
+failures = []
+
+
+def expect(ok, message):
+    print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+def write_input(path):
+    first = pd.DataFrame({
+        "patient_id": [1, 2],
+        "Pregnancies": [2, 0], "Glucose": [148, 85], "BloodPressure": [72, 66], "SkinThickness": [35, 29],
+        "Insulin": [0, 0], "BMI": [33, 26], "DiabetesPedigreeFunction": [1, 0], "Age": [50, 31],
+        "notes": [None, None],
+    })
+    second = pd.DataFrame({
+        "patient_id": [None, 4],
+        "Pregnancies": [1.0, 8.0], "Glucose": [89.5, 183.0], "BloodPressure": [66.0, 64.0],
+        "SkinThickness": [23.0, 0.0], "Insulin": [94.0, 0.0], "BMI": [28.1, 23.3],
+        "DiabetesPedigreeFunction": [0.167, 0.672], "Age": [21.0, 32.0],
+        "notes": ["fasting", "after lunch"],
+    })
+    with open(path, "w") as f:
+        f.write(first.to_csv(index=False))
+        f.write(second.to_csv(index=False, header=False))
+
+
+def check_chunks(chunksize=2):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        in_path = os.path.join(work_dir, "patients.csv")
+        write_input(in_path)
+        expected = score_frame(pd.read_csv(in_path))
+        for ext in ("parquet", "csv"):
+            print(f"{ext} output, chunks of {chunksize} rows")
+            out_path = os.path.join(work_dir, f"scored.{ext}")
+            try:
+                rows = score_file(in_path, out_path, chunksize=chunksize, n_jobs=1)
+                error = None
+            except Exception as e:
+                rows, error = 0, e
+            expect(error is None and rows == len(expected), f"{rows} rows scored ({error!r})")
+            if error is not None:
+                continue
+            scored = pd.read_parquet(out_path) if ext == "parquet" else pd.read_csv(out_path)
+            expect(list(scored.columns) == list(expected.columns), "every input column kept, plus the scores")
+            expect(scored["risk_percent"].tolist() == expected["risk_percent"].tolist()
+                   and scored["prediction"].tolist() == expected["prediction"].tolist(),
+                   "scores match scoring the whole file at once")
+            expect(scored["notes"].isna().tolist() == [True, True, False, False],
+                   "empty notes stay empty")
+            if ext == "parquet":
+                schema = pq.read_schema(out_path)
+                expect(all(schema.field(f).type == pa.float64() for f in FEATURES + ["risk_percent"])
+                       and schema.field("prediction").type == pa.string(),
+                       "features and risk_percent are float64, prediction a string")
+
+
+if __name__ == "__main__":
+    check_chunks()
+    print("FAILED" if failures else "OK")
+    sys.exit(1 if failures else 0)
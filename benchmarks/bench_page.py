@@ -0,0 +1,107 @@
+# bench_page.py
+#
+# Benchmarks one target in this process and prints the result as JSON:
+#   python -m benchmarks.bench_page main
+#   python -m benchmarks.bench_page app.diet_tracker
+# Run through benchmarks/run.py, which starts a fresh process per target so
+# cold-start times and peak RSS are not shared between pages.
+
+import importlib
+import json
+import resource
+import sys
+import tempfile
+import time
+
+START = time.perf_counter()
+
+from benchmarks.fakes import DEMO_USER, install
+
+# Drives a page function the way show_app_nav does for a logged-in user
+PAGE_SCRIPT = """
+import time
+import streamlit as st
+from {module} import app
+start = time.perf_counter()
+app({args})
+st.session_state["_bench_render_s"] = time.perf_counter() - start
+"""
+
+# Pages that take an argument from session state
+PAGE_ARGS = {"app.shap_waterfall": "st.session_state.get('last_input')"}
+
+TIMEOUT = 300
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1 << 20) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _exceptions(at):
+    return [str(getattr(e, "message", e.value)) for e in at.exception]
+
+
+def bench(target, days=30):
+    from streamlit.testing.v1 import AppTest
+
+    result = {"target": target}
+    with tempfile.TemporaryDirectory() as work_dir:
+        start = time.perf_counter()
+        install(work_dir, days)
+        result["setup_s"] = time.perf_counter() - start
+
+        if target == "main":
+            at = AppTest.from_file("main.py", default_timeout=TIMEOUT)
+        else:
+            start = time.perf_counter()
+            importlib.import_module(target)
+            result["import_s"] = time.perf_counter() - start
+            script = PAGE_SCRIPT.format(module=target, args=PAGE_ARGS.get(target, ""))
+            at = AppTest.from_string(script, default_timeout=TIMEOUT)
+            at.session_state["logged_in"] = True
+            at.session_state["current_user"] = dict(DEMO_USER)
+            if target == "app.shap_waterfall":
+                from functions.registry import get_dataset
+                at.session_state["last_input"] = get_dataset().drop("Outcome", axis=1).head(1)
+            if target == "app.ai_chat":
+                from functions.chat import StubChat
+                at.session_state["chat_provider"] = StubChat()
+
+        at.secrets["gemini"] = {"api_key": "benchmark"}
+
+        # First run pays for cached resources (models, catalog, indexes);
+        # the rerun is what every later interaction costs
+        for phase in ("first_run", "rerun"):
+            start = time.perf_counter()
+            at.run()
+            result[f"{phase}_s"] = time.perf_counter() - start
+            if "_bench_render_s" in at.session_state:
+                result[f"{phase}_render_s"] = at.session_state["_bench_render_s"]
+
+        if target == "app.ai_chat":
+            # One question answered by the local stub: page overhead around the streamed reply
+            start = time.perf_counter()
+            at.chat_input[0].set_value("What is type 2 diabetes?").run()
+            result["chat_turn_s"] = time.perf_counter() - start
+
+        result["exceptions"] = _exceptions(at)
+        if target == "main" and not result["exceptions"]:
+            # Interactive login means the login form rendered
+            if not any(w.key == "login_email" for w in at.text_input):
+                result["exceptions"].append("login form did not render")
+
+    result["wall_s"] = time.perf_counter() - START
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return {k: round(v, 4) if isinstance(v, float) else v for k, v in result.items()}
+
+
+if __name__ == "__main__":
+    target = sys.argv[1]
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    try:
+        result = bench(target, days)
+    except Exception as e:
+        result = {"target": target, "exceptions": [f"{type(e).__name__}: {e}"]}
+    print(json.dumps(result))
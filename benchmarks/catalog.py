@@ -0,0 +1,39 @@
+# catalog.py
+#
+# Checks the compiled food catalog (functions/catalog.py) built from dataset/:
+#   python -m benchmarks.catalog
+# Exits non-zero if a check fails.
+
+import sys
+
+import pandas as pd
+
+from functions.catalog import NUTRIENTS, build_catalog, load_catalog
+
+# Common foods that pred_food.csv, the first source, lists without sugar
+SUGAR_FROM_LATER_SOURCES = ["apple", "banana", "eggs", "oats", "idli", "lassi", "mango"]
+
+failures = []
+
+
+def expect(ok, message):
+    print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+if __name__ == "__main__":
+    catalog = build_catalog().set_index("food")
+    print(f"build_catalog: {len(catalog)} foods")
+    expect(catalog.index.is_unique, "one row per food")
+    expect(catalog["calories"].notna().all(), "every food has calories")
+    missing = [food for food in SUGAR_FROM_LATER_SOURCES
+               if food not in catalog.index or pd.isna(catalog.loc[food, "sugar"])]
+    expect(not missing, f"sugar merged from later sources for {', '.join(SUGAR_FROM_LATER_SOURCES)}"
+                        + (f" (missing: {', '.join(missing)})" if missing else ""))
+    expect(catalog.loc["apple", "source"] == "pred_food.csv", "source is the file that supplied the calories")
+
+    loaded = load_catalog().set_index("food")
+    expect(loaded[NUTRIENTS].equals(catalog[NUTRIENTS]), "the compiled file matches a fresh build")
+    print("FAILED" if failures else "OK")
+    sys.exit(1 if failures else 0)
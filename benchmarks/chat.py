@@ -0,0 +1,103 @@
+# chat.py
+#
+# Checks the ASK AI chat against the local StubChat provider, without Gemini:
+#   python -m benchmarks.chat
+# Covers history trimming, streaming (time to first token vs. full answer)
+# and a multi-turn conversation through the page. Exits non-zero on failure.
+
+import random
+import sys
+import tempfile
+
+from benchmarks.fakes import DEMO_USER, install
+from functions.chat import MAX_TURNS, StubChat, TimedStream, trim_history
+
+failures = []
+
+
+def expect(ok, message):
+    print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+def check_trimming(cases=500, max_turns=6, max_chars=400):
+    print("trim_history")
+    rng = random.Random(0)
+    worst = None
+    for _ in range(cases):
+        first = rng.choice(["user", "assistant"])
+        length = rng.randint(1, 30)
+        roles = [("user", "assistant")[(i + (first == "assistant")) % 2] for i in range(length - 1)] + ["user"]
+        messages = [{"role": role, "content": "x" * rng.randint(1, 200)} for role in roles]
+        kept = trim_history(messages, max_turns, max_chars)
+        chars = sum(len(m["content"]) for m in kept)
+        if not (kept and kept[-1] is messages[-1] and kept[0]["role"] == "user"
+                and len(kept) <= max_turns and (len(kept) == 1 or chars <= max_chars)
+                and kept == messages[len(messages) - len(kept):]):
+            worst = (roles, [m["role"] for m in kept])
+            break
+    expect(worst is None, f"{cases} random histories: keeps the question, a newest suffix within "
+                          f"{max_turns} turns / {max_chars} chars, never starts with an assistant message"
+                          + (f" (failed on {worst})" if worst else ""))
+    only = [{"role": "user", "content": "x" * 1000}]
+    expect(trim_history(only, max_turns, max_chars) == only, "an over-long question alone is still sent")
+
+
+def check_streaming(delay=0.02):
+    print("streaming")
+    provider = StubChat(delay=delay)
+    stream = TimedStream(provider.stream([{"role": "user", "content": "hi"}]))
+    chunks = list(stream)
+    words = len(provider.answer.split(" "))
+    expect("".join(chunks).strip() == provider.answer, f"{len(chunks)} chunks rebuild the answer")
+    expect(len(chunks) == words, "one chunk per word")
+    expect(stream.first_token_s < 2 * delay <= stream.total_s,
+           f"first token after {stream.first_token_s * 1000:.0f} ms, full answer after {stream.total_s * 1000:.0f} ms")
+
+
+class RecordingStub(StubChat):
+    """StubChat that keeps the history it was given for each answer."""
+
+    def __init__(self):
+        super().__init__()
+        self.received = []
+
+    def stream(self, messages):
+        self.received.append([m["role"] for m in messages])
+        return super().stream(messages)
+
+
+def check_page(turns=MAX_TURNS // 2 + 3):
+    print("app.ai_chat")
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        install(work_dir)
+        at = AppTest.from_string("from app.ai_chat import app\napp()", default_timeout=60)
+        at.session_state["logged_in"] = True
+        at.session_state["current_user"] = dict(DEMO_USER)
+        provider = RecordingStub()
+        at.session_state["chat_provider"] = provider
+        at.run()
+        for i in range(turns):
+            at.chat_input[0].set_value(f"Question {i}?").run()
+        expect(not at.exception, "no exceptions")
+        messages = at.session_state["chat_messages"]
+        expect([m["role"] for m in messages] == ["user", "assistant"] * turns, f"{turns} question/answer pairs kept")
+        expect(all(m["content"].strip() == provider.answer for m in messages[1::2]), "answers are the streamed text")
+        received = at.session_state["chat_provider"].received
+        # The last question had 2 * turns - 1 messages before trimming
+        expect(len(received) == turns and max(map(len, received)) <= MAX_TURNS < 2 * turns - 1
+               and all(r[0] == "user" and r[-1] == "user" for r in received),
+               f"every request is capped at {MAX_TURNS} messages and starts and ends with a question")
+        print(f"  messages sent per question: {[len(r) for r in received]}")
+        expect(any("First words after" in c.value for c in at.caption), "time to first token is shown")
+
+
+if __name__ == "__main__":
+    check_trimming()
+    check_streaming()
+    check_page()
+    print("FAILED" if failures else "OK")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,236 @@
+# fakes.py
+
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+
+DEMO_USER = {
+    "email": "bench@example.com",
+    "name": "Bench User",
+    "password": "bench",
+    "age": 45,
+    "height": 170.0,
+    "weight": 72.0,
+    "security_questions": {"What was the name of your first pet?": "rex"},
+}
+
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+class FakeResponse:
+    def __init__(self, data=None, text=None):
+        self.data = data
+        self.text = text
+
+
+def _comparable(value):
+    """Timestamps compare as instants, like in Postgres, whatever their UTC offset."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _split_top(text):
+    """Splits a PostgREST logic expression on the commas outside parentheses and quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "()":
+            depth += 1 if char == "(" else -1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(current)
+            current = ""
+            continue
+        current += char
+    return parts + [current]
+
+
+_OPS = {
+    "eq": lambda v, x: v == x, "gt": lambda v, x: v > x, "gte": lambda v, x: v >= x,
+    "lt": lambda v, x: v < x, "lte": lambda v, x: v <= x,
+}
+
+
+def _condition(text):
+    """Predicate for one or_() term: column.op.value, and(...) or or(...)."""
+    for logic, combine in (("and(", all), ("or(", any)):
+        if text.startswith(logic):
+            tests = [_condition(part) for part in _split_top(text[len(logic):-1])]
+            return lambda row: combine(test(row) for test in tests)
+    column, op, value = text.split(".", 2)
+    value = value[1:-1] if value.startswith('"') else value
+    value = _comparable(float(value) if re.fullmatch(r"-?\d+(\.\d+)?", value) else value)
+    return lambda row: row.get(column) is not None and _OPS[op](_comparable(row[column]), value)
+
+
+class FakeQuery:
+    """Chainable stand-in for a supabase-py table query, evaluated against in-memory rows."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._write = None
+
+    def select(self, *columns, **kwargs):
+        return self
+
+    def _filter(self, column, test, value):
+        value = _comparable(value)
+        self._filters.append(lambda row: row.get(column) is not None and test(_comparable(row[column]), value))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, lambda v, x: v == x, value)
+
+    def gt(self, column, value):
+        return self._filter(column, lambda v, x: v > x, value)
+
+    def gte(self, column, value):
+        return self._filter(column, lambda v, x: v >= x, value)
+
+    def lt(self, column, value):
+        return self._filter(column, lambda v, x: v < x, value)
+
+    def lte(self, column, value):
+        return self._filter(column, lambda v, x: v <= x, value)
+
+    def or_(self, filters):
+        tests = [_condition(part) for part in _split_top(filters)]
+        self._filters.append(lambda row: any(test(row) for test in tests))
+        return self
+
+    def order(self, column, desc=False):
+        self._order.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self._limit = count
+        return self
+
+    def insert(self, rows):
+        self._write = ("insert", rows if isinstance(rows, list) else [rows])
+        return self
+
+    def update(self, values):
+        self._write = ("update", values)
+        return self
+
+    def delete(self):
+        self._write = ("delete", None)
+        return self
+
+    def execute(self):
+        if self._write and self._write[0] == "insert":
+            # Rows get an increasing id, like a Postgres identity column
+            next_id = max((row.get("id") or 0 for row in self._rows), default=0) + 1
+            inserted = [{"id": next_id + i, **row} for i, row in enumerate(self._write[1])]
+            self._rows.extend(inserted)
+            return FakeResponse([dict(row) for row in inserted])
+        matched = [row for row in self._rows if all(test(row) for test in self._filters)]
+        if self._write and self._write[0] == "update":
+            for row in matched:
+                row.update(self._write[1])
+        elif self._write:
+            self._rows[:] = [row for row in self._rows if row not in matched]
+        # Stable sorts, last key first, give the chained order
+        for column, desc in reversed(self._order):
+            matched.sort(key=lambda row: _comparable(row.get(column)) or "", reverse=desc)
+        if self._limit is not None:
+            matched = matched[:self._limit]
+        return FakeResponse([dict(row) for row in matched])
+
+
+class FakeSupabase:
+    """In-memory replacement for the supabase client, seeded with DEMO_USER."""
+
+    def __init__(self):
+        self.tables = {"users": [dict(DEMO_USER)], "predictions": []}
+
+    def table(self, name):
+        return FakeQuery(self.tables.setdefault(name, []))
+
+
+class FakeGemini:
+    """
+    Answers instantly: a JSON array for the batched sugar prompt, fixed advice
+    otherwise, word by word when streamed.
+    """
+
+    def generate_content(self, prompt, stream=False):
+        if isinstance(prompt, str) and "JSON array" in prompt:
+            count = len(re.findall(r"^\s*\d+\. ", prompt, re.MULTILINE))
+            answer = {"sugar_grams": 6.0, "total_carbs": 25.0, "food_category": "mixed", "glycemic_impact": "medium"}
+            return FakeResponse(text=json.dumps([answer] * count))
+        text = "Stay hydrated, prefer whole grains and keep monitoring your readings."
+        if stream:
+            return [FakeResponse(text=word + " ") for word in text.split(" ")]
+        return FakeResponse(text=text)
+
+
+def _seed(db, days):
+    # Timezone-aware like the records the pages write
+    now = datetime.now(IST)
+    for day in range(days):
+        moment = now - timedelta(days=day)
+        for hour, meal_time, food in ((8, "Breakfast", "idli"), (13, "Lunch", "dal"), (20, "Dinner", "rice")):
+            db.add("meals", DEMO_USER["email"], {
+                "timestamp": moment.replace(hour=hour), "meal_time": meal_time, "food": food,
+                "quantity": 200, "calories": 250.0, "carbs": 40.0, "protein": 8.0, "fat": 5.0,
+                "sugar": 3.0, "fiber": 2.0, "source": "dataset",
+            })
+        for hour, level in ((7, 110), (15, 160)):
+            db.add("sugar_readings", DEMO_USER["email"], {
+                "timestamp": moment.replace(hour=hour), "sugar_level": level, "notes": "",
+            })
+        db.add("exercise_sessions", DEMO_USER["email"], {
+            "DateTime": moment.replace(hour=18), "Date": moment.strftime("%Y-%m-%d"),
+            "Time": "18:00:00", "Gender": "Male", "Age": 45, "Height (cm)": 170.0,
+            "Weight (kg)": 72.0, "Duration (min)": 30.0, "Exercise Type": "Walking",
+            "Heart Rate": 110, "Body Temp (°C)": 37.5, "Calories Burnt (kcal)": 150.0,
+            "Intensity": "Moderate", "BMI": 24.9,
+        })
+
+
+def _seed_predictions(client, days):
+    now = datetime.now(timezone.utc)
+    for i in range(days * 2):
+        risk = 20.0 + (i * 37) % 70
+        client.tables["predictions"].append({
+            "id": i + 1, "user_email": DEMO_USER["email"], "timestamp": (now - timedelta(hours=12 * i)).isoformat(),
+            "pregnancies": 1, "glucose": 120 + i % 50, "blood_pressure": 70, "skin_thickness": 20,
+            "insulin": 80, "bmi": 28.5, "diabetes_pedigree_function": 0.4, "age": 45,
+            "risk_percent": risk, "prediction": "Positive" if risk > 50 else "Negative",
+        })
+
+
+def install(work_dir, days=30):
+    """
+    Serves Supabase through the pooled client from FakeSupabase, swaps Gemini for
+    FakeGemini and points the health database, sugar cache and write queue spool
+    at `work_dir`, seeded with `days` days of meals, readings, exercise and
+    predictions for DEMO_USER. Must run before any page module is imported.
+    """
+    fake_client = FakeSupabase()
+    _seed_predictions(fake_client, days)
+    import supabase_client
+    supabase_client.create_supabase = lambda *args, **kwargs: fake_client
+    supabase_client.pool = supabase_client.supabase = supabase_client.SupabasePool(lambda: fake_client)
+
+    from functions import llm
+    llm.get_gemini_model = lambda *args, **kwargs: FakeGemini()
+
+    from functions import health_db, sugar_lookup, write_queue
+    from functions.disk_cache import DiskCache
+    health_db._db = health_db.HealthDB(os.path.join(work_dir, "health.db"), legacy_dir=work_dir)
+    _seed(health_db._db, days)
+    sugar_lookup._cache = DiskCache(os.path.join(work_dir, "sugar.sqlite"))
+    write_queue._queue = write_queue.WriteQueue(os.path.join(work_dir, "outbox.db"), lambda: fake_client)
+    return fake_client
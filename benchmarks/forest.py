@@ -0,0 +1,83 @@
+# forest.py
+#
+# Parity check and per-row latency of the compiled forest backend against
+# sklearn, for every forest model that is present:
+#   python -m benchmarks.forest
+#   python -m benchmarks.forest --rows 1 10 1000 --repeat 200
+# Exits non-zero if any prediction differs from sklearn by more than --tolerance.
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from functions.registry import artifact_path, get_dataset, get_model, get_predictor
+
+
+def _inputs(name):
+    """Realistic inputs for a model: its training data plus NaN-holed and out-of-range copies."""
+    if name == "diabetes":
+        X = get_dataset().drop("Outcome", axis=1)
+    else:
+        exercise = pd.read_csv(os.path.join("datasets", "exercise.csv")).drop("User_ID", axis=1)
+        exercise["Gender"] = exercise["Gender"].map({"male": 1, "female": 0})
+        X = exercise
+    X = X.astype(float)
+    holed = X.copy()
+    holed.iloc[::7, 1] = np.nan
+    shifted = X * 1.5 + 1
+    return X, pd.concat([X, holed, shifted], ignore_index=True)
+
+
+def _per_row_ms(predict, X, repeat):
+    predict(X)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        predict(X)
+    return (time.perf_counter() - start) / repeat / len(X) * 1000
+
+
+def check(name, rows, repeat, tolerance):
+    model = get_model(name)
+    compiled = get_predictor(name, backend="compiled")
+    X, probe = _inputs(name)
+    method = "predict_proba" if hasattr(model, "predict_proba") else "predict"
+
+    expected = getattr(model, method)(probe)
+    actual = getattr(compiled, method)(probe)
+    max_diff = float(np.abs(np.asarray(expected) - np.asarray(actual)).max())
+    labels_match = bool((model.predict(probe) == compiled.predict(probe)).all())
+    ok = max_diff <= tolerance and labels_match
+    print(f"{name}: {compiled.n_nodes} nodes, depth {compiled.depth}, "
+          f"{len(probe)} rows, max |diff| {max_diff:.3g}, labels match: {labels_match}"
+          f" -> {'OK' if ok else 'MISMATCH'}")
+
+    print(f"  {'rows':>6} {'sklearn ms/row':>15} {'compiled ms/row':>16} {'speedup':>8}")
+    for n in rows:
+        batch = X.sample(n, replace=True, random_state=0)
+        # Large batches need fewer repeats for a stable figure
+        times = max(repeat // n, 3)
+        sk = _per_row_ms(getattr(model, method), batch, times)
+        cf = _per_row_ms(getattr(compiled, method), batch, times)
+        print(f"  {n:>6} {sk:>15.4f} {cf:>16.4f} {sk / cf:>7.1f}x")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the compiled forest backend with sklearn.")
+    parser.add_argument("models", nargs="*", default=["diabetes", "calories"])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 10, 100, 1000, 10000], help="batch sizes to time")
+    parser.add_argument("--repeat", type=int, default=100, help="calls per single-row timing")
+    parser.add_argument("--tolerance", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    ok = True
+    for name in args.models:
+        if not os.path.exists(artifact_path(name)):
+            print(f"{name}: {artifact_path(name)} not found, skipped")
+            continue
+        ok = check(name, args.rows, args.repeat, args.tolerance) and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,118 @@
+# run.py
+#
+#   python -m benchmarks.run                  # compare against benchmarks/baseline.json
+#   python -m benchmarks.run --update         # record a new baseline
+#   python -m benchmarks.run app.diet_tracker # selected targets only
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# "main" is the cold start up to an interactive login; the rest are the pages
+# show_app_nav renders for a logged-in user
+TARGETS = [
+    "main", "app.about", "app.user_input", "app.calculation", "app.diet_tracker",
+    "app.sugar_tracker", "app.calorie", "app.shap_waterfall", "app.performance",
+    "app.ai_chat", "app.history", "app.about_diabetes",
+]
+
+# metric -> absolute slack added to the relative tolerance, so tiny values do not flap
+METRICS = {
+    "import_s": 0.05,
+    "first_run_s": 0.1,
+    "rerun_s": 0.05,
+    "chat_turn_s": 0.05,
+    "wall_s": 0.2,
+    "peak_rss_mb": 10,
+}
+
+
+def run_target(target, days):
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_page", target, str(days)],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode or not lines:
+        return {"target": target, "exceptions": [proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"]}
+    return json.loads(lines[-1])
+
+
+def median_result(results):
+    """Median of every numeric metric over repeated runs; exceptions from any run are kept."""
+    merged = {"target": results[0]["target"], "exceptions": sorted({e for r in results for e in r.get("exceptions", [])})}
+    for key in results[0]:
+        values = [r[key] for r in results if isinstance(r.get(key), (int, float))]
+        if values:
+            merged[key] = round(statistics.median(values), 4)
+    return merged
+
+
+def compare(results, baseline, tolerance):
+    failures = []
+    for target, result in results.items():
+        for error in result["exceptions"]:
+            failures.append(f"{target}: raised {error}")
+        before = baseline.get(target, {})
+        for metric, slack in METRICS.items():
+            if metric in result and metric in before:
+                limit = before[metric] * (1 + tolerance) + slack
+                if result[metric] > limit:
+                    failures.append(f"{target}: {metric} {before[metric]} -> {result[metric]} (limit {limit:.3f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless startup and page render benchmarks (Streamlit AppTest, fake Supabase/Gemini).")
+    parser.add_argument("targets", nargs="*", default=TARGETS)
+    parser.add_argument("--repeat", type=int, default=3, help="fresh processes per target; the median is kept")
+    parser.add_argument("--days", type=int, default=30, help="days of seeded meals, readings and exercise")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown over the baseline (0.25 = 25%%)")
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    results = {}
+    for target in args.targets:
+        results[target] = median_result([run_target(target, args.days) for _ in range(args.repeat)])
+        r = results[target]
+        print(
+            f"{target:<20} first run {r.get('first_run_s', float('nan')):7.3f} s  "
+            f"rerun {r.get('rerun_s', float('nan')):7.3f} s  "
+            f"import {r.get('import_s', 0):6.3f} s  "
+            f"wall {r.get('wall_s', float('nan')):7.3f} s  "
+            f"peak RSS {r.get('peak_rss_mb', float('nan')):7.1f} MB"
+        )
+        for error in r["exceptions"]:
+            print(f"    ! {error}")
+
+    if args.update:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Wrote {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update to record one.")
+        return 1
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    print("FAILED" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+# usda.py
+#
+# Checks the USDA client and its DiskCache against a local stub server, without
+# calling the real API:
+#   python -m benchmarks.usda
+# Covers cache hits, negative caching of misses and 404s, retries of 5xx
+# responses and refetching after the TTL. Exits non-zero on failure.
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+failures = []
+
+
+def expect(ok, message):
+    print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+class StubUSDA(BaseHTTPRequestHandler):
+    """
+    Answers FoodData Central searches from `server.foods`. A query listed in
+    `server.statuses` gets those status codes first, one per request.
+    """
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        self.server.requests.append(query)
+        statuses = self.server.statuses.get(query)
+        status = statuses.pop(0) if statuses else 200
+        body = {"foods": self.server.foods.get(query, [])} if status == 200 else {"error": status}
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubUSDA)
+    server.requests = []
+    server.statuses = {}
+    server.foods = {
+        "apple": [{"foodNutrients": [
+            {"nutrientName": "Energy", "value": 52},
+            {"nutrientName": "Carbohydrate, by difference", "value": 13.8},
+            {"nutrientName": "Protein", "value": 0.3},
+            {"nutrientName": "Total lipid (fat)", "value": 0.2},
+        ]}],
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_client():
+    server = start_stub()
+    os.environ["USDA_API_URL"] = f"http://127.0.0.1:{server.server_port}/fdc/v1/foods/search"
+    from functions import usda
+    from functions.disk_cache import MISS, DiskCache
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cache = DiskCache(os.path.join(work_dir, "usda.sqlite"), ttl=0.5, negative_ttl=60)
+        client = usda.USDAClient(api_url=os.environ["USDA_API_URL"], cache=cache,
+                                 session=usda.make_session(backoff=0.01))
+
+        print("cache hits")
+        first = client.lookup("Apple")
+        expect(first is not None and first["calories"] == 52 and first["carbs"] == 13.8,
+               f"a match is parsed: {first}")
+        second = client.lookup("  apple ")
+        expect(second == first and server.requests == ["apple"],
+               f"a second lookup is served from the cache ({len(server.requests)} request)")
+
+        print("negative entries")
+        del server.requests[:]
+        expect(client.lookup("unobtainium") is None, "no match returns None")
+        expect(cache.get("unobtainium") is None, "the miss is cached as a negative entry")
+        client.lookup("unobtainium")
+        expect(server.requests == ["unobtainium"], "a cached miss is not fetched again")
+
+        del server.requests[:]
+        server.statuses["ghost"] = [404]
+        try:
+            result = client.lookup("ghost")
+            error = None
+        except Exception as e:
+            result, error = None, e
+        expect(error is None and result is None, f"a 404 returns None ({error!r})")
+        expect(cache.get("ghost") is None, "the 404 is cached as a negative entry")
+        try:
+            client.lookup("ghost")
+        except Exception:
+            pass
+        expect(server.requests == ["ghost"], "a cached 404 is not fetched again")
+
+        print("retries")
+        del server.requests[:]
+        server.statuses["apple pie"] = [503, 502]
+        server.foods["apple pie"] = server.foods["apple"]
+        expect(client.lookup("apple pie") == first, "a lookup succeeds after two 5xx responses")
+        expect(server.requests == ["apple pie"] * 3, f"retried {len(server.requests) - 1} times")
+
+        del server.requests[:]
+        server.statuses["flaky"] = [500] * 10
+        try:
+            client.lookup("flaky")
+            error = None
+        except Exception as e:
+            error = e
+        expect(error is not None, f"a persistent 5xx raises ({type(error).__name__})")
+        expect(cache.get("flaky") is MISS, "the failure is not cached")
+
+        print("expiry")
+        del server.requests[:]
+        time.sleep(0.6)
+        expect(cache.get("apple") is MISS, "the entry expires after its TTL")
+        expect(client.lookup("apple") == first and server.requests == ["apple"],
+               "an expired entry is fetched again")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    check_client()
+    print("FAILED" if failures else "OK")
+    sys.exit(1 if failures else 0)
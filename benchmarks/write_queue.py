@@ -0,0 +1,94 @@
+# write_queue.py
+#
+# Checks that clearing a user's prediction history also drops their
+# predictions still waiting in the write queue, without Supabase:
+#   python -m benchmarks.write_queue
+# Exits non-zero on failure.
+
+import os
+import sys
+import tempfile
+
+from benchmarks.fakes import DEMO_USER, FakeSupabase, install
+from functions import write_queue
+
+failures = []
+
+
+def expect(ok, message):
+    print(f"  {'ok  ' if ok else 'FAIL'} {message}")
+    if not ok:
+        failures.append(message)
+
+
+class Outage:
+    """client_factory for a WriteQueue that fails every send while offline."""
+
+    def __init__(self, client):
+        self.client = client
+        self.online = False
+
+    def __call__(self):
+        if not self.online:
+            raise ConnectionError("offline")
+        return self.client
+
+
+def sent_for(client, email):
+    return [row for row in client.tables["predictions"] if row.get("user_email") == email]
+
+
+def check_discard():
+    print("WriteQueue.discard")
+    with tempfile.TemporaryDirectory() as work_dir:
+        client = FakeSupabase()
+        outage = Outage(client)
+        queue = write_queue.WriteQueue(os.path.join(work_dir, "outbox.db"), outage)
+        try:
+            queue.put("predictions", {"user_email": "a@example.com", "risk_percent": 10.0})
+            queue.put("predictions", {"user_email": "b@example.com", "risk_percent": 20.0})
+            queue.put("meals", {"user_email": "a@example.com", "food": "apple"})
+            expect(queue.discard("a@example.com", "predictions") == 1, "one queued prediction dropped")
+            expect(queue.pending("predictions", "a@example.com") == 0 and queue.pending() == 2,
+                   "the other user's prediction and the other table stay queued")
+            outage.online = True
+            expect(queue.flush(), "the rest is sent once back online")
+            expect(not sent_for(client, "a@example.com") and len(sent_for(client, "b@example.com")) == 1,
+                   "nothing is sent for the discarded prediction")
+        finally:
+            queue.close()
+
+
+def check_page():
+    print("app.history Clear History")
+    from streamlit.testing.v1 import AppTest
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        client = install(work_dir)
+        outage = Outage(client)
+        queue = write_queue._queue = write_queue.WriteQueue(os.path.join(work_dir, "outbox.db"), outage)
+        try:
+            email = DEMO_USER["email"]
+            queue.put("predictions", {"user_email": email, "risk_percent": 42.0, "prediction": "Negative"})
+            at = AppTest.from_string("from app.history import app\napp()", default_timeout=60)
+            at.session_state["logged_in"] = True
+            at.session_state["current_user"] = dict(DEMO_USER)
+            at.run()
+            clear = [button for button in at.button if "Clear History" in button.label]
+            expect(bool(clear) and bool(sent_for(client, email)), "history is shown with a Clear History button")
+            if clear:
+                clear[0].click().run()
+            expect(not at.exception, "no exceptions")
+            expect(queue.pending("predictions", email) == 0, "the queued prediction is dropped")
+            outage.online = True
+            queue.flush()
+            expect(not sent_for(client, email), "no prediction reappears once the queue is back online")
+        finally:
+            queue.close()
+
+
+if __name__ == "__main__":
+    check_discard()
+    check_page()
+    print("FAILED" if failures else "OK")
+    sys.exit(1 if failures else 0)
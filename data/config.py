@@ -3,5 +3,13 @@
 # Probability threshold for predicting "Diabetes"
 thresholds = 0.5
 
+# How the app and service.py score single records: "compiled" evaluates the
+# forests as flattened node arrays (functions/forest.py), memory-mapped from
+# the export_model.py output when it matches the model; "sklearn" uses the
+# fitted estimators directly. Both give the same outputs. Compiled is much
+# faster for a single row or a small batch and slower beyond a few hundred
+# rows per call, so batch scoring and SHAP always use sklearn.
+inference_backend = "compiled"
+
 # You can also define other config values here if needed later.
 # For example, colors, column ordering, etc.
@@ -0,0 +1,13 @@
+# evaluate.py
+
+import argparse
+
+from functions.evaluation import build_report
+
+parser = argparse.ArgumentParser(description="Build the held-out evaluation report for the diabetes model.")
+parser.add_argument("--force", action="store_true", help="Rebuild even if the report is up to date")
+args = parser.parse_args()
+
+paths = build_report(force=args.force)
+for kind, path in paths.items():
+    print(f"{kind}: {path}")
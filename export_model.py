@@ -0,0 +1,118 @@
+# export_model.py
+#
+# Exports the served diabetes and calorie-burn forests in the compact,
+# memory-mapped format of functions/forest.py and reports how closely the
+# export matches the original:
+#   python export_model.py                         # exact: same predictions, smaller and faster to load
+#   python export_model.py diabetes --max-depth 10 # prune; check the parity report before serving
+# The export is written beside the model file (e.g. datasets/diabetes_model.forest/)
+# and used by the app whenever inference_backend = "compiled" in data/config.py.
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+
+from functions.forest import CompiledForest
+from functions.pipeline import MODELS, score_model, split
+from functions.registry import artifact_hash, artifact_path, export_path
+
+# Models CompiledForest can export; imported up front so a model's load time is the unpickling alone
+FORESTS = (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+
+
+def _dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def _timed(load):
+    start = time.perf_counter()
+    result = load()
+    return result, time.perf_counter() - start
+
+
+def parity_report(name, original, exported, original_load_s, exported_load_s):
+    """Held-out metrics of both models plus how far their outputs differ on all rows."""
+    task = MODELS[name]["task"]
+    X_train, X_test, y_train, y_test = split(name)
+    method = "predict_proba" if task == "classification" else "predict"
+    X_all = pd.concat([X_train, X_test])
+    diff = np.abs(getattr(original, method)(X_all) - getattr(exported, method)(X_all))
+    report = {
+        "rows_compared": len(X_all),
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "original": {"test_metrics": score_model(task, original, X_test, y_test),
+                     "bytes": os.path.getsize(artifact_path(name)), "load_seconds": original_load_s},
+        "exported": {"test_metrics": score_model(task, exported, X_test, y_test),
+                     "nodes": exported.n_nodes, "depth": exported.depth, "load_seconds": exported_load_s},
+    }
+    if task == "classification":
+        report["label_agreement"] = float((original.predict(X_all) == exported.predict(X_all)).mean())
+    return json.loads(json.dumps(report, default=lambda value: value.item()))
+
+
+def _print_report(name, report, path):
+    print(f"{name} -> {path}")
+    original, exported = report["original"], report["exported"]
+    print(f"  size      {original['bytes'] / 1e6:8.2f} MB -> {exported['bytes'] / 1e6:8.2f} MB")
+    print(f"  load      {original['load_seconds'] * 1000:8.1f} ms -> {exported['load_seconds'] * 1000:8.1f} ms (mmap)")
+    print(f"  nodes     {exported['nodes']}, depth {exported['depth']}")
+    for metric, value in original["test_metrics"].items():
+        print(f"  {metric:<9} {value:8.4f}    -> {exported['test_metrics'][metric]:8.4f}")
+    print(f"  max |diff| over {report['rows_compared']} rows: {report['max_abs_diff']:.3g}")
+    if "label_agreement" in report:
+        print(f"  label agreement: {report['label_agreement']:.2%}")
+
+
+parser = argparse.ArgumentParser(description="Export the models as compact memory-mapped forests.")
+parser.add_argument("models", nargs="*", default=list(MODELS), metavar="model",
+                    help=f"models to export: {', '.join(MODELS)} (default: all present)")
+parser.add_argument("--max-depth", type=int, help="prune every tree to this depth")
+parser.add_argument("--trees", type=int, help="keep only the first N trees")
+parser.add_argument("--max-diff", type=float, help="fail, keeping any previous export, if outputs differ by more")
+args = parser.parse_args()
+
+failed = False
+for name in args.models:
+    if name not in MODELS:
+        parser.error(f"unknown model: {name}")
+    source = artifact_path(name)
+    if not os.path.exists(source):
+        print(f"{name}: {source} not found, skipped")
+        continue
+
+    original, original_load_s = _timed(lambda: joblib.load(source))
+    if not isinstance(original, FORESTS):
+        print(f"{name}: {type(original).__name__} is not a random forest, skipped")
+        continue
+    exported = CompiledForest.from_sklearn(original, max_depth=args.max_depth, n_trees=args.trees).compact()
+
+    path = export_path(name)
+    check_path = path + ".check"
+    exported.save(check_path, source=source, source_sha256=artifact_hash(name),
+                  max_depth=args.max_depth, trees=args.trees)
+    (reloaded, _), exported_load_s = _timed(lambda: CompiledForest.load(check_path))
+    report = parity_report(name, original, reloaded, original_load_s, exported_load_s)
+    report["exported"]["bytes"] = _dir_bytes(check_path)
+    with open(os.path.join(check_path, "parity.json"), "w") as f:
+        json.dump(report, f, indent=2)
+    _print_report(name, report, path)
+
+    if args.max_diff is not None and report["max_abs_diff"] > args.max_diff:
+        shutil.rmtree(check_path)
+        print(f"{name}: max |diff| {report['max_abs_diff']:.3g} exceeds --max-diff {args.max_diff}, not exported")
+        failed = True
+        continue
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.rename(check_path, path)
+
+sys.exit(1 if failed else 0)
@@ -0,0 +1,14 @@
+# food_catalog.py
+
+import argparse
+
+from functions.catalog import compile_catalog, DATASET_DIR, CATALOG_PATH
+
+parser = argparse.ArgumentParser(description="Compile the CSVs under dataset/ into one food catalog file.")
+parser.add_argument("--dataset-dir", default=DATASET_DIR)
+parser.add_argument("--out", default=CATALOG_PATH)
+args = parser.parse_args()
+
+catalog = compile_catalog(args.dataset_dir, args.out)
+print(f"Wrote {len(catalog)} foods to {args.out}")
+print(catalog.groupby("source").size().to_string())
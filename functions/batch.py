@@ -0,0 +1,125 @@
+# batch.py
+
+import copy
+import os
+
+import pandas as pd
+
+from data.config import thresholds
+from functions.registry import get_model
+
+# The eight Pima features, in the order the model was trained on
+FEATURES = [
+    "Pregnancies", "Glucose", "BloodPressure", "SkinThickness",
+    "Insulin", "BMI", "DiabetesPedigreeFunction", "Age",
+]
+
+
+def _format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    if ext == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported file type {ext!r}: use .csv or .parquet")
+
+
+def read_chunks(path, chunksize=50000):
+    """
+    Yields the rows of a CSV or Parquet file as DataFrames of at most
+    chunksize rows. FEATURES are read as float64 and, from a CSV, every other
+    column as a string, so each chunk has the same dtypes whatever its values.
+    """
+    if _format(path) == "csv":
+        columns = pd.read_csv(path, nrows=0).columns
+        dtype = {column: "float64" if column in FEATURES else "string" for column in columns}
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=dtype)
+    else:
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            df = batch.to_pandas()
+            features = [column for column in FEATURES if column in df.columns]
+            df[features] = df[features].astype("float64")
+            yield df
+
+
+def parquet_schema(scored):
+    """
+    Arrow schema for the scored output of a chunk: the chunk's own column
+    types, with FEATURES and risk_percent as float64 and prediction as string.
+    """
+    import pyarrow as pa
+    fixed = {column: pa.float64() for column in FEATURES + ["risk_percent"]}
+    fixed["prediction"] = pa.string()
+    inferred = pa.Schema.from_pandas(scored, preserve_index=False)
+    return pa.schema([pa.field(field.name, fixed.get(field.name, field.type)) for field in inferred])
+
+
+def scoring_model(n_jobs=-1):
+    """
+    The shared diabetes model with predict_proba spread over n_jobs cores.
+    A shallow copy, so the instance the app uses is left untouched.
+    """
+    model = copy.copy(get_model("diabetes"))
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = n_jobs
+    return model
+
+
+def score_frame(df, model=None, threshold=thresholds):
+    """
+    Adds risk_percent and prediction ("Positive" / "Negative", as on the
+    PREDICTION page) columns to a copy of df, which must contain FEATURES.
+    """
+    missing = [column for column in FEATURES if column not in df.columns]
+    if missing:
+        raise ValueError(f"Missing feature columns: {', '.join(missing)}")
+    model = model if model is not None else get_model("diabetes")
+    proba = model.predict_proba(df[FEATURES])[:, 1]
+    scored = df.copy()
+    scored["risk_percent"] = (proba * 100).round(2)
+    scored["prediction"] = pd.Series(proba > threshold, index=df.index).map({True: "Positive", False: "Negative"})
+    return scored
+
+
+def score_file(in_path, out_path, chunksize=50000, n_jobs=-1, threshold=thresholds):
+    """
+    Streams in_path (CSV or Parquet) through the model chunk by chunk and
+    writes every input column plus risk_percent and prediction to out_path
+    (CSV or Parquet). Memory use is bounded by chunksize. The output only
+    appears once complete. Returns the number of rows scored.
+    """
+    out_format = _format(out_path)
+    model = scoring_model(n_jobs)
+    tmp_path = out_path + ".tmp"
+    writer = None
+    rows = 0
+    try:
+        for i, chunk in enumerate(read_chunks(in_path, chunksize)):
+            scored = score_frame(chunk, model, threshold)
+            if out_format == "csv":
+                scored.to_csv(tmp_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, parquet_schema(scored))
+                writer.write_table(pa.Table.from_pandas(scored, schema=writer.schema, preserve_index=False))
+            rows += len(scored)
+        if writer is not None:
+            writer.close()
+            writer = None
+        elif rows == 0:
+            # Empty input: still write the output columns
+            empty = pd.DataFrame(columns=FEATURES + ["risk_percent", "prediction"])
+            if out_format == "csv":
+                empty.to_csv(tmp_path, index=False)
+            else:
+                empty.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, out_path)
+    finally:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return rows
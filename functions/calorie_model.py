@@ -0,0 +1,90 @@
+# calorie_model.py
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+# Column order the calorie-burn model is trained on (functions/pipeline.py)
+FEATURES = ["Gender", "Age", "Height", "Weight", "Duration", "Heart_Rate", "Body_Temp"]
+
+# Input ranges covered by datasets/exercise.csv; the forest predicts a flat
+# value beyond them
+TRAINED_RANGE = {"Duration": (1, 30), "Heart_Rate": (67, 128)}
+
+# Typical average heart rate of each exercise, as a share of the maximum (220 - age).
+# The model has no exercise-type input, so exercises differ by heart rate.
+EXERCISE_INTENSITY = {
+    "Running": 0.80,
+    "Cycling": 0.72,
+    "Walking": 0.60,
+    "Swimming": 0.75,
+    "Yoga": 0.50,
+    "Strength Training": 0.65,
+    "Hiking": 0.66,
+    "Dancing": 0.68,
+    "Rowing": 0.75,
+    "Boxing": 0.82,
+    "Tennis": 0.72,
+    "Basketball": 0.78,
+    "Other": 0.65,
+}
+
+
+def typical_heart_rate(exercise, age):
+    return int(round((220 - age) * EXERCISE_INTENSITY.get(exercise, EXERCISE_INTENSITY["Other"])))
+
+
+def estimate_simple(gender, weight, duration, heart_rate):
+    """MET-based fallback when no model is available; array inputs give an array."""
+    heart_rate = np.asarray(heart_rate, dtype=float)
+    intensity = np.select([heart_rate > 160, heart_rate > 140], [1.3, 1.1], 0.9)
+    calories = 5.0 * np.asarray(weight, dtype=float) * (np.asarray(duration, dtype=float) / 60) * intensity
+    return calories * np.where(np.char.lower(np.asarray(gender, dtype=str)) == "female", 0.9, 1.0)
+
+
+def estimate_calories(model, gender, age, height, weight, duration, heart_rate, body_temp=38.5):
+    """
+    Calories burnt for every combination of inputs that broadcast together
+    (scalars or arrays; gender as "Male"/"Female"), scored in one model
+    call. Returns a float array shaped like the broadcast inputs, or a
+    float for scalar inputs. With model None, uses estimate_simple.
+    """
+    gender, age, height, weight, duration, heart_rate, body_temp = np.broadcast_arrays(
+        np.asarray(gender, dtype=str), age, height, weight, duration, heart_rate, body_temp
+    )
+    if model is None:
+        calories = estimate_simple(gender, weight, duration, heart_rate)
+    else:
+        X = pd.DataFrame({
+            "Gender": (np.char.lower(gender) == "male").astype(int).ravel(),
+            "Age": age.ravel(),
+            "Height": height.ravel(),
+            "Weight": weight.ravel(),
+            "Duration": duration.ravel(),
+            "Heart_Rate": heart_rate.ravel(),
+            "Body_Temp": body_temp.ravel(),
+        }, columns=FEATURES).astype(float)
+        # Models fitted on arrays (no feature names) are given an array too
+        calories = np.asarray(model.predict(X if hasattr(model, "feature_names_in_") else X.to_numpy()))
+        calories = calories.reshape(gender.shape)
+    return float(calories) if calories.ndim == 0 else calories
+
+
+def scenario_grid(model, profile, exercises=(), durations=(), heart_rates=None, body_temp=38.5):
+    """
+    Estimates for every (exercise, duration, heart rate) scenario for one
+    person, in one model call. profile holds gender, age, height and weight.
+    Without heart_rates each exercise is scored at its typical heart rate
+    for the person's age. Returns one row per scenario.
+    """
+    rows = []
+    for exercise, duration in itertools.product(exercises, durations):
+        rates = heart_rates if heart_rates is not None else [typical_heart_rate(exercise, profile["age"])]
+        rows.extend((exercise, duration, rate) for rate in rates)
+    grid = pd.DataFrame(rows, columns=["Exercise", "Duration (min)", "Heart Rate"])
+    grid["Calories (kcal)"] = estimate_calories(
+        model, profile["gender"], profile["age"], profile["height"], profile["weight"],
+        grid["Duration (min)"].to_numpy(), grid["Heart Rate"].to_numpy(), body_temp,
+    ) if len(grid) else []
+    return grid
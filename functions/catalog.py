@@ -0,0 +1,210 @@
+# catalog.py
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from functions.food_search import normalize
+
+DATASET_DIR = "dataset"
+CATALOG_PATH = os.path.join(DATASET_DIR, "food_catalog.feather")
+
+# Bump when the schema or source mappings change so stale catalogs are rebuilt
+CATALOG_VERSION = "3"
+
+# Nutrition values are per 100 g
+NUTRIENTS = ["calories", "carbs", "protein", "fat", "sugar", "fiber", "gi"]
+
+KJ_PER_KCAL = 4.184
+
+# Source CSVs in priority order: when a food appears in several, each nutrient
+# comes from the first that has a value for it.
+# Each maps its name column and nutrient columns onto the unified schema; a
+# column given as (name, unit) is converted with the matching UNITS entry.
+SOURCES = [
+    {
+        "file": "pred_food.csv",
+        "food": "Food Name",
+        "columns": {
+            "calories": "Calories",
+            "carbs": "Carbohydrates",
+            "protein": "Protein",
+            "fat": "Fat",
+            "fiber": "Fiber Content",
+            "gi": "Glycemic Index",
+        },
+    },
+    {
+        # Daily intake log with many rows per food; reduced to the median
+        "file": "daily_food_nutrition_dataset.csv",
+        "food": "Food_Item",
+        "columns": {
+            "calories": "Calories (kcal)",
+            "carbs": "Carbohydrates (g)",
+            "protein": "Protein (g)",
+            "fat": "Fat (g)",
+            "sugar": "Sugars (g)",
+            "fiber": "Fiber (g)",
+        },
+    },
+    {
+        # Recipe metadata only; contributes no loggable nutrition
+        "file": "indian_food.csv",
+        "food": "name",
+        "columns": {},
+    },
+    {
+        # Values are strings such as "84 kj\n(20 kcal)" and "1.5 g"
+        "file": "Indian_Food_DF.csv",
+        "food": "name",
+        "columns": {
+            "calories": ("nutri_energy", "energy_text"),
+            "carbs": ("nutri_carbohydrate", "mass_text"),
+            "protein": ("nutri_protein", "mass_text"),
+            "fat": ("nutri_fat", "mass_text"),
+            "sugar": ("nutri_sugar", "mass_text"),
+            "fiber": ("nutri_fiber", "mass_text"),
+        },
+    },
+    {
+        # Energy in kJ; glycemic index is in the misspelt GyclemicIndex column
+        "file": "Nutrition_Dataset.csv",
+        "food": "FoodName",
+        "columns": {
+            "calories": ("Energywithdietaryfibre(kJ)", "kj"),
+            "carbs": "Availablecarbohydrateswithsugaralcohols(g)",
+            "protein": "Protein(g)",
+            "fat": "Totalfat(g)",
+            "sugar": "Totalsugars(g)",
+            "fiber": "Dietaryfibre(g)",
+            "gi": "GyclemicIndex",
+        },
+    },
+    {
+        "file": "Indian_Food_Nutrition_Processed.csv",
+        "food": "Dish Name",
+        "columns": {
+            "calories": "Calories (kcal)",
+            "carbs": "Carbohydrates (g)",
+            "protein": "Protein (g)",
+            "fat": "Fats (g)",
+            "sugar": "Free Sugar (g)",
+            "fiber": "Fibre (g)",
+        },
+    },
+]
+
+
+def _energy_text(series):
+    """'1,117 kj\n(267 kcal)' -> 267.0; kJ-only values are converted, anything else is NaN."""
+    text = series.astype(str).str.lower().str.replace(",", "", regex=False)
+    kcal = pd.to_numeric(text.str.extract(r"([\d.]+)\s*kcal", expand=False), errors="coerce")
+    kj = pd.to_numeric(text.str.extract(r"([\d.]+)\s*kj", expand=False), errors="coerce")
+    return kcal.fillna(kj / KJ_PER_KCAL)
+
+
+def _mass_text(series):
+    """'1.5 g' -> 1.5, '< 0.5 g' -> 0.5, '300 mg' -> 0.3; anything else is NaN."""
+    text = series.astype(str).str.lower().str.replace(",", "", regex=False)
+    parts = text.str.extract(r"([\d.]+)\s*(mg|g)\b")
+    grams = pd.to_numeric(parts[0], errors="coerce")
+    return grams.where(parts[1] != "mg", grams / 1000)
+
+
+UNITS = {
+    "kcal": lambda series: pd.to_numeric(series, errors="coerce"),
+    "kj": lambda series: pd.to_numeric(series, errors="coerce") / KJ_PER_KCAL,
+    "energy_text": _energy_text,
+    "mass_text": _mass_text,
+}
+
+
+def _normalize_source(source, dataset_dir):
+    raw = pd.read_csv(os.path.join(dataset_dir, source["file"]), encoding="ISO-8859-1")
+    df = pd.DataFrame({"food": raw[source["food"]]})
+    for nutrient in NUTRIENTS:
+        column = source["columns"].get(nutrient)
+        if column is None:
+            df[nutrient] = float("nan")
+        else:
+            column, unit = column if isinstance(column, tuple) else (column, "kcal")
+            df[nutrient] = UNITS[unit](raw[column])
+    df = df.dropna(subset=["food"])
+    df["food"] = df["food"].map(normalize)
+    df = df.groupby("food", sort=False, as_index=False)[NUTRIENTS].median()
+    df["source"] = source["file"]
+    return df
+
+
+def build_catalog(dataset_dir=DATASET_DIR):
+    """
+    Normalizes every source CSV into one DataFrame with the columns
+    food, calories, carbs, protein, fat, sugar, fiber, gi, source.
+    Foods without calories are dropped since they cannot be logged.
+    """
+    frames = [_normalize_source(source, dataset_dir) for source in SOURCES]
+    catalog = pd.concat(frames, ignore_index=True)
+    catalog = catalog[catalog["food"] != ""]
+    # Merged per nutrient: each value comes from the first source that has it
+    # for the food, so a food listed without sugar in one source picks up
+    # another's; source names the one that supplied the calories
+    merged = catalog.groupby("food", sort=False)[NUTRIENTS].first()
+    merged["source"] = catalog.dropna(subset=["calories"]).groupby("food", sort=False)["source"].first()
+    catalog = merged.dropna(subset=["calories"]).reset_index()
+    catalog[NUTRIENTS] = catalog[NUTRIENTS].astype("float32")
+    return catalog
+
+
+def _fingerprint(dataset_dir):
+    # Compiler version plus a hash of each source file; unlike mtimes these survive a git checkout
+    hashes = {}
+    for source in SOURCES:
+        with open(os.path.join(dataset_dir, source["file"]), "rb") as f:
+            hashes[source["file"]] = hashlib.sha256(f.read()).hexdigest()
+    return json.dumps({"version": CATALOG_VERSION, "sources": hashes}, sort_keys=True).encode()
+
+
+def write_catalog(catalog, out_path=CATALOG_PATH, dataset_dir=DATASET_DIR):
+    """Writes the catalog as an uncompressed Feather (Arrow IPC) file, which can be memory-mapped."""
+    table = pa.Table.from_pandas(catalog, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        b"catalog_fingerprint": _fingerprint(dataset_dir),
+    })
+    tmp_path = out_path + ".tmp"
+    feather.write_feather(table, tmp_path, compression="uncompressed")
+    os.replace(tmp_path, out_path)
+
+
+def compile_catalog(dataset_dir=DATASET_DIR, out_path=CATALOG_PATH):
+    """Builds the catalog from the source CSVs and writes it to out_path."""
+    catalog = build_catalog(dataset_dir)
+    write_catalog(catalog, out_path, dataset_dir)
+    return catalog
+
+
+def load_catalog(dataset_dir=DATASET_DIR, path=CATALOG_PATH, columns=None):
+    """
+    The compiled food catalog, with only the given columns (default all).
+    The file is memory-mapped and only the requested columns are copied
+    into pandas. If it is missing, was built by an older compiler, or its
+    source CSVs changed, it is rebuilt (and rewritten when the directory is
+    writable).
+    """
+    if os.path.exists(path):
+        table = feather.read_table(path, memory_map=True)
+        if (table.schema.metadata or {}).get(b"catalog_fingerprint") == _fingerprint(dataset_dir):
+            if columns is not None:
+                table = table.select(list(columns))
+            return table.to_pandas()
+
+    catalog = build_catalog(dataset_dir)
+    try:
+        write_catalog(catalog, path, dataset_dir)
+    except OSError:
+        pass
+    return catalog if columns is None else catalog[list(columns)]
@@ -0,0 +1,90 @@
+# chat.py
+
+import time
+
+from functions.llm import get_gemini_model
+
+# History sent with each question: at most MAX_TURNS earlier messages and
+# MAX_CONTEXT_CHARS characters, dropping the oldest first
+MAX_TURNS = 12
+MAX_CONTEXT_CHARS = 12000
+
+
+class GeminiChat:
+    """Streams Gemini's answer to a conversation."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+
+    def stream(self, messages):
+        """
+        Yields the answer to messages (dicts with role "user" or "assistant"
+        and content, the question last) piece by piece as it is generated.
+        """
+        contents = [
+            {"role": "model" if m["role"] == "assistant" else "user", "parts": [m["content"]]}
+            for m in messages
+        ]
+        for chunk in get_gemini_model(self.api_key).generate_content(contents, stream=True):
+            try:
+                text = chunk.text
+            except ValueError:
+                # A chunk with no text part, e.g. only safety ratings
+                continue
+            if text:
+                yield text
+
+
+class StubChat:
+    """
+    Local stand-in that answers without a network call, word by word, after
+    `delay` seconds per word. Use it for tests and offline runs.
+    """
+
+    def __init__(self, answer="This is a stub answer. Ask your doctor before changing your treatment.", delay=0.0):
+        self.answer = answer
+        self.delay = delay
+
+    def stream(self, messages):
+        for word in self.answer.split(" "):
+            if self.delay:
+                time.sleep(self.delay)
+            yield word + " "
+
+
+def trim_history(messages, max_turns=MAX_TURNS, max_chars=MAX_CONTEXT_CHARS):
+    """
+    The newest messages that fit within max_turns messages and max_chars
+    characters. The last message (the question) is always kept, and the
+    result never starts with an assistant message.
+    """
+    kept, chars = [], 0
+    for message in reversed(messages):
+        chars += len(message["content"])
+        if kept and (len(kept) >= max_turns or chars > max_chars):
+            break
+        kept.append(message)
+    kept.reverse()
+    while len(kept) > 1 and kept[0]["role"] == "assistant":
+        kept.pop(0)
+    return kept
+
+
+class TimedStream:
+    """
+    Wraps a stream of text chunks, noting when the first one arrived
+    (first_token_s, what the user waits for) and when the last did (total_s).
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.first_token_s = None
+        self.total_s = None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        for chunk in self.chunks:
+            if self.first_token_s is None:
+                self.first_token_s = time.perf_counter() - start
+            yield chunk
+        self.total_s = time.perf_counter() - start
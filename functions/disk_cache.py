@@ -0,0 +1,85 @@
+# disk_cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Returned by DiskCache.get when a key is absent or expired
+MISS = object()
+
+
+class DiskCache:
+    """
+    Small persistent key/value cache backed by SQLite, safe to share between
+    threads and processes.
+
+    - Entries expire after `ttl` seconds.
+    - A value of None is a negative entry ("looked up, nothing found") and
+      expires after `negative_ttl` seconds instead.
+    - When more than `max_entries` are stored, the least recently read
+      entries are evicted.
+    """
+
+    def __init__(self, path, ttl=30 * 24 * 3600, negative_ttl=24 * 3600, max_entries=10000):
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT, expires REAL, accessed REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Cached value for key (None for a negative entry), or MISS."""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return MISS
+            if row[1] < now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return MISS
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Stores a JSON-serializable value; None records a negative entry."""
+        now = time.time()
+        ttl = self.negative_ttl if value is None else self.ttl
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            count = conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN ("
+                    " SELECT key FROM cache ORDER BY accessed LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def delete(self, key):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache")
@@ -0,0 +1,122 @@
+# evaluation.py
+
+import json
+import os
+
+from functions.importance import REPORTS_DIR
+from functions.registry import get_model, get_dataset, artifact_hash
+
+LABELS = ["No Diabetes", "Diabetes"]
+
+
+def report_paths(model_hash, data_hash):
+    """JSON report, confusion matrix image and curves image for one model/dataset version."""
+    stem = os.path.join(REPORTS_DIR, f"evaluation_{model_hash[:12]}_{data_hash[:12]}")
+    return {
+        "json": stem + ".json",
+        "confusion_png": stem + "_confusion.png",
+        "curves_png": stem + "_curves.png",
+    }
+
+
+def _save_figure(fig, path):
+    import matplotlib.pyplot as plt
+    tmp_path = path + ".tmp.png"
+    fig.savefig(tmp_path, dpi=120, bbox_inches="tight")
+    plt.close(fig)
+    os.replace(tmp_path, path)
+
+
+def build_report(force=False):
+    """
+    Evaluates the current model on the held-out split used by training.py
+    (20%, random_state=42) and stores the metrics as JSON together with
+    pre-rendered confusion matrix and ROC/PR images. Skipped if a report for
+    the same model and dataset hashes already exists, unless force=True.
+
+    Returns:
+    - dict: paths of the stored files
+    """
+    model_hash = artifact_hash("diabetes")
+    data_hash = artifact_hash("diabetes_data")
+    paths = report_paths(model_hash, data_hash)
+    if all(os.path.exists(p) for p in paths.values()) and not force:
+        return paths
+
+    # Plotting and sklearn are only needed when building; the pages that just
+    # load a stored report do not import them
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import (
+        accuracy_score, average_precision_score, classification_report,
+        confusion_matrix, precision_recall_curve, roc_auc_score, roc_curve,
+    )
+    from sklearn.model_selection import train_test_split
+
+    df = get_dataset("diabetes_data")
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = get_model("diabetes")
+    y_score = model.predict_proba(X_test)[:, 1]
+    y_pred = model.predict(X_test)
+
+    cm = confusion_matrix(y_test, y_pred)
+    fpr, tpr, _ = roc_curve(y_test, y_score)
+    precision, recall, _ = precision_recall_curve(y_test, y_score)
+    report = {
+        "model_hash": model_hash,
+        "data_hash": data_hash,
+        "split": {"test_size": 0.2, "random_state": 42, "n_test": int(len(y_test))},
+        "accuracy": accuracy_score(y_test, y_pred),
+        "confusion_matrix": cm.tolist(),
+        "classification_report": classification_report(y_test, y_pred, output_dict=True),
+        "roc": {"fpr": fpr.tolist(), "tpr": tpr.tolist(), "auc": roc_auc_score(y_test, y_score)},
+        "pr": {
+            "precision": precision.tolist(),
+            "recall": recall.tolist(),
+            "average_precision": average_precision_score(y_test, y_score),
+        },
+    }
+
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+
+    fig, ax = plt.subplots()
+    sns.heatmap(cm, annot=True, fmt="d", cmap="Purples", xticklabels=LABELS, yticklabels=LABELS, ax=ax)
+    ax.set_xlabel("Predicted")
+    ax.set_ylabel("Actual")
+    _save_figure(fig, paths["confusion_png"])
+
+    fig, (ax_roc, ax_pr) = plt.subplots(1, 2, figsize=(10, 4))
+    ax_roc.plot(fpr, tpr, color="#C2185B", label=f"AUC = {report['roc']['auc']:.3f}")
+    ax_roc.plot([0, 1], [0, 1], linestyle="--", color="grey")
+    ax_roc.set_xlabel("False Positive Rate")
+    ax_roc.set_ylabel("True Positive Rate")
+    ax_roc.set_title("ROC Curve")
+    ax_roc.legend(loc="lower right")
+    ax_pr.plot(recall, precision, color="#C2185B", label=f"AP = {report['pr']['average_precision']:.3f}")
+    ax_pr.set_xlabel("Recall")
+    ax_pr.set_ylabel("Precision")
+    ax_pr.set_title("Precision-Recall Curve")
+    ax_pr.legend(loc="lower left")
+    _save_figure(fig, paths["curves_png"])
+
+    # Written last so a present JSON means the images are complete too
+    tmp_path = paths["json"] + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp_path, paths["json"])
+    return paths
+
+
+def load_report():
+    """
+    Returns (report dict, paths dict) for the current model version,
+    building the report first if it does not exist yet.
+    """
+    paths = build_report()
+    with open(paths["json"]) as f:
+        return json.load(f), paths
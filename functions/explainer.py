@@ -0,0 +1,52 @@
+# explainer.py
+
+import threading
+from functools import lru_cache
+
+# Fix deprecated numpy types for compatibility with SHAP
+import numpy as np
+if not hasattr(np, 'bool'):
+    np.bool = bool
+if not hasattr(np, 'int'):
+    np.int = int
+
+import pandas as pd
+import shap
+
+from functions.registry import get_model, artifact_hash
+
+_lock = threading.Lock()
+_explainers = {}
+
+
+def get_explainer(model_name="diabetes"):
+    """
+    Returns a TreeExplainer for the given tree-ensemble model, built once per
+    model version and shared by all sessions. Unlike the model-agnostic
+    shap.Explainer(model.predict_proba, X) it needs no background data and
+    never calls predict_proba.
+    """
+    version = artifact_hash(model_name)
+    key = (model_name, version)
+    if key not in _explainers:
+        with _lock:
+            if key not in _explainers:
+                _explainers[key] = shap.TreeExplainer(get_model(model_name))
+    return _explainers[key]
+
+
+@lru_cache(maxsize=1024)
+def _explain_row(model_name, version, columns, values):
+    explainer = get_explainer(model_name)
+    return explainer(pd.DataFrame([values], columns=list(columns)))
+
+
+def explain(input_df, model_name="diabetes"):
+    """
+    SHAP values for the first row of input_df, shape (1, features, classes).
+    Identical inputs for the same model version are served from memory.
+    """
+    row = input_df.iloc[0]
+    columns = tuple(input_df.columns)
+    values = tuple(float(v) for v in row.values)
+    return _explain_row(model_name, artifact_hash(model_name), columns, values)
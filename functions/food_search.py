@@ -0,0 +1,170 @@
+# food_search.py
+
+import heapq
+import re
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+
+# Rank buckets, best first
+EXACT, PREFIX, WORD_PREFIX, SUBSTRING, FUZZY = range(5)
+
+
+def normalize(text):
+    """Lower-cases and collapses whitespace so queries and names compare alike."""
+    return re.sub(r"\s+", " ", str(text).strip().lower())
+
+
+def trigrams(text, pad=True):
+    """
+    Character trigrams of every word, e.g. 'rice' -> '  r', ' ri', 'ric',
+    'ice', 'ce '. With pad=False only the trigrams inside words are returned
+    ('ric', 'ice'), which every name containing the text must also have.
+    """
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", text):
+        padded = f"  {word} " if pad else word
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FoodIndex:
+    """
+    In-memory search index over food names supporting prefix, substring and
+    typo-tolerant (trigram similarity) matching with ranked, limited results.
+
+    Built once from the food catalog; lookups touch only the names sharing
+    the query's rarest trigrams, or a bisected range of the sorted name and
+    word lists, instead of scanning every row.
+    """
+
+    def __init__(self, names):
+        self.names = []
+        seen = set()
+        for name in names:
+            if isinstance(name, str) and name.strip():
+                name = normalize(name)
+                if name not in seen:
+                    seen.add(name)
+                    self.names.append(name)
+
+        # trigram -> ascending list of name ids containing it
+        self._postings = defaultdict(list)
+        # word -> ascending list of name ids containing it
+        self._word_postings = defaultdict(list)
+        words = []
+        for i, name in enumerate(self.names):
+            for gram in trigrams(name, pad=False):
+                self._postings[gram].append(i)
+            for word in set(re.findall(r"[a-z0-9]+", name)):
+                self._word_postings[word].append(i)
+            for word in set(name.split(" ")[1:]):
+                words.append((word, i))
+        self._sorted_names = sorted((name, i) for i, name in enumerate(self.names))
+        self._sorted_words = sorted(words)
+
+        # Typo correction works on the (much smaller) word vocabulary
+        self._vocab = sorted(self._word_postings)
+        self._vocab_grams = [trigrams(word) for word in self._vocab]
+        self._vocab_postings = defaultdict(list)
+        for j, grams in enumerate(self._vocab_grams):
+            for gram in grams:
+                self._vocab_postings[gram].append(j)
+
+    def __len__(self):
+        return len(self.names)
+
+    @staticmethod
+    def _prefix_range(sorted_pairs, prefix, cap):
+        ids = []
+        pos = bisect_left(sorted_pairs, (prefix,))
+        while pos < len(sorted_pairs) and len(ids) < cap:
+            value, i = sorted_pairs[pos]
+            if not value.startswith(prefix):
+                break
+            ids.append(i)
+            pos += 1
+        return ids
+
+    def _similar_words(self, word, min_similarity, max_words=3):
+        """Vocabulary words whose trigram Jaccard similarity to `word` is high enough."""
+        grams = trigrams(word)
+        shared = defaultdict(int)
+        for gram in grams:
+            for j in self._vocab_postings.get(gram, ()):
+                shared[j] += 1
+        scored = []
+        for j, count in shared.items():
+            similarity = count / (len(grams) + len(self._vocab_grams[j]) - count)
+            if similarity >= min_similarity:
+                scored.append((similarity, self._vocab[j]))
+        return sorted(scored, reverse=True)[:max_words]
+
+    def search(self, query, limit=20, fuzzy=True, min_similarity=0.4):
+        """
+        Returns up to `limit` food names matching `query`, best first:
+        exact match, name prefix, word prefix, substring, then (if fewer
+        than `limit` were found and `fuzzy` is set) names containing every
+        query word or a close spelling of it (trigram similarity of at least
+        `min_similarity`), which tolerates typos. Ties go to the shorter name.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+
+        cap = max(limit * 4, 50)
+        ranked = {}
+
+        def add(i, rank, score=0.0):
+            key = (rank, score, len(self.names[i]), self.names[i])
+            if i not in ranked or key < ranked[i]:
+                ranked[i] = key
+
+        for i in self._prefix_range(self._sorted_names, query, cap):
+            add(i, EXACT if self.names[i] == query else PREFIX)
+        for i in self._prefix_range(self._sorted_words, query, cap):
+            add(i, WORD_PREFIX)
+
+        grams = trigrams(query, pad=False)
+        if grams and len(ranked) < limit:
+            # Every name containing the query also contains all of its
+            # in-word trigrams, so the rarest one's posting list is enough.
+            rarest = min(grams, key=lambda g: len(self._postings.get(g, ())))
+            found = 0
+            for i in self._postings.get(rarest, ()):
+                if i not in ranked and query in self.names[i]:
+                    add(i, SUBSTRING)
+                    found += 1
+                    if found >= cap:
+                        break
+
+        if fuzzy and len(ranked) < limit:
+            # Correct each query word against the vocabulary, then keep names
+            # containing a correction of every word.
+            matches = None
+            for word in re.findall(r"[a-z0-9]+", query):
+                if word in self._word_postings:
+                    options = [(1.0, word)]
+                elif len(word) >= 3:
+                    options = self._similar_words(word, min_similarity)
+                else:
+                    options = []
+                if not options:
+                    matches = {}
+                    break
+                word_matches = {}
+                for similarity, option in options:
+                    for i in self._word_postings[option]:
+                        word_matches[i] = max(word_matches.get(i, 0.0), similarity)
+                if matches is None:
+                    matches = word_matches
+                else:
+                    matches = {i: matches[i] + sim for i, sim in word_matches.items() if i in matches}
+            fuzzy_keys = (
+                (FUZZY, -score, len(self.names[i]), self.names[i])
+                for i, score in (matches or {}).items() if i not in ranked
+            )
+            best = heapq.nsmallest(limit, chain(ranked.values(), fuzzy_keys))
+        else:
+            best = heapq.nsmallest(limit, ranked.values())
+        return [name for _, _, _, name in best]
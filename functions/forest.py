@@ -0,0 +1,244 @@
+# forest.py
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+# Rows traversed at once; bounds the (rows x trees) index arrays
+CHUNK_ROWS = 4096
+
+# Node arrays written by save(), one .npy file each
+ARRAYS = ["feature", "threshold", "left", "right", "missing_left", "value", "roots"]
+FORMAT_VERSION = 1
+
+
+def _node_depths(children_left, children_right):
+    """Depth of every node of one sklearn tree, computed level by level."""
+    depth = np.zeros(len(children_left), dtype=np.intp)
+    level, frontier = 0, np.array([0])
+    while len(frontier):
+        children = np.concatenate([children_left[frontier], children_right[frontier]])
+        frontier = children[children != -1]
+        level += 1
+        depth[frontier] = level
+    return depth
+
+
+def _round_down_float32(values):
+    """
+    float32 thresholds that split float32 inputs exactly like the float64
+    originals: x <= t holds for a float32 x iff x <= the largest float32 <= t.
+    """
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+
+class CompiledForest:
+    """
+    A fitted sklearn random forest (classifier or regressor) flattened into
+    one array-of-nodes table and evaluated with vectorized NumPy traversal:
+    every row walks every tree in lockstep, one tree level per step.
+
+    Gives the same predict / predict_proba results as the forest it was built
+    from, without sklearn's per-call validation and joblib dispatch, which
+    dominate the cost of scoring a single row. Build with from_sklearn().
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, value, roots, depth,
+                 n_features_in_, classes_=None, feature_names_in_=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+        self.n_features_in_ = n_features_in_
+        if classes_ is not None:
+            self.classes_ = classes_
+        if feature_names_in_ is not None:
+            self.feature_names_in_ = feature_names_in_
+
+    @classmethod
+    def from_sklearn(cls, forest, max_depth=None, n_trees=None):
+        """
+        Flattens a fitted RandomForest/ExtraTrees classifier or regressor with
+        a single output. max_depth prunes every tree to that depth, the nodes
+        at the cut predicting their training samples' class mix or mean;
+        n_trees keeps only the first n_trees trees. Either changes the
+        predictions, so check the result against the forest.
+        """
+        trees = getattr(forest, "estimators_", None)
+        if not trees or getattr(forest, "n_outputs_", 1) != 1:
+            raise TypeError(f"Cannot compile {type(forest).__name__}: expected a fitted single-output forest")
+        is_classifier = hasattr(forest, "classes_")
+        trees = trees[:n_trees]
+
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in trees:
+            tree = estimator.tree_
+            children_left, children_right = tree.children_left, tree.children_right
+            keep = np.ones(tree.node_count, dtype=bool)
+            leaf = children_left == -1
+            if max_depth is not None:
+                depth = _node_depths(children_left, children_right)
+                keep = depth <= max_depth
+                leaf = leaf | (depth == max_depth)
+            # Renumber the kept nodes; preorder keeps every parent ahead of its children
+            index = np.cumsum(keep) - 1 + offset
+            own = index[keep]
+            leaf = leaf[keep]
+            # Leaves point at themselves, so rows that reach one early stay put
+            lefts.append(np.where(leaf, own, index[children_left[keep]]))
+            rights.append(np.where(leaf, own, index[children_right[keep]]))
+            features.append(np.where(leaf, 0, tree.feature[keep]))
+            thresholds.append(np.where(leaf, np.inf, tree.threshold[keep]))
+            tree_missing = getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8))
+            missing.append(tree_missing[keep].astype(bool))
+            value = tree.value[keep, 0, :]
+            if is_classifier:
+                # Older sklearn stores class counts, newer stores fractions
+                value = value / value.sum(axis=1, keepdims=True)
+            values.append(value)
+            roots.append(offset)
+            offset += len(own)
+
+        tree_depth = max(estimator.tree_.max_depth for estimator in trees)
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            missing_left=np.concatenate(missing),
+            value=np.concatenate(values).astype(np.float64),
+            roots=np.array(roots, dtype=np.intp),
+            depth=tree_depth if max_depth is None else min(tree_depth, max_depth),
+            n_features_in_=forest.n_features_in_,
+            classes_=forest.classes_ if is_classifier else None,
+            feature_names_in_=getattr(forest, "feature_names_in_", None),
+        )
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    def compact(self):
+        """
+        The same forest in the smallest dtypes that keep its splits exact:
+        float32 thresholds rounded down (inputs are compared as float32
+        anyway), int32 node links, the narrowest feature index type and
+        float32 leaf values, which shift outputs by at most ~1e-7.
+        """
+        return type(self)(
+            feature=self.feature.astype(np.min_scalar_type(max(self.n_features_in_ - 1, 0))),
+            threshold=_round_down_float32(self.threshold.astype(np.float64)),
+            left=self.left.astype(np.int32),
+            right=self.right.astype(np.int32),
+            missing_left=self.missing_left.astype(bool),
+            value=self.value.astype(np.float32),
+            roots=self.roots.astype(np.int32),
+            depth=self.depth,
+            n_features_in_=self.n_features_in_,
+            classes_=getattr(self, "classes_", None),
+            feature_names_in_=getattr(self, "feature_names_in_", None),
+        )
+
+    def save(self, path, **meta):
+        """
+        Writes the node arrays as .npy files plus meta.json (with any extra
+        meta given) to the directory path, replacing it in one rename.
+        """
+        tmp_path = path + ".tmp"
+        if os.path.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+        for name in ARRAYS:
+            np.save(os.path.join(tmp_path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        meta = dict(
+            meta,
+            format=FORMAT_VERSION,
+            depth=self.depth,
+            n_features_in_=int(self.n_features_in_),
+            classes_=self.classes_.tolist() if hasattr(self, "classes_") else None,
+            feature_names_in_=list(self.feature_names_in_) if hasattr(self, "feature_names_in_") else None,
+        )
+        with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Loads a forest written by save(). With mmap the arrays are mapped
+        read-only, so every process serving the model shares one copy of
+        them in the OS page cache. Returns (forest, meta).
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported forest format {meta.get('format')!r} in {path}")
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+            for name in ARRAYS
+        }
+        forest = cls(
+            **arrays,
+            depth=meta["depth"],
+            n_features_in_=meta["n_features_in_"],
+            classes_=np.array(meta["classes_"]) if meta["classes_"] is not None else None,
+            feature_names_in_=np.array(meta["feature_names_in_"], dtype=object)
+            if meta["feature_names_in_"] is not None else None,
+        )
+        return forest, meta
+
+    def _as_array(self, X):
+        if isinstance(X, pd.DataFrame) and hasattr(self, "feature_names_in_"):
+            names = list(self.feature_names_in_)
+            if list(X.columns) != names:
+                X = X[names]
+        # sklearn compares float32 inputs against float64 thresholds; do the same
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}")
+        return X
+
+    def _leaf_mean(self, X):
+        """Mean leaf value over all trees for each row of X, shape (rows, outputs)."""
+        X = self._as_array(X)
+        out = np.empty((len(X), self.value.shape[1]))
+        for start in range(0, len(X), CHUNK_ROWS):
+            chunk = X[start:start + CHUNK_ROWS]
+            rows = np.arange(len(chunk))[:, None]
+            node = np.broadcast_to(self.roots, (len(chunk), len(self.roots)))
+            for _ in range(self.depth):
+                x = chunk[rows, self.feature[node]]
+                go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+                node = np.where(go_left, self.left[node], self.right[node])
+            out[start:start + len(chunk)] = self.value[node].mean(axis=1, dtype=np.float64)
+        return out
+
+    def predict_proba(self, X):
+        if not hasattr(self, "classes_"):
+            raise AttributeError("predict_proba is only available for classifiers")
+        return self._leaf_mean(X)
+
+    def predict(self, X):
+        leaf_mean = self._leaf_mean(X)
+        if hasattr(self, "classes_"):
+            return self.classes_[leaf_mean.argmax(axis=1)]
+        return leaf_mean[:, 0]
@@ -0,0 +1,401 @@
+# health_db.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import date, datetime, time, timedelta
+
+import pandas as pd
+
+from functions.log_store import read_log
+from functions.serialization import json_default
+
+# Timezone import for IST
+try:
+    from zoneinfo import ZoneInfo  # Python 3.9+
+    IST = ZoneInfo("Asia/Kolkata")
+except ImportError:
+    from pytz import timezone
+    IST = timezone("Asia/Kolkata")
+
+DB_PATH = os.path.join("user_data", "health.db")
+# Where earlier versions kept the per-user log files
+LEGACY_DIR = "user_data"
+
+# table -> record field holding its timestamp
+TABLES = {
+    "meals": "timestamp",
+    "sugar_readings": "timestamp",
+    "exercise_sessions": "DateTime",
+}
+
+# Per-user log files written by earlier versions: <prefix>_<user key>.json[l]
+LEGACY_FILES = {
+    "meal_log": "meals",
+    "sugar_log": "sugar_readings",
+    "calorie_history": "exercise_sessions",
+}
+# Sugar readings above / below these (mg/dL) count as high / low
+HIGH_READING = 140
+LOW_READING = 70
+
+# Per-day rollup columns each table contributes to
+ROLLUP_COLUMNS = {
+    "meals": ["meal_count", "calories_in", "carbs", "protein", "fat", "sugar_intake"],
+    "exercise_sessions": ["exercise_count", "calories_out", "exercise_minutes"],
+    "sugar_readings": ["reading_count", "sugar_total", "sugar_min", "sugar_max", "high_readings", "low_readings"],
+}
+
+# Bump when the rollup definition changes; older databases are rebuilt on open
+SCHEMA_VERSION = 1
+
+LEGACY_FILE_RE = re.compile(r"^(meal_log|sugar_log|calorie_history)_([0-9a-f]{12})\.jsonl?$")
+
+
+def user_key(user_email):
+    """Hashed user id, the same one used in the user_data file names."""
+    return hashlib.md5(user_email.encode()).hexdigest()[:12]
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _contribution(table, record):
+    """Rollup column values one record adds to its day."""
+    if table == "meals":
+        return {
+            "meal_count": 1,
+            "calories_in": _number(record.get("calories")),
+            "carbs": _number(record.get("carbs")),
+            "protein": _number(record.get("protein")),
+            "fat": _number(record.get("fat")),
+            "sugar_intake": _number(record.get("sugar")),
+        }
+    if table == "exercise_sessions":
+        return {
+            "exercise_count": 1,
+            "calories_out": _number(record.get("Calories Burnt (kcal)")),
+            "exercise_minutes": _number(record.get("Duration (min)")),
+        }
+    level = _number(record.get("sugar_level"))
+    return {
+        "reading_count": 1,
+        "sugar_total": level,
+        "sugar_min": level,
+        "sugar_max": level,
+        "high_readings": int(level > HIGH_READING),
+        "low_readings": int(level < LOW_READING),
+    }
+
+
+def to_ist(value):
+    """datetime, date or ISO string -> timezone-aware IST datetime (naive values are taken as IST)."""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            value = pd.to_datetime(value).to_pydatetime()
+    elif not isinstance(value, datetime):
+        value = datetime.combine(value, time())
+    if value.tzinfo is None:
+        return IST.localize(value) if hasattr(IST, "localize") else value.replace(tzinfo=IST)
+    return value.astimezone(IST)
+
+
+class HealthDB:
+    """
+    SQLite store (WAL mode) for the meal, sugar reading and exercise
+    session logs of every user.
+
+    Each table keeps the record as JSON next to its user, epoch timestamp
+    and IST day, indexed on (user, ts) and (user, day), so day and date
+    range queries read only the matching rows.
+
+    A daily_rollup table holds per user and day totals (calories in and
+    out, macros, sugar intake, reading count/min/max/total and high/low
+    reading counts). Adds update it in the same transaction; deletes
+    recompute just the affected day.
+
+    The first time a user is seen, their log files from earlier versions
+    in legacy_dir are imported (once; the legacy_imports table records it).
+    """
+
+    def __init__(self, path=DB_PATH, legacy_dir=LEGACY_DIR):
+        self.path = path
+        self.legacy_dir = legacy_dir
+        self._local = threading.local()
+        self._imported = set()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            for table in TABLES:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} ("
+                    " id TEXT PRIMARY KEY, user TEXT NOT NULL, ts REAL NOT NULL,"
+                    " day TEXT NOT NULL, data TEXT NOT NULL)"
+                )
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_user_ts ON {table} (user, ts)")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_user_day ON {table} (user, day)")
+            columns = [column for table in TABLES for column in ROLLUP_COLUMNS[table]]
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS daily_rollup (user TEXT NOT NULL, day TEXT NOT NULL, "
+                + ", ".join(f"{column} REAL" for column in columns)
+                + ", PRIMARY KEY (user, day))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS legacy_imports (user TEXT PRIMARY KEY)")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                conn.execute("DELETE FROM daily_rollup")
+                days = set()
+                for table in TABLES:
+                    days.update(conn.execute(f"SELECT DISTINCT user, day FROM {table}").fetchall())
+                for user, day in days:
+                    self._recompute_day(conn, user, day)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _user(self, user_email):
+        """Hashed user id, importing the user's legacy log files on first sight."""
+        user = user_key(user_email)
+        if user not in self._imported:
+            with self._connect() as conn:
+                done = conn.execute("SELECT 1 FROM legacy_imports WHERE user = ?", (user,)).fetchone()
+            if not done:
+                # Imported ids are derived from the records, so a concurrent import adds nothing twice
+                import_user_files(user, self.legacy_dir, self)
+            self._imported.add(user)
+        return user
+
+    @staticmethod
+    def _row(table, user, record):
+        moment = to_ist(record[TABLES[table]])
+        return (
+            record["id"], user, moment.timestamp(), moment.date().isoformat(),
+            json.dumps(record, default=json_default),
+        )
+
+    @staticmethod
+    def _add_to_rollup(conn, table, user, day, record):
+        values = _contribution(table, record)
+        updates = []
+        for column in values:
+            if column == "sugar_min":
+                updates.append("sugar_min = MIN(COALESCE(sugar_min, excluded.sugar_min), excluded.sugar_min)")
+            elif column == "sugar_max":
+                updates.append("sugar_max = MAX(COALESCE(sugar_max, excluded.sugar_max), excluded.sugar_max)")
+            else:
+                updates.append(f"{column} = COALESCE({column}, 0) + excluded.{column}")
+        conn.execute(
+            f"INSERT INTO daily_rollup (user, day, {', '.join(values)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(values))}) "
+            f"ON CONFLICT (user, day) DO UPDATE SET {', '.join(updates)}",
+            [user, day, *values.values()],
+        )
+
+    def _recompute_day(self, conn, user, day):
+        """Rebuilds one day's rollup row from the stored records (min/max cannot be decremented)."""
+        conn.execute("DELETE FROM daily_rollup WHERE user = ? AND day = ?", (user, day))
+        for table in TABLES:
+            rows = conn.execute(f"SELECT data FROM {table} WHERE user = ? AND day = ?", (user, day)).fetchall()
+            for (data,) in rows:
+                self._add_to_rollup(conn, table, user, day, json.loads(data))
+
+    def add(self, table, user_email, record):
+        """Stores a copy of record and returns it with its assigned "id"."""
+        record = dict(record)
+        record.setdefault("id", uuid.uuid4().hex)
+        row = self._row(table, self._user(user_email), record)
+        with self._connect() as conn:
+            conn.execute(f"INSERT INTO {table} (id, user, ts, day, data) VALUES (?, ?, ?, ?, ?)", row)
+            self._add_to_rollup(conn, table, row[1], row[3], record)
+        return record
+
+    def add_many(self, table, user, records):
+        """
+        Bulk insert for an already hashed user id; records must carry an
+        "id" and ones already stored are skipped. Returns the number added.
+        """
+        rows = [self._row(table, user, record) for record in records]
+        with self._connect() as conn:
+            before = conn.total_changes
+            conn.executemany(f"INSERT OR IGNORE INTO {table} (id, user, ts, day, data) VALUES (?, ?, ?, ?, ?)", rows)
+            added = conn.total_changes - before
+            if added:
+                for day in {row[3] for row in rows}:
+                    self._recompute_day(conn, user, day)
+            return added
+
+    def delete(self, table, user_email, record_id):
+        user = self._user(user_email)
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT day FROM {table} WHERE user = ? AND id = ?", (user, record_id)).fetchone()
+            if row:
+                conn.execute(f"DELETE FROM {table} WHERE user = ? AND id = ?", (user, record_id))
+                self._recompute_day(conn, user, row[0])
+
+    def clear(self, table, user_email):
+        user = self._user(user_email)
+        with self._connect() as conn:
+            days = [day for (day,) in conn.execute(f"SELECT DISTINCT day FROM {table} WHERE user = ?", (user,))]
+            conn.execute(f"DELETE FROM {table} WHERE user = ?", (user,))
+            for day in days:
+                self._recompute_day(conn, user, day)
+
+    def query(self, table, user_email, start=None, end=None, limit=None, newest_first=False):
+        """
+        A user's records ordered by timestamp. start/end (inclusive) are
+        dates, matched against the IST day, or datetimes; limit keeps only
+        the first (or, with newest_first, the latest) rows.
+        """
+        sql = f"SELECT data FROM {table} WHERE user = ?"
+        params = [self._user(user_email)]
+        for bound, op in ((start, ">="), (end, "<=")):
+            if isinstance(bound, datetime):
+                sql += f" AND ts {op} ?"
+                params.append(to_ist(bound).timestamp())
+            elif isinstance(bound, date):
+                sql += f" AND day {op} ?"
+                params.append(bound.isoformat())
+        sql += " ORDER BY ts DESC" if newest_first else " ORDER BY ts"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def rollup(self, user_email, start, end):
+        """
+        Daily totals between the start and end dates (inclusive) as a
+        DataFrame with one row per day, days without records included.
+        Reads at most one row per day, however long the logs are.
+        """
+        columns = [column for table in TABLES for column in ROLLUP_COLUMNS[table]]
+        user = self._user(user_email)
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT day, {', '.join(columns)} FROM daily_rollup WHERE user = ? AND day >= ? AND day <= ?",
+                (user, start.isoformat(), end.isoformat()),
+            ).fetchall()
+        df = pd.DataFrame(rows, columns=["day"] + columns)
+        df[columns] = df[columns].astype("float64")
+        df["day"] = pd.to_datetime(df["day"]).dt.date
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        df = df.set_index("day").reindex(days)
+        extremes = ["sugar_min", "sugar_max"]
+        df = df.fillna({column: 0 for column in columns if column not in extremes})
+        df["sugar_mean"] = df["sugar_total"] / df["reading_count"].where(df["reading_count"] > 0)
+        return df
+
+    def count(self, table, user_email):
+        user = self._user(user_email)
+        with self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {table} WHERE user = ?", (user,)).fetchone()[0]
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Process-wide HealthDB shared by every Streamlit session."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = HealthDB()
+    return _db
+
+
+def _legacy_logs(data_dir):
+    """{(prefix, user): [paths]} of the legacy log files in data_dir."""
+    logs = {}
+    if not os.path.isdir(data_dir):
+        return logs
+    for filename in sorted(os.listdir(data_dir)):
+        match = LEGACY_FILE_RE.match(filename)
+        if match:
+            logs.setdefault(match.groups(), []).append(os.path.join(data_dir, filename))
+    return logs
+
+
+def _import_log(db, prefix, user, paths):
+    table = LEGACY_FILES[prefix]
+    # Prefer the .jsonl log, which already holds the imported .json list
+    jsonl = [path for path in paths if path.endswith(".jsonl")]
+    if jsonl:
+        records = read_log(jsonl[0])
+    else:
+        with open(paths[0]) as f:
+            records = json.load(f)
+    rows = []
+    for record in records:
+        if not isinstance(record, dict) or not record.get(TABLES[table]):
+            continue
+        if not record.get("id"):
+            content = json.dumps(record, sort_keys=True, default=json_default)
+            record = dict(record, id=uuid.uuid5(uuid.NAMESPACE_OID, f"{prefix}:{user}:{content}").hex)
+        rows.append(record)
+    return table, db.add_many(table, user, rows)
+
+
+def _mark_imported(db, user):
+    with db._connect() as conn:
+        conn.execute("INSERT OR IGNORE INTO legacy_imports (user) VALUES (?)", (user,))
+    db._imported.add(user)
+
+
+def import_user_files(user, data_dir=LEGACY_DIR, db=None):
+    """
+    Imports one user's (hashed id) legacy logs from data_dir and marks the
+    user as imported. Returns {table: added}.
+    """
+    db = db or get_db()
+    added = {}
+    for (prefix, owner), paths in _legacy_logs(data_dir).items():
+        if owner == user:
+            table, count = _import_log(db, prefix, user, paths)
+            added[table] = count
+    _mark_imported(db, user)
+    return added
+
+
+def migrate_user_files(data_dir=LEGACY_DIR, db=None):
+    """
+    Imports the per-user .json / .jsonl logs under data_dir into the
+    database. Records without an id get one derived from their content, so
+    running it again adds nothing twice. Returns {(table, user): added}.
+    """
+    db = db or get_db()
+    added = {}
+    for (prefix, user), paths in _legacy_logs(data_dir).items():
+        table, count = _import_log(db, prefix, user, paths)
+        added[(table, user)] = count
+        _mark_imported(db, user)
+    return added
+
+
+def today_ist():
+    return datetime.now(IST).date()
+
+
+def last_days(days):
+    """(start, end) dates covering the last `days` IST days, today included."""
+    today = today_ist()
+    return today - timedelta(days=days - 1), today
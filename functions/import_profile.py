@@ -0,0 +1,79 @@
+# import_profile.py
+
+import re
+import subprocess
+import sys
+
+# "import time:       412 |       1203 |     pandas.core"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)")
+
+
+def run_importtime(statement, cwd=None):
+    """
+    Runs `statement` in a fresh interpreter with -X importtime and returns
+    ({module: self_microseconds}, error). error is the last stderr line if
+    the statement failed, else None.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    modules = {}
+    other = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(1))
+        elif line.strip():
+            other.append(line.strip())
+    error = (other[-1] if other else f"exit code {proc.returncode}") if proc.returncode else None
+    return modules, error
+
+
+def summarize(modules, exclude=(), top=10):
+    """Total import time (ms) of `modules` not in `exclude`, and the top packages by time."""
+    packages = {}
+    for name, micros in modules.items():
+        if name not in exclude:
+            root = name.split(".")[0]
+            packages[root] = packages.get(root, 0) + micros
+    ranked = sorted(packages.items(), key=lambda item: -item[1])
+    return {
+        "total_ms": round(sum(packages.values()) / 1000, 1),
+        "modules": sum(1 for name in modules if name not in exclude),
+        "packages": {name: round(micros / 1000, 1) for name, micros in ranked[:top]},
+    }
+
+
+def profile_app(entry="main", pages=(), cwd=None, top=10):
+    """
+    Cold-start import profile: the cost of importing `entry` on top of a bare
+    interpreter, then for each page module the extra cost of importing it
+    after `entry`. Returns {target: summary} (see summarize), with an
+    "error" key for targets whose import failed.
+    """
+    startup, _ = run_importtime("pass", cwd)
+    base, error = run_importtime(f"import {entry}", cwd)
+    report = {entry: summarize(base, startup, top)}
+    if error:
+        report[entry]["error"] = error
+
+    seen = set(startup) | set(base)
+    for page in pages:
+        # A failing entry import still leaves its modules loaded, as in the app
+        statement = f"try:\n    import {entry}\nexcept Exception:\n    pass\nimport {page}"
+        modules, error = run_importtime(statement, cwd)
+        report[page] = summarize(modules, seen, top)
+        if error:
+            report[page]["error"] = error
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """Targets whose total import time grew by more than `tolerance` over the baseline."""
+    regressions = {}
+    for target, summary in report.items():
+        before = baseline.get(target, {}).get("total_ms")
+        if before and summary["total_ms"] > before * (1 + tolerance):
+            regressions[target] = (before, summary["total_ms"])
+    return regressions
@@ -0,0 +1,72 @@
+# importance.py
+
+import json
+import os
+
+import pandas as pd
+
+from functions.registry import get_model, get_dataset, artifact_hash
+
+REPORTS_DIR = os.path.join("datasets", "reports")
+
+
+def importance_path(model_hash, data_hash):
+    """Artifact path for one (model version, dataset version) pair."""
+    return os.path.join(REPORTS_DIR, f"permutation_importance_{model_hash[:12]}_{data_hash[:12]}.json")
+
+
+def build_importance(n_repeats=5, n_jobs=-1, force=False):
+    """
+    Computes permutation importances for the current model and dataset and
+    stores them as a versioned JSON artifact. Does nothing if an artifact
+    for the same model and dataset hashes already exists, unless force=True.
+
+    Returns:
+    - str: path of the artifact
+    """
+    model_hash = artifact_hash("diabetes")
+    data_hash = artifact_hash("diabetes_data")
+    path = importance_path(model_hash, data_hash)
+    if os.path.exists(path) and not force:
+        return path
+
+    # Only needed when building; pages that just load the stored file skip sklearn
+    from sklearn.inspection import permutation_importance
+
+    df = get_dataset("diabetes_data")
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+    result = permutation_importance(
+        get_model("diabetes"), X, y, n_repeats=n_repeats, random_state=42, n_jobs=n_jobs
+    )
+
+    artifact = {
+        "model_hash": model_hash,
+        "data_hash": data_hash,
+        "n_repeats": n_repeats,
+        "features": list(X.columns),
+        "importances_mean": result.importances_mean.tolist(),
+        "importances_std": result.importances_std.tolist(),
+    }
+    os.makedirs(REPORTS_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_importance():
+    """
+    Returns the permutation importances for the current model and dataset as
+    a DataFrame sorted by importance, building the artifact first if the
+    model or dataset changed since it was last computed.
+    """
+    path = build_importance()
+    with open(path) as f:
+        artifact = json.load(f)
+    return pd.DataFrame({
+        "Feature": artifact["features"],
+        "Importance": artifact["importances_mean"],
+        "Std": artifact["importances_std"],
+    }).sort_values(by="Importance", ascending=False)
@@ -0,0 +1,68 @@
+# latency.py
+
+import threading
+import time
+from collections import deque
+
+
+def _percentile(ordered, q):
+    """q-th percentile of a sorted list, interpolated like numpy.percentile."""
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class LatencyStats:
+    """Rolling request latencies and batch sizes for one endpoint or call site."""
+
+    def __init__(self, window=10000):
+        self._latencies = deque(maxlen=window)
+        self._batch_sizes = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+            self.count += 1
+
+    def record_batch(self, size):
+        with self._lock:
+            self._batch_sizes.append(size)
+
+    def summary(self):
+        """
+        Request count plus p50/p90/p99/max latency in milliseconds over the
+        window, and mean_batch_size once record_batch() has been called.
+        """
+        with self._lock:
+            latencies = sorted(seconds * 1000 for seconds in self._latencies)
+            batch_sizes = list(self._batch_sizes)
+            count = self.count
+        if not latencies:
+            return {"count": count}
+        summary = {
+            "count": count,
+            "p50_ms": round(_percentile(latencies, 50), 3),
+            "p90_ms": round(_percentile(latencies, 90), 3),
+            "p99_ms": round(_percentile(latencies, 99), 3),
+            "max_ms": round(latencies[-1], 3),
+        }
+        if batch_sizes:
+            summary["mean_batch_size"] = round(sum(batch_sizes) / len(batch_sizes), 2)
+        return summary
+
+
+class Timer:
+    """`with Timer(stats):` records the block's wall time in a LatencyStats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(time.perf_counter() - self.start)
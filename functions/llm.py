@@ -0,0 +1,24 @@
+# llm.py
+
+import threading
+
+MODEL_NAME = "gemini-2.0-flash"
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_gemini_model(api_key, model_name=MODEL_NAME):
+    """
+    Shared Gemini model, created on first use. google.generativeai is
+    imported here rather than at module level, so pages that never call
+    Gemini do not pay for it at startup.
+    """
+    key = (api_key, model_name)
+    if key not in _models:
+        with _lock:
+            if key not in _models:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                _models[key] = genai.GenerativeModel(model_name)
+    return _models[key]
@@ -0,0 +1,29 @@
+# log_store.py
+
+import json
+import os
+
+
+def read_log(path):
+    """
+    Live records of a per-user JSON Lines log written by earlier versions,
+    in the order they were appended. Read-only: the file is left as it is.
+
+    Every line is one operation: {"op": "put", "record": {...}} or
+    {"op": "del", "id": ...}; a partial last line from an interrupted
+    append is skipped.
+    """
+    live = {}
+    if not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("op") == "put":
+                live[entry["record"]["id"]] = entry["record"]
+            elif entry.get("op") == "del":
+                live.pop(entry["id"], None)
+    return list(live.values())
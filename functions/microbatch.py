@@ -0,0 +1,76 @@
+# microbatch.py
+
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Collects rows submitted by concurrent requests and scores them together.
+
+    The first waiting row opens a batch; it is flushed once `max_batch` rows
+    are queued or `max_wait` seconds have passed, whichever comes first.
+    `predict(rows)` gets a list of rows and must return one result per row.
+    It runs in a worker thread so the event loop keeps accepting requests.
+    """
+
+    def __init__(self, predict, max_batch=64, max_wait=0.002, stats=None):
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats
+        self._queue = None
+        self._worker = None
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, rows):
+        """Scores rows (a list) as part of the next batch and returns their results."""
+        if self._worker is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((rows, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            size = len(pending[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            rows = [row for item_rows, _ in pending for row in item_rows]
+            try:
+                results = await loop.run_in_executor(None, self.predict, rows)
+            except Exception as e:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch(len(rows))
+            start = 0
+            for item_rows, future in pending:
+                if not future.done():
+                    future.set_result(results[start:start + len(item_rows)])
+                start += len(item_rows)
@@ -0,0 +1,241 @@
+# pipeline.py
+
+import hashlib
+import json
+import os
+import platform
+import shutil
+import time
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from functions.registry import MODEL_ROOT
+
+# Train/test split and search seeds; fixed so reruns on the same data match.
+# functions/evaluation.py scores the model on the same held-out split.
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+
+
+def _diabetes_data():
+    df = pd.read_csv(os.path.join("datasets", "diabetes.csv"))
+    return df.drop("Outcome", axis=1), df["Outcome"]
+
+
+def _calories_data():
+    exercise = pd.read_csv(os.path.join("datasets", "exercise.csv"))
+    calories = pd.read_csv(os.path.join("datasets", "calories.csv"))
+    df = pd.merge(exercise, calories, on="User_ID").drop("User_ID", axis=1)
+    df["Gender"] = df["Gender"].map({"male": 1, "female": 0})
+    return df.drop("Calories", axis=1), df["Calories"]
+
+
+# name -> how to train it. "search" is the hyperparameter space sampled by
+# RandomizedSearchCV; the scoring metric picks the winner.
+MODELS = {
+    "diabetes": {
+        "task": "classification",
+        "data": _diabetes_data,
+        "sources": [os.path.join("datasets", "diabetes.csv")],
+        "defaults": {"n_estimators": 100},
+        "search": {
+            "n_estimators": [100, 200, 400],
+            "max_depth": [None, 4, 6, 8, 12],
+            "min_samples_leaf": [1, 2, 4, 8],
+            "max_features": ["sqrt", 0.5, None],
+            "class_weight": [None, "balanced"],
+        },
+        "scoring": "roc_auc",
+    },
+    "calories": {
+        "task": "regression",
+        "data": _calories_data,
+        "sources": [os.path.join("datasets", "exercise.csv"), os.path.join("datasets", "calories.csv")],
+        "defaults": {"n_estimators": 100},
+        "search": {
+            "n_estimators": [100, 200],
+            "max_depth": [None, 12, 20],
+            "min_samples_leaf": [1, 2, 4],
+            "max_features": [1.0, 0.5, "sqrt"],
+        },
+        "scoring": "neg_mean_absolute_error",
+    },
+}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def score_model(task, model, X_test, y_test):
+    """Held-out metrics: accuracy/precision/recall/F1/ROC AUC, or MAE/RMSE/R²."""
+    from sklearn import metrics
+
+    y_pred = model.predict(X_test)
+    if task == "classification":
+        y_score = model.predict_proba(X_test)[:, 1]
+        return {
+            "accuracy": metrics.accuracy_score(y_test, y_pred),
+            "precision": metrics.precision_score(y_test, y_pred, zero_division=0),
+            "recall": metrics.recall_score(y_test, y_pred, zero_division=0),
+            "f1": metrics.f1_score(y_test, y_pred, zero_division=0),
+            "roc_auc": metrics.roc_auc_score(y_test, y_score),
+        }
+    return {
+        "mae": metrics.mean_absolute_error(y_test, y_pred),
+        "rmse": float(np.sqrt(metrics.mean_squared_error(y_test, y_pred))),
+        "r2": metrics.r2_score(y_test, y_pred),
+    }
+
+
+def split(name):
+    """The model's data as (X_train, X_test, y_train, y_test), split as for training."""
+    from sklearn.model_selection import train_test_split
+
+    X, y = MODELS[name]["data"]()
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+
+
+def train(name, n_jobs=-1, cv=5, n_iter=20, search=True):
+    """
+    Fits one model from MODELS and returns (model, manifest).
+
+    With search, RandomizedSearchCV samples n_iter settings from the model's
+    search space, scores each by cv-fold cross-validation on the training
+    split and refits the best; folds run in parallel over n_jobs cores.
+    Without it the defaults (the original script's settings) are fitted
+    with n_jobs. The manifest holds the parameters, cross-validation and
+    held-out test scores, and SHA-256 hashes of the source data.
+    """
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+    from sklearn.model_selection import KFold, RandomizedSearchCV, StratifiedKFold
+
+    spec = MODELS[name]
+    classification = spec["task"] == "classification"
+    X_train, X_test, y_train, y_test = split(name)
+
+    estimator_class = RandomForestClassifier if classification else RandomForestRegressor
+    start = time.perf_counter()
+    if search:
+        folds = (StratifiedKFold if classification else KFold)(cv, shuffle=True, random_state=RANDOM_STATE)
+        searcher = RandomizedSearchCV(
+            estimator_class(random_state=RANDOM_STATE),
+            spec["search"],
+            n_iter=n_iter,
+            scoring=spec["scoring"],
+            cv=folds,
+            n_jobs=n_jobs,
+            random_state=RANDOM_STATE,
+        )
+        searcher.fit(X_train, y_train)
+        model = searcher.best_estimator_
+        params = searcher.best_params_
+        cv_score = {"scoring": spec["scoring"], "mean": searcher.best_score_,
+                    "std": searcher.cv_results_["std_test_score"][searcher.best_index_]}
+    else:
+        params = dict(spec["defaults"])
+        model = estimator_class(random_state=RANDOM_STATE, n_jobs=n_jobs, **params)
+        model.fit(X_train, y_train)
+        cv_score = None
+    fit_seconds = time.perf_counter() - start
+
+    # Served models score one row at a time, where worker threads only add overhead
+    model.set_params(n_jobs=None)
+
+    import sklearn
+    manifest = {
+        "name": name,
+        "task": spec["task"],
+        "estimator": type(model).__name__,
+        "params": params,
+        "search": {"n_iter": n_iter, "cv": cv} if search else None,
+        "cv_score": cv_score,
+        "test_metrics": score_model(spec["task"], model, X_test, y_test),
+        "features": list(X_train.columns),
+        "rows": {"train": len(X_train), "test": len(X_test)},
+        "data": {path: file_sha256(path) for path in spec["sources"]},
+        "random_state": RANDOM_STATE,
+        "fit_seconds": round(fit_seconds, 2),
+        "n_jobs": n_jobs,
+        "versions": {"python": platform.python_version(), "sklearn": sklearn.__version__, "numpy": np.__version__},
+    }
+    return model, json.loads(json.dumps(manifest, default=lambda value: value.item()))
+
+
+def _write_json(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish(name, model, manifest, root=MODEL_ROOT, activate=True):
+    """
+    Writes model.joblib and manifest.json to root/<name>/<version>/ and, with
+    activate, points root/<name>/current.json at it. The version directory is
+    written under a temporary name and renamed into place, and the pointer is
+    replaced atomically, so the app never sees a half-written version.
+    Returns the version.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    model_dir = os.path.join(root, name)
+    os.makedirs(model_dir, exist_ok=True)
+    version, n = stamp, 1
+    while os.path.exists(os.path.join(model_dir, version)):
+        n += 1
+        version = f"{stamp}-{n}"
+
+    tmp_dir = os.path.join(model_dir, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    try:
+        model_path = os.path.join(tmp_dir, "model.joblib")
+        joblib.dump(model, model_path)
+        manifest = dict(manifest, version=version, created_at=datetime.now(timezone.utc).isoformat(),
+                        artifact_sha256=file_sha256(model_path))
+        _write_json(os.path.join(tmp_dir, "manifest.json"), manifest)
+        os.rename(tmp_dir, os.path.join(model_dir, version))
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+
+    if activate:
+        activate_version(name, version, root)
+    return version
+
+
+def activate_version(name, version, root=MODEL_ROOT):
+    """Points the app at an already published version, e.g. to roll back."""
+    if not os.path.exists(os.path.join(root, name, version, "model.joblib")):
+        raise FileNotFoundError(f"No published {name} model version {version!r}")
+    _write_json(os.path.join(root, name, "current.json"), {"version": version})
+
+
+def list_versions(name, root=MODEL_ROOT):
+    """Manifests of every published version of a model, oldest first."""
+    model_dir = os.path.join(root, name)
+    if not os.path.isdir(model_dir):
+        return []
+    manifests = []
+    for version in sorted(os.listdir(model_dir)):
+        path = os.path.join(model_dir, version, "manifest.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                manifests.append(json.load(f))
+    return manifests
+
+
+def current_version(name, root=MODEL_ROOT):
+    try:
+        with open(os.path.join(root, name, "current.json")) as f:
+            return json.load(f)["version"]
+    except OSError:
+        return None
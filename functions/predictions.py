@@ -0,0 +1,114 @@
+# predictions.py
+
+import csv
+import io
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# Columns shown and exported; the query never asks for more
+HISTORY_COLUMNS = [
+    "timestamp", "pregnancies", "glucose", "blood_pressure",
+    "skin_thickness", "insulin", "bmi",
+    "diabetes_pedigree_function", "age", "risk_percent", "prediction",
+]
+LABELS = ["Positive", "Negative"]
+PAGE_SIZE = 25
+EXPORT_CHUNK = 1000
+
+
+def _ist_midnight(day):
+    return datetime.combine(day, time.min, tzinfo=IST).isoformat()
+
+
+def cursor(row):
+    """Keyset cursor of a fetched row: its (timestamp, id)."""
+    return row["timestamp"], row["id"]
+
+
+def fetch_page(client, email, before=None, start=None, end=None, label=None, limit=PAGE_SIZE):
+    """
+    Up to limit of the user's predictions, newest first (ties by id),
+    after the `before` cursor: the (timestamp, id) of the previous page's
+    last row, so rows sharing a timestamp across a page boundary are not
+    skipped. start and end are dates (IST, inclusive) and label is
+    "Positive" or "Negative". All filtering happens in the database; an
+    index on predictions (user_email, timestamp desc, id desc) serves it
+    directly. Rows carry their id besides HISTORY_COLUMNS.
+    """
+    columns = ",".join(["id"] + HISTORY_COLUMNS)
+    query = client.table("predictions").select(columns).eq("user_email", email)
+    if start is not None:
+        query = query.gte("timestamp", _ist_midnight(start))
+    if end is not None:
+        query = query.lt("timestamp", _ist_midnight(end + timedelta(days=1)))
+    if label:
+        query = query.eq("prediction", label)
+    if before is not None:
+        timestamp, row_id = before
+        query = query.or_(f'timestamp.lt."{timestamp}",and(timestamp.eq."{timestamp}",id.lt.{row_id})')
+    query = query.order("timestamp", desc=True).order("id", desc=True)
+    return query.limit(limit).execute().data or []
+
+
+def iter_rows(client, email, start=None, end=None, label=None, chunk=EXPORT_CHUNK):
+    """Every matching prediction, newest first, fetched chunk rows at a time."""
+    before = None
+    while True:
+        rows = fetch_page(client, email, before, start, end, label, limit=chunk)
+        yield from rows
+        if len(rows) < chunk:
+            return
+        before = cursor(rows[-1])
+
+
+def iter_csv(client, email, start=None, end=None, label=None, chunk=EXPORT_CHUNK):
+    """The matching predictions as CSV text, yielded one chunk of rows at a time."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=HISTORY_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for i, row in enumerate(iter_rows(client, email, start, end, label, chunk), 1):
+        writer.writerow(row)
+        if i % chunk == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+class HistoryPager:
+    """
+    Keyset pagination over one user's predictions with fixed filters.
+    Fetched pages are kept, so paging back and forth or rerendering does
+    not query again; make a new pager when the filters change or rows are
+    added or deleted.
+    """
+
+    def __init__(self, client, email, start=None, end=None, label=None, page_size=PAGE_SIZE):
+        self.client = client
+        self.email = email
+        self.filters = {"start": start, "end": end, "label": label}
+        self.page_size = page_size
+        self.pages = []
+        self.exhausted = False
+
+    def _fetch_next(self):
+        before = cursor(self.pages[-1][-1]) if self.pages else None
+        # One extra row tells whether another page follows
+        rows = fetch_page(self.client, self.email, before, limit=self.page_size + 1, **self.filters)
+        self.exhausted = len(rows) <= self.page_size
+        if rows[:self.page_size] or not self.pages:
+            self.pages.append(rows[:self.page_size])
+
+    def page(self, index):
+        """Rows of page index (0 = newest), fetching the pages up to it that are not cached yet."""
+        while len(self.pages) <= index and not self.exhausted:
+            self._fetch_next()
+        if index < len(self.pages):
+            return self.pages[index]
+        return []
+
+    def has_next(self, index):
+        return index + 1 < len(self.pages) or not self.exhausted
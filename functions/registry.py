@@ -0,0 +1,184 @@
+# registry.py
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+
+import joblib
+import pandas as pd
+
+
+def _load_pickle(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+# name -> (path, loader). Paths are relative to the app root, like the rest of the app.
+ARTIFACTS = {
+    "diabetes": (os.path.join("datasets", "diabetes_model.pkl"), joblib.load),
+    "diabetes_data": (os.path.join("datasets", "diabetes.csv"), pd.read_csv),
+    "calories": ("calories_model.pkl", _load_pickle),
+}
+
+# Models published by training.py live in models/<name>/<version>/model.joblib,
+# and models/<name>/current.json names the version to serve
+MODEL_ROOT = "models"
+
+_lock = threading.RLock()
+_loaded = {}
+_compiled = {}
+_pointers = {}
+_stats = {}
+_hashes = {}
+
+
+def _rss_bytes():
+    """Current resident set size of this process in bytes (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def artifact_path(name):
+    """
+    Path an artifact is loaded from: the version named in
+    models/<name>/current.json once training.py has published one,
+    otherwise its path in ARTIFACTS.
+    """
+    if name not in ARTIFACTS:
+        raise KeyError(f"Unknown artifact: {name}")
+    pointer = os.path.join(MODEL_ROOT, name, "current.json")
+    try:
+        stat = os.stat(pointer)
+    except OSError:
+        return ARTIFACTS[name][0]
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _pointers.get(name, (None,))[0] != key:
+        with open(pointer) as f:
+            version = json.load(f)["version"]
+        _pointers[name] = (key, os.path.join(MODEL_ROOT, name, version, "model.joblib"))
+    return _pointers[name][1]
+
+
+def get_artifact(name):
+    """
+    Returns the shared in-process instance of a registered artifact,
+    loading it on first use. All Streamlit sessions get the same object.
+    When a new model version is published it is loaded on the next call,
+    so running apps switch over without a restart.
+    """
+    path = artifact_path(name)
+    entry = _loaded.get(name)
+    if entry is not None and entry[0] == path:
+        return entry[1]
+
+    with _lock:
+        entry = _loaded.get(name)
+        if entry is None or entry[0] != path:
+            default_path, loader = ARTIFACTS[name]
+            if path != default_path:
+                loader = joblib.load
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            _loaded[name] = (path, loader(path))
+            _stats[name] = {
+                "path": path,
+                "load_seconds": round(time.perf_counter() - start, 4),
+                "rss_bytes": max(_rss_bytes() - rss_before, 0),
+                "file_bytes": os.path.getsize(path),
+            }
+    return _loaded[name][1]
+
+
+def get_model(name="diabetes"):
+    """Shared model instance, e.g. get_model() or get_model("calories")."""
+    return get_artifact(name)
+
+
+def export_path(name):
+    """Where export_model.py writes a model's compact form: beside the model file."""
+    return os.path.splitext(artifact_path(name))[0] + ".forest"
+
+
+def _load_compiled(name, version):
+    """The model's exported compact forest if it was made from this version, else compiled now."""
+    from functions.forest import CompiledForest
+
+    path = export_path(name)
+    if os.path.isdir(path):
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        forest, meta = CompiledForest.load(path)
+        if meta.get("source_sha256") == version:
+            _stats[f"{name}:compiled"] = {
+                "path": path,
+                "load_seconds": round(time.perf_counter() - start, 4),
+                "rss_bytes": max(_rss_bytes() - rss_before, 0),
+                "file_bytes": forest.nbytes,
+            }
+            return forest
+    return CompiledForest.from_sklearn(get_model(name))
+
+
+def get_predictor(name="diabetes", backend=None):
+    """
+    The model to predict with for the configured inference_backend
+    (data/config.py) or the given backend: the sklearn estimator itself, or
+    for "compiled" a CompiledForest, memory-mapped from the export_model.py
+    output when one matches the current model and built from it otherwise.
+    """
+    if backend is None:
+        from data.config import inference_backend as backend
+    if backend == "sklearn":
+        return get_model(name)
+    if backend != "compiled":
+        raise ValueError(f"Unknown inference backend: {backend}")
+    version = artifact_hash(name)
+    entry = _compiled.get(name)
+    if entry is None or entry[0] != version:
+        with _lock:
+            entry = _compiled.get(name)
+            if entry is None or entry[0] != version:
+                _compiled[name] = entry = (version, _load_compiled(name, version))
+    return entry[1]
+
+
+def get_dataset(name="diabetes_data"):
+    """Shared dataset instance. Callers must not modify it in place."""
+    return get_artifact(name)
+
+
+def artifact_stats():
+    """Load time and resident memory growth for every artifact loaded so far."""
+    with _lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+
+def artifact_hash(name):
+    """
+    SHA-256 of an artifact's file, used as its version. Recomputed only
+    when the file's size or modification time changes.
+    """
+    path = artifact_path(name)
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    if _hashes.get(name, (None,))[0] != key:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        _hashes[name] = (key, digest.hexdigest())
+    return _hashes[name][1]
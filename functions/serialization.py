@@ -0,0 +1,12 @@
+# serialization.py
+
+from datetime import date, datetime
+
+
+def json_default(value):
+    """json.dumps default= hook for datetimes and numpy scalars."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy / pandas scalars
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
@@ -0,0 +1,176 @@
+# sugar_lookup.py
+
+import json
+import os
+
+import pandas as pd
+
+from functions.disk_cache import DiskCache, MISS
+from functions.food_search import normalize
+
+CACHE_PATH = os.path.join("cache", "sugar.sqlite")
+QUANTITY_BUCKET = 50  # grams
+
+# Used when the LLM answer cannot be parsed, or the call fails (never cached)
+FALLBACK = {"sugar_grams": 5.0, "total_carbs": 20.0, "food_category": "unknown", "glycemic_impact": "medium"}
+ERROR_FALLBACK = {"sugar_grams": 0.0, "total_carbs": 0.0, "food_category": "unknown", "glycemic_impact": "low"}
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DiskCache(CACHE_PATH, ttl=90 * 24 * 3600)
+    return _cache
+
+
+def quantity_bucket(quantity):
+    """Rounds a quantity in grams to the nearest bucket, e.g. 130 -> 150."""
+    try:
+        quantity = float(quantity)
+    except (TypeError, ValueError):
+        quantity = 100.0
+    return max(QUANTITY_BUCKET, int(round(quantity / QUANTITY_BUCKET)) * QUANTITY_BUCKET)
+
+
+def glycemic_impact(gi):
+    if gi is None or pd.isna(gi):
+        return "unknown"
+    return "low" if gi <= 55 else "medium" if gi < 70 else "high"
+
+
+def _number(value):
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _scaled(data, quantity, bucket):
+    factor = _number(quantity) / bucket if quantity else 1.0
+    return {
+        **data,
+        "sugar_grams": round(_number(data.get("sugar_grams")) * factor, 2),
+        "total_carbs": round(_number(data.get("total_carbs")) * factor, 2),
+    }
+
+
+def _from_catalog(food, quantity, catalog):
+    if catalog is None or food not in catalog.index:
+        return None
+    row = catalog.loc[food]
+    if isinstance(row, pd.DataFrame):
+        row = row.iloc[0]
+    if pd.isna(row.get("sugar")):
+        return None
+    factor = float(quantity or 100) / 100
+    return {
+        "sugar_grams": round(float(row["sugar"]) * factor, 2),
+        "total_carbs": round(float(row["carbs"]) * factor, 2) if pd.notna(row.get("carbs")) else 0.0,
+        "food_category": "dataset",
+        "glycemic_impact": glycemic_impact(row.get("gi")),
+    }
+
+
+def _ask_llm(model, items):
+    """One prompt for all (food, grams) pairs; returns a list aligned with items."""
+    listing = "\n    ".join(f"{i + 1}. {food} ({grams}g)" for i, (food, grams) in enumerate(items))
+    prompt = f"""
+    Analyze the sugar content for each of these foods at the given quantity:
+    {listing}
+
+    Provide ONLY a JSON array with one object per food, in the same order, each with this structure:
+    {{
+        "sugar_grams": <number>,
+        "total_carbs": <number>,
+        "food_category": "<category>",
+        "glycemic_impact": "<low/medium/high>"
+    }}
+
+    Base your response on standard nutritional data. Be accurate and concise.
+    """
+    response = model.generate_content(prompt)
+    text = response.text.strip()
+    start, end = text.find('['), text.rfind(']') + 1
+    if start == -1 or end == 0:
+        return [None] * len(items)
+    try:
+        parsed = json.loads(text[start:end])
+    except ValueError:
+        return [None] * len(items)
+    if not isinstance(parsed, list):
+        return [None] * len(items)
+    answers = []
+    for answer in parsed[:len(items)]:
+        try:
+            answers.append({
+                "sugar_grams": float(answer["sugar_grams"]),
+                "total_carbs": _number(answer.get("total_carbs")),
+                "food_category": str(answer.get("food_category", "unknown")),
+                "glycemic_impact": str(answer.get("glycemic_impact", "unknown")),
+            })
+        except (TypeError, KeyError, ValueError, AttributeError):
+            answers.append(None)
+    return answers + [None] * (len(items) - len(answers))
+
+
+def resolve_sugar(meals, get_model, catalog=None, on_error=None):
+    """
+    Sugar data for each meal, resolved in order from:
+    1. the 'sugar' value stored on the meal when it was logged,
+    2. the local food catalog (indexed by normalized food name),
+    3. the persistent cache keyed by (food, quantity bucket),
+    4. a single batched LLM prompt covering every remaining food.
+
+    get_model is called for the LLM only when step 4 has foods to ask about,
+    so a day that resolves locally never creates a client.
+
+    Returns a list of dicts (sugar_grams, total_carbs, food_category,
+    glycemic_impact) aligned with `meals`. If the LLM call fails, `on_error`
+    is called with the exception and the affected meals get zero sugar.
+    """
+    cache = get_cache()
+    results = [None] * len(meals)
+    pending = {}  # (food, bucket) -> meal indexes
+
+    for i, meal in enumerate(meals):
+        food = normalize(meal.get('food', ''))
+        quantity = meal.get('quantity', 100)
+        if meal.get('sugar') is not None and not pd.isna(meal.get('sugar')):
+            results[i] = {
+                "sugar_grams": _number(meal['sugar']),
+                "total_carbs": _number(meal.get('carbs')),
+                "food_category": "logged",
+                "glycemic_impact": "unknown",
+            }
+            continue
+        results[i] = _from_catalog(food, quantity, catalog)
+        if results[i] is not None:
+            continue
+        bucket = quantity_bucket(quantity)
+        cached = cache.get(f"{food}|{bucket}")
+        if cached is not MISS and cached is not None:
+            results[i] = _scaled(cached, quantity, bucket)
+        else:
+            pending.setdefault((food, bucket), []).append(i)
+
+    if pending:
+        keys = list(pending)
+        fallback = FALLBACK
+        model = get_model()
+        try:
+            answers = _ask_llm(model, keys)
+        except Exception as e:
+            if on_error is not None:
+                on_error(e)
+            answers = [None] * len(keys)
+            fallback = ERROR_FALLBACK
+        for (food, bucket), answer in zip(keys, answers):
+            if answer is not None:
+                cache.set(f"{food}|{bucket}", answer)
+            for i in pending[(food, bucket)]:
+                quantity = meals[i].get('quantity', 100)
+                results[i] = _scaled(answer, quantity, bucket) if answer is not None else dict(fallback)
+
+    return results
@@ -0,0 +1,120 @@
+# usda.py
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from functions.disk_cache import DiskCache, MISS
+from functions.food_search import normalize
+
+# Overridable so tests can point the client at a local stub server
+API_URL = os.environ.get("USDA_API_URL", "https://api.nal.usda.gov/fdc/v1/foods/search")
+API_KEY = os.environ.get("USDA_API_KEY", "iBOUPzaCXlEy5E4Z4qz758aWgVQobfE6ck2kSXIw")
+CACHE_PATH = os.path.join("cache", "usda.sqlite")
+
+# USDA nutrient name -> our field
+NUTRIENTS = {
+    "Energy": "calories",
+    "Carbohydrate, by difference": "carbs",
+    "Protein": "protein",
+    "Total lipid (fat)": "fat",
+}
+
+
+def make_session(pool_size=16, retries=3, backoff=0.3):
+    """requests.Session with keep-alive connection pooling and retry/backoff on transient errors."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class USDAClient:
+    """
+    FoodData Central search client with a shared persistent cache.
+
+    Results are cached per normalized food name, including misses, so a
+    food looked up by many users reaches the API once per TTL. Concurrent
+    lookups of the same name wait for the first one instead of each
+    calling the API.
+    """
+
+    def __init__(self, api_url=API_URL, api_key=API_KEY, cache=None, session=None, timeout=5):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.cache = cache if cache is not None else DiskCache(CACHE_PATH)
+        self.session = session if session is not None else make_session()
+        self.timeout = timeout
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _fetch(self, food_name):
+        response = self.session.get(
+            self.api_url,
+            params={"query": food_name, "api_key": self.api_key},
+            timeout=self.timeout,
+        )
+        if response.status_code == 404:
+            # Nothing to find for this query; cached as a miss like an empty result
+            return None
+        response.raise_for_status()
+        foods = response.json().get("foods")
+        if not foods:
+            return None
+        nutrients = foods[0].get("foodNutrients", [])
+        result = {field: None for field in NUTRIENTS.values()}
+        for item in nutrients:
+            field = NUTRIENTS.get(item.get("nutrientName"))
+            if field and result[field] is None:
+                result[field] = item.get("value")
+        return result
+
+    def lookup(self, food_name):
+        """
+        Nutrition per 100g as a dict with calories, carbs, protein and fat,
+        or None if the API has no match (an empty result or a 404). Network
+        and server errors are not cached.
+        """
+        key = normalize(food_name)
+        cached = self.cache.get(key)
+        if cached is not MISS:
+            return cached
+        with self._key_lock(key):
+            try:
+                cached = self.cache.get(key)
+                if cached is not MISS:
+                    return cached
+                result = self._fetch(key)
+                self.cache.set(key, result)
+                return result
+            finally:
+                with self._locks_guard:
+                    self._locks.pop(key, None)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide USDAClient shared by all sessions."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = USDAClient()
+    return _client
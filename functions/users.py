@@ -0,0 +1,78 @@
+# users.py
+
+import time
+
+import streamlit as st
+
+from supabase_client import supabase
+
+# Columns fetched for each purpose; never select("*")
+PROFILE_FIELDS = ("email", "name", "age", "height", "weight")
+LOGIN_FIELDS = PROFILE_FIELDS + ("password",)
+SECURITY_FIELDS = ("email", "password", "security_questions")
+
+# Seconds a cached row is trusted; edits made from another session show up after this
+CACHE_TTL = 300
+
+_CACHE_KEY = "_user_cache"
+
+
+def _cache():
+    return st.session_state.setdefault(_CACHE_KEY, {})
+
+
+def get_user(email, fields=PROFILE_FIELDS):
+    """
+    The user's row restricted to fields, or None if the email is not
+    registered. Rows are cached in the session, so repeated calls during
+    a render and across reruns reuse one Supabase query; a later call for
+    columns not fetched yet queries just those.
+    """
+    if not email:
+        return None
+    entry = _cache().get(email)
+    now = time.monotonic()
+    if entry is None or now - entry["fetched_at"] > CACHE_TTL:
+        entry = {"row": {}, "exists": None, "fetched_at": now}
+
+    missing = [field for field in fields if field not in entry["row"]]
+    if entry["exists"] is not False and missing:
+        columns = ",".join(dict.fromkeys(("email",) + tuple(missing)))
+        response = supabase.table("users").select(columns).eq("email", email).limit(1).execute()
+        if response.data:
+            entry["row"].update(response.data[0])
+            entry["exists"] = True
+        else:
+            entry["exists"] = False
+        _cache()[email] = entry
+
+    if not entry["exists"]:
+        return None
+    return {field: entry["row"].get(field) for field in fields}
+
+
+def create_user(record):
+    """Inserts a new user row and forgets any cached "not registered" answer for it."""
+    supabase.table("users").insert(record).execute()
+    invalidate_user(record["email"])
+
+
+def update_user(email, values):
+    """Updates the user's row and the cached copy with it, so the next read needs no query."""
+    supabase.table("users").update(values).eq("email", email).execute()
+    entry = _cache().get(email)
+    if entry is not None and entry["exists"]:
+        entry["row"].update(values)
+    if (st.session_state.get("current_user") or {}).get("email") == email:
+        st.session_state["current_user"] = {
+            **st.session_state["current_user"],
+            **{k: v for k, v in values.items() if k in PROFILE_FIELDS},
+        }
+
+
+def invalidate_user(email=None):
+    """Drops the cached row for email, or every cached row when email is None."""
+    if email is None:
+        _cache().clear()
+    else:
+        _cache().pop(email, None)
@@ -0,0 +1,230 @@
+# write_queue.py
+
+import atexit
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from functions.serialization import json_default
+
+SPOOL_PATH = os.path.join("user_data", "outbox.db")
+
+
+def _default_client():
+    # Imported on first flush, not when the queue is created
+    from supabase_client import supabase
+    return supabase
+
+
+class WriteQueue:
+    """
+    Write-behind queue for Supabase inserts, safe to share between threads
+    and processes.
+
+    put() stores the record in a local SQLite spool and returns at once; a
+    background thread sends spooled records in bulk inserts of up to
+    `batch_size` rows and deletes them once Supabase accepts them. Nothing
+    is lost while offline or across restarts: failed sends are retried with
+    jittered exponential backoff, and records still spooled when a process
+    starts are sent by it. Delivery is at least once, so a timeout after
+    Supabase has stored a batch can repeat it.
+
+    A record that fails on its own `max_attempts` times is kept in the
+    spool, marked failed, and no longer retried.
+    """
+
+    def __init__(self, path=SPOOL_PATH, client_factory=_default_client, batch_size=50,
+                 flush_interval=0.5, max_backoff=60, max_attempts=20, lease=60):
+        self.path = path
+        self.client_factory = client_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._backoff = 0
+        self.stats = {"sent": 0, "batches": 0, "errors": 0}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, tbl TEXT, data TEXT, created REAL,"
+                " attempts INTEGER DEFAULT 0, leased_until REAL DEFAULT 0, failed INTEGER DEFAULT 0,"
+                " error TEXT, user_email TEXT)"
+            )
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(outbox)")]
+            if "user_email" not in columns:
+                # Spools written before user_email had its own column
+                conn.execute("ALTER TABLE outbox ADD COLUMN user_email TEXT")
+                conn.execute("UPDATE outbox SET user_email = json_extract(data, '$.user_email')")
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_ready ON outbox (failed, leased_until)")
+            conn.execute("CREATE INDEX IF NOT EXISTS outbox_user ON outbox (user_email, tbl)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def put(self, table, record):
+        """Spools one record for insertion into table and wakes the sender."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO outbox (tbl, data, created, user_email) VALUES (?, ?, ?, ?)",
+                (table, json.dumps(record, default=json_default), time.time(), record.get("user_email")),
+            )
+        self.start()
+        self._wake.set()
+
+    def pending(self, table=None, user_email=None):
+        """
+        Number of records not yet sent, optionally only those for table
+        and/or with the given user_email, e.g. pending("predictions", email).
+        """
+        sql, params = "SELECT COUNT(*) FROM outbox WHERE failed = 0", []
+        if user_email is not None:
+            sql += " AND user_email = ?"
+            params.append(user_email)
+        if table is not None:
+            sql += " AND tbl = ?"
+            params.append(table)
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    def discard(self, user_email, table=None):
+        """
+        Drops the records with this user_email (optionally only for table)
+        that are not yet sent, e.g. before the user's rows are deleted in
+        Supabase so a spooled one does not reappear. A batch already being
+        sent cannot be recalled. Returns the number dropped.
+        """
+        sql, params = "DELETE FROM outbox WHERE user_email = ?", [user_email]
+        if table is not None:
+            sql += " AND tbl = ?"
+            params.append(table)
+        with self._connect() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def _claim(self):
+        """
+        Leases the next records to send so other processes skip them: fresh
+        records in one bulk batch for one table, or a single retried record,
+        which keeps one bad row from failing a whole batch again.
+        """
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tbl, attempts FROM outbox WHERE failed = 0 AND leased_until < ? ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None, []
+            table, attempts = row
+            rows = conn.execute(
+                "SELECT id, data FROM outbox WHERE failed = 0 AND leased_until < ? AND tbl = ?"
+                " AND (attempts = 0) = ? ORDER BY id LIMIT ?",
+                (now, table, attempts == 0, self.batch_size if attempts == 0 else 1),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET leased_until = ? WHERE id = ?",
+                [(now + self.lease, row_id) for row_id, _ in rows],
+            )
+        return table, rows
+
+    def flush_once(self):
+        """Sends one batch. Returns the number of records sent, or None when the send failed."""
+        table, rows = self._claim()
+        if not rows:
+            return 0
+        ids = [(row_id,) for row_id, _ in rows]
+        try:
+            self.client_factory().table(table).insert([json.loads(data) for _, data in rows]).execute()
+        except Exception as e:
+            self.stats["errors"] += 1
+            with self._connect() as conn:
+                conn.executemany(
+                    "UPDATE outbox SET attempts = attempts + 1, leased_until = 0, error = ?,"
+                    " failed = attempts + 1 >= ? WHERE id = ?",
+                    [(str(e)[:500], self.max_attempts, row_id) for (row_id,) in ids],
+                )
+            return None
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM outbox WHERE id = ?", ids)
+        self.stats["sent"] += len(rows)
+        self.stats["batches"] += 1
+        return len(rows)
+
+    def flush(self, timeout=10):
+        """Sends spooled records until none are left, a send fails or timeout seconds pass."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            sent = self.flush_once()
+            if not sent:
+                return sent == 0
+        return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.flush_once()
+            except Exception:
+                # The spool itself failed, e.g. "database is locked" while
+                # another process holds it; keep the sender alive and retry
+                self.stats["errors"] += 1
+                sent = None
+            if sent is None:
+                # Offline or rejected: back off, with jitter so processes do not retry in step
+                self._backoff = min(max(self._backoff * 2, 1), self.max_backoff)
+                self._stop.wait(self._backoff * random.uniform(0.5, 1.5))
+            elif sent == 0:
+                self._backoff = 0
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+            else:
+                self._backoff = 0
+
+    def start(self):
+        """Starts the background sender, or restarts it if it died, and flushes on interpreter exit."""
+        if self._stop.is_set() or (self._thread is not None and self._thread.is_alive()):
+            return
+        with _queue_lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._thread is None:
+                    atexit.register(self.close)
+                self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+                self._thread.start()
+
+    def close(self, timeout=5):
+        """Stops the sender after a last flush; whatever is left stays spooled for next time."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush(timeout)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Process-wide WriteQueue, started on first use."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = WriteQueue()
+    _queue.start()
+    return _queue
@@ -0,0 +1,43 @@
+# import_profile.py
+
+import argparse
+import json
+import sys
+
+from functions.import_profile import profile_app, compare
+
+# Same page modules main.py loads lazily
+PAGE_MODULES = [
+    "app.about", "app.user_input", "app.calculation", "app.shap_waterfall",
+    "app.diet_tracker", "app.sugar_tracker", "app.calorie", "app.ai_chat",
+    "app.history", "app.about_diabetes", "app.performance",
+]
+
+parser = argparse.ArgumentParser(description="Profile cold-start import time of main.py and of each page (python -X importtime).")
+parser.add_argument("--top", type=int, default=8, help="packages listed per target")
+parser.add_argument("--json", help="write the report to this file")
+parser.add_argument("--baseline", help="compare against a report written earlier with --json")
+parser.add_argument("--tolerance", type=float, default=0.2, help="allowed growth over the baseline (0.2 = 20%%)")
+args = parser.parse_args()
+
+report = profile_app("main", PAGE_MODULES, top=args.top)
+
+for target, summary in report.items():
+    label = "login screen (main)" if target == "main" else f"{target} (on top of main)"
+    print(f"{label}: {summary['total_ms']:.1f} ms, {summary['modules']} modules")
+    if "error" in summary:
+        print(f"    import failed: {summary['error']}")
+    for package, ms in summary["packages"].items():
+        print(f"    {package:<28} {ms:>9.1f} ms")
+
+if args.json:
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.json}")
+
+if args.baseline:
+    with open(args.baseline) as f:
+        regressions = compare(report, json.load(f), args.tolerance)
+    for target, (before, after) in regressions.items():
+        print(f"REGRESSION {target}: {before:.1f} ms -> {after:.1f} ms")
+    sys.exit(1 if regressions else 0)
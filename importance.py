@@ -0,0 +1,14 @@
+# importance.py
+
+import argparse
+
+from functions.importance import build_importance
+
+parser = argparse.ArgumentParser(description="Precompute permutation importances for the diabetes model.")
+parser.add_argument("--n-repeats", type=int, default=5)
+parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel workers (-1 = all cores)")
+parser.add_argument("--force", action="store_true", help="Recompute even if the artifact is up to date")
+args = parser.parse_args()
+
+path = build_importance(n_repeats=args.n_repeats, n_jobs=args.n_jobs, force=args.force)
+print("Permutation importances written to", path)
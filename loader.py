@@ -1,10 +1,13 @@
 # loader.py
 
-import pandas as pd
-import joblib
+from functions.registry import get_model, get_dataset
 
-# Load the trained model
-model = joblib.load("datasets/diabetes_model.pkl")
 
-# Load the dataset
-df = pd.read_csv("datasets/diabetes.csv")
+def __getattr__(name):
+    # Resolved lazily through the shared registry so importing this module
+    # does not deserialize anything.
+    if name == "model":
+        return get_model("diabetes")
+    if name == "df":
+        return get_dataset("diabetes_data")
+    raise AttributeError(f"module 'loader' has no attribute '{name}'")
@@ -1,17 +1,29 @@
 import streamlit as st
 import random
-from app import about
-from app import user_input
-from app import shap_waterfall
-from app import history
-from app import about_diabetes
-from app import ai_chat
-from app import diet_tracker
-from app import calculation
-from app import sugar_tracker
-from app import calorie
-from app import performance
-from supabase_client import supabase
+import importlib
+from functions.users import LOGIN_FIELDS, PROFILE_FIELDS, SECURITY_FIELDS, create_user, get_user, invalidate_user, update_user
+
+# Sidebar entry -> page module. A page is imported the first time it is
+# opened, so the login screen does not wait for shap, sklearn, plotly,
+# fpdf or Gemini to load (see import_profile.py).
+PAGES = {
+    "HOME": "app.about",
+    "PREDICTION": "app.user_input",
+    "INPUTS CALCULATION": "app.calculation",
+    "SHAP WATERFALL": "app.shap_waterfall",
+    "DIET TRACKER": "app.diet_tracker",
+    "SUGAR TRACKER": "app.sugar_tracker",
+    "CALORIES BURNT": "app.calorie",
+    "ASK AI": "app.ai_chat",
+    "SETTINGS": "app.history",
+    "ABOUT DIABETES": "app.about_diabetes",
+    "PERFORMANCE": "app.performance",
+}
+
+def load_page(name):
+    """Page module for a sidebar entry, imported on first use (Python caches it afterwards)."""
+    return importlib.import_module(PAGES[name])
+
 if 'logged_in' not in st.session_state:
     st.session_state['logged_in'] = False
 
@@ -37,10 +49,6 @@ SECURITY_QUESTIONS = [
     "What was your dream job as a child?"
 ]
 
-def get_user_by_email(email):
-    response = supabase.table("users").select("*").eq("email", email).execute()
-    return response.data[0] if response.data else None
-
 def signup():
     st.title("🔐 Sign Up")
     name = st.text_input("Name", key="signup_name")
@@ -73,16 +81,16 @@ def signup():
         if any(not a.strip() for a in answers):
             st.error("Please answer all selected security questions.")
             return
-        if get_user_by_email(email):
+        if get_user(email, ("email",)):
             st.error("Email already registered. Please login.")
             return
 
-        supabase.table("users").insert({
+        create_user({
             "name": name,
             "email": email,
             "password": password,
             "security_questions": dict(zip(selected_questions, answers))
-        }).execute()
+        })
         st.success("Sign up successful! Please login.")
 
 def login():
@@ -97,7 +105,7 @@ def login():
         return
 
     if st.button("Login", key="login_button"):
-        user = get_user_by_email(email)
+        user = get_user(email, LOGIN_FIELDS)
         if not user:
             st.error("Email not registered. Please sign up.")
             return
@@ -106,7 +114,7 @@ def login():
             return
 
         st.session_state['logged_in'] = True
-        st.session_state['current_user'] = user
+        st.session_state['current_user'] = get_user(email, PROFILE_FIELDS)
         st.success(f"Welcome {user['name']}!")
         st.rerun()  # changed from st.experimental_rerun()
 
@@ -124,7 +132,7 @@ def forgot_password_flow():
     if stage == 0:
         email = st.text_input("Enter your registered email to proceed")
         if st.button("Next"):
-            user = get_user_by_email(email)
+            user = get_user(email, ("email",))
             if not user:
                 st.error("This email is not registered.")
             else:
@@ -133,7 +141,7 @@ def forgot_password_flow():
                 st.rerun()  # changed from st.experimental_rerun()
 
     elif stage == 1:
-        user = get_user_by_email(st.session_state['reset_email'])
+        user = get_user(st.session_state['reset_email'], SECURITY_FIELDS)
         sq = user["security_questions"]
         questions = list(sq.keys())
 
@@ -170,7 +178,7 @@ def forgot_password_flow():
                 st.error("Passwords do not match.")
                 return
             email = st.session_state['reset_email']
-            supabase.table("users").update({"password": new_password}).eq("email", email).execute()
+            update_user(email, {"password": new_password})
             st.success("Password changed successfully! Please login.")
             st.session_state['forgot_password_stage'] = 0
             st.session_state['reset_email'] = None
@@ -178,7 +186,7 @@ def forgot_password_flow():
             st.rerun()  # changed from st.experimental_rerun()
 
         if st.button("Skip Password Change (Login Now)"):
-            user = get_user_by_email(st.session_state['reset_email'])
+            user = get_user(st.session_state['reset_email'], PROFILE_FIELDS)
             st.session_state['logged_in'] = True
             st.session_state['current_user'] = user
             st.session_state['forgot_password_stage'] = 0
@@ -190,6 +198,7 @@ def forgot_password_flow():
 def logout():
     st.session_state['logged_in'] = False
     st.session_state['current_user'] = None
+    invalidate_user()
     st.success("You have been logged out.")
     st.rerun()  # changed from st.experimental_rerun()
 
@@ -199,48 +208,16 @@ def show_app_nav():
     st.sidebar.markdown("---")
     st.sidebar.title("🔍 Navigation")
 
-    app_mode = st.sidebar.radio("Go to", [
-        "HOME",
-        "PREDICTION",
-        "INPUTS CALCULATION",
-        "SHAP WATERFALL",
-        "DIET TRACKER",
-        "SUGAR TRACKER",
-        "CALORIES BURNT",
-        "ASK AI",
-        "SETTINGS",
-        "ABOUT DIABETES",
-        "PERFORMANCE",
-    ])
+    app_mode = st.sidebar.radio("Go to", list(PAGES))
 
     if st.sidebar.button("Logout"):
         logout()
 
-    if app_mode == "HOME":
-        about.app()
-    elif app_mode == "PREDICTION":
-        user_input.app()
-    elif app_mode == "INPUTS CALCULATION":
-        calculation.app()
-    elif app_mode == "SHAP WATERFALL":
-        if 'last_input' in st.session_state:
-            shap_waterfall.app(st.session_state['last_input'])
-        else:
-            shap_waterfall.app(None)
-    elif app_mode == "DIET TRACKER":
-        diet_tracker.app()
-    elif app_mode == "SUGAR TRACKER":  
-        sugar_tracker.app()
-    elif app_mode == "CALORIES BURNT":  
-        calorie.app()
-    elif app_mode == "SETTINGS":
-        history.app()
-    elif app_mode == "ABOUT DIABETES":
-        about_diabetes.app()
-    elif app_mode == "ASK AI":
-        ai_chat.app()
-    elif app_mode == "PERFORMANCE":
-        performance.app()
+    page = load_page(app_mode)
+    if app_mode == "SHAP WATERFALL":
+        page.app(st.session_state.get('last_input'))
+    else:
+        page.app()
 
 def main():
     if not st.session_state['logged_in']:
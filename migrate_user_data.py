@@ -0,0 +1,15 @@
+# migrate_user_data.py
+
+import argparse
+
+from functions.health_db import HealthDB, migrate_user_files, DB_PATH
+
+parser = argparse.ArgumentParser(description="Import the per-user JSON logs under user_data/ into the SQLite health database.")
+parser.add_argument("--data-dir", default="user_data")
+parser.add_argument("--db", default=DB_PATH)
+args = parser.parse_args()
+
+added = migrate_user_files(args.data_dir, HealthDB(args.db))
+for (table, user), count in sorted(added.items()):
+    print(f"{table:<18} {user}  +{count}")
+print(f"Imported {sum(added.values())} records from {len(added)} logs into {args.db}")
@@ -0,0 +1,20 @@
+# predict_batch.py
+
+import argparse
+import time
+
+from data.config import thresholds
+from functions.batch import score_file
+
+parser = argparse.ArgumentParser(description="Score a CSV or Parquet file of the eight Pima features with the diabetes model.")
+parser.add_argument("input", help=".csv or .parquet with Pregnancies, Glucose, ..., Age columns")
+parser.add_argument("output", help=".csv or .parquet; input columns plus risk_percent and prediction")
+parser.add_argument("--chunksize", type=int, default=50000, help="rows held in memory at a time")
+parser.add_argument("--n-jobs", type=int, default=-1, help="cores used by predict_proba (-1 = all)")
+parser.add_argument("--threshold", type=float, default=thresholds, help="probability above which the label is Positive")
+args = parser.parse_args()
+
+start = time.perf_counter()
+rows = score_file(args.input, args.output, args.chunksize, args.n_jobs, args.threshold)
+elapsed = time.perf_counter() - start
+print(f"Scored {rows} rows in {elapsed:.1f} s ({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.output}")
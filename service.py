@@ -0,0 +1,153 @@
+# service.py
+#
+# Local HTTP inference service for the diabetes and calorie-burn models:
+#   python service.py                      # http://127.0.0.1:8000
+#   uvicorn service:app --port 8000
+# Both models come from functions.registry, the same artifacts the
+# PREDICTION and CALORIES BURNT pages use, scored with the configured
+# inference_backend (data/config.py).
+
+import argparse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import List, Literal, Union
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+
+from functions.batch import FEATURES, score_frame
+from functions.calorie_model import FEATURES as CALORIE_FEATURES
+from functions.latency import LatencyStats, Timer
+from functions.microbatch import MicroBatcher
+from functions.registry import artifact_path, artifact_stats, get_predictor
+
+
+class DiabetesInput(BaseModel):
+    Pregnancies: float = Field(ge=0)
+    Glucose: float = Field(ge=0)
+    BloodPressure: float = Field(ge=0)
+    SkinThickness: float = Field(ge=0)
+    Insulin: float = Field(ge=0)
+    BMI: float = Field(ge=0)
+    DiabetesPedigreeFunction: float = Field(ge=0)
+    Age: float = Field(gt=0)
+
+
+class CaloriesInput(BaseModel):
+    gender: Literal["male", "female"]
+    age: float = Field(gt=0)
+    height: float = Field(gt=0, description="cm")
+    weight: float = Field(gt=0, description="kg")
+    duration: float = Field(gt=0, description="minutes")
+    heart_rate: float = Field(gt=0, description="bpm")
+    body_temp: float = Field(gt=0, description="°C")
+
+
+def predict_diabetes(rows):
+    scored = score_frame(pd.DataFrame(rows, columns=FEATURES), get_predictor("diabetes"))
+    return [
+        {"risk_percent": float(risk), "prediction": label}
+        for risk, label in zip(scored["risk_percent"], scored["prediction"])
+    ]
+
+
+def predict_calories(rows):
+    model = get_predictor("calories")
+    X = pd.DataFrame(rows, columns=CALORIE_FEATURES)
+    # Models fitted on arrays (no feature names) are given an array too
+    predictions = model.predict(X if hasattr(model, "feature_names_in_") else X.to_numpy())
+    return [{"calories": round(float(value), 2)} for value in predictions]
+
+
+stats = {"diabetes": LatencyStats(), "calories": LatencyStats()}
+batchers = {
+    "diabetes": MicroBatcher(predict_diabetes, stats=stats["diabetes"]),
+    "calories": MicroBatcher(predict_calories, stats=stats["calories"]),
+}
+
+
+def model_available(name):
+    """
+    Whether the model's file exists now: the version named in current.json
+    once one is published, else the bundled file. Checked on every request,
+    so a model published while the service runs is served without a restart.
+    """
+    try:
+        return os.path.exists(artifact_path(name))
+    except (OSError, ValueError, KeyError):  # unreadable current.json
+        return False
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Load the models before serving so the first request is not slow
+    loop = asyncio.get_running_loop()
+    for name in batchers:
+        try:
+            await loop.run_in_executor(None, get_predictor, name)
+        except (OSError, EOFError) as e:
+            print(f"Model {name!r} unavailable for now: {e}")
+        batchers[name].start()
+    yield
+    for batcher in batchers.values():
+        await batcher.stop()
+
+
+app = FastAPI(title="Diabetes Assistance inference service", lifespan=lifespan)
+
+
+async def _predict(name, rows):
+    if not model_available(name):
+        raise HTTPException(status_code=503, detail=f"The {name} model is not available")
+    try:
+        with Timer(stats[name]):
+            return await batchers[name].submit(rows)
+    except (OSError, EOFError) as e:
+        # The file went missing or was unreadable between the check and the load
+        raise HTTPException(status_code=503, detail=f"The {name} model is not available: {e}")
+
+
+@app.post("/predict/diabetes")
+async def diabetes(payload: Union[DiabetesInput, List[DiabetesInput]]):
+    """Diabetes risk for one record or a list of records."""
+    records = payload if isinstance(payload, list) else [payload]
+    results = await _predict("diabetes", [[getattr(r, f) for f in FEATURES] for r in records])
+    return results if isinstance(payload, list) else results[0]
+
+
+@app.post("/predict/calories")
+async def calories(payload: Union[CaloriesInput, List[CaloriesInput]]):
+    """Calories burnt for one exercise session or a list of sessions."""
+    records = payload if isinstance(payload, list) else [payload]
+    rows = [
+        [1 if r.gender == "male" else 0, r.age, r.height, r.weight, r.duration, r.heart_rate, r.body_temp]
+        for r in records
+    ]
+    results = await _predict("calories", rows)
+    return results if isinstance(payload, list) else results[0]
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-endpoint request count, p50/p90/p99 latency and mean batch size, plus model load stats."""
+    return {
+        "endpoints": {name: endpoint_stats.summary() for name, endpoint_stats in stats.items()},
+        "artifacts": artifact_stats(),
+    }
+
+
+@app.get("/health")
+async def health():
+    return {"models": {name: model_available(name) for name in batchers}}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve the diabetes and calorie-burn models over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
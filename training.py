@@ -1,16 +1,59 @@
 # training.py
+#
+# Trains the diabetes and calorie-burn models and publishes them as new
+# versions under models/, which the app and service.py switch to on their
+# next prediction:
+#   python training.py                     # both models, with hyperparameter search
+#   python training.py diabetes --no-search
+#   python training.py --list              # published versions and their scores
+#   python training.py --activate diabetes 20250101T120000Z   # roll back
 
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-import joblib
+import argparse
+import json
+import sys
 
-df = pd.read_csv("datasets/diabetes.csv")
-X = df.drop("Outcome", axis=1)
-y = df["Outcome"]
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+from functions.pipeline import MODELS, activate_version, current_version, list_versions, publish, train
 
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
 
-joblib.dump(model, "notebooks/diabetes_model.pkl")
+def _summary(manifest):
+    metrics = ", ".join(f"{k} {v:.4f}" for k, v in manifest["test_metrics"].items())
+    return f"{manifest['name']} {manifest.get('version', '(unpublished)')}: {metrics}"
+
+
+parser = argparse.ArgumentParser(description="Train, version and publish the app's models.")
+parser.add_argument("models", nargs="*", default=list(MODELS), metavar="model",
+                    help=f"models to train: {', '.join(MODELS)} (default: all)")
+parser.add_argument("--n-jobs", type=int, default=-1, help="cores used for fitting and cross-validation (-1 = all)")
+parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+parser.add_argument("--n-iter", type=int, default=20, help="hyperparameter settings sampled per model")
+parser.add_argument("--no-search", action="store_true", help="fit the default parameters without searching")
+parser.add_argument("--no-publish", action="store_true", help="train and report only")
+parser.add_argument("--no-activate", action="store_true", help="publish without making it the served version")
+parser.add_argument("--list", action="store_true", help="list published versions and exit")
+parser.add_argument("--activate", nargs=2, metavar=("MODEL", "VERSION"), help="serve an already published version")
+args = parser.parse_args()
+unknown = [name for name in args.models if name not in MODELS]
+if unknown:
+    parser.error(f"unknown model: {', '.join(unknown)}")
+
+if args.list:
+    for name in args.models:
+        current = current_version(name)
+        for manifest in list_versions(name):
+            marker = "*" if manifest["version"] == current else " "
+            print(f"{marker} {_summary(manifest)}")
+    sys.exit(0)
+
+if args.activate:
+    name, version = args.activate
+    activate_version(name, version)
+    print(f"{name}: now serving {version}")
+    sys.exit(0)
+
+for name in args.models:
+    print(f"Training {name}...")
+    model, manifest = train(name, n_jobs=args.n_jobs, cv=args.cv, n_iter=args.n_iter, search=not args.no_search)
+    print(json.dumps({k: manifest[k] for k in ("params", "cv_score", "test_metrics", "fit_seconds")}, indent=2))
+    if not args.no_publish:
+        manifest["version"] = publish(name, model, manifest, activate=not args.no_activate)
+    print(_summary(manifest))